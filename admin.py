@@ -73,11 +73,59 @@ class CSVImportArticleAdmin(utils_admin_utils.ArticleFKModelAdmin):
     date_hierarchy = ('imported')
 
 
+class ExportRunAdmin(admin.ModelAdmin):
+    "Displays delta exports of article metadata"
+    list_display = (
+        'pk',
+        'journal',
+        'stage',
+        'issue',
+        'since',
+        'started',
+        'article_count',
+    )
+    list_filter = (
+        'journal',
+    )
+    exclude = (
+        'digests',
+    )
+    date_hierarchy = ('started')
+
+
+class ImportJobAdmin(admin.ModelAdmin):
+    "Displays imports queued for the process_import_jobs command"
+    list_display = (
+        'pk',
+        'import_type',
+        'status',
+        'rows_done',
+        'error_count',
+        'journal',
+        'owner',
+        'created',
+        'finished',
+    )
+    list_filter = (
+        'import_type',
+        'status',
+        'journal',
+    )
+    raw_id_fields = (
+        'owner',
+    )
+    date_hierarchy = ('created')
+
+
 for pair in [
     (models.ExportFile, ExportFileAdmin),
     (models.CSVImport, CSVImportAdmin),
     (models.CSVImportCreateArticle, CSVImportArticleAdmin),
     (models.CSVImportUpdateArticle, CSVImportArticleAdmin),
     (models.OJSFile,),
+    (models.OJSImportCheckpoint,),
+    (models.JATSFingerprint,),
+    (models.ExportRun, ExportRunAdmin),
+    (models.ImportJob, ImportJobAdmin),
 ]:
     admin.site.register(*pair)
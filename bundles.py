@@ -0,0 +1,187 @@
+"""
+Zip-native access to bundles of files, such as zipped JATS articles.
+
+Members are grouped by directory from the archive's central directory, so
+nothing is extracted to disk. A member is only decompressed when it is opened
+or read by the importer consuming it.
+
+Export bundles are written the other way round: ZipStreamWriter emits the
+archive as chunks of bytes while it reads the files going into it, so it can
+be sent straight to a streaming response without a copy on disk.
+"""
+import os
+import posixpath
+import time
+import zipfile
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Formats that are already compressed and gain nothing from deflating
+STORED_EXTENSIONS = {
+    '.pdf', '.zip', '.gz', '.epub', '.docx', '.odt',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp',
+    '.mp3', '.mp4',
+}
+
+
+class ZipBundleReader():
+    """ Reads the directories of a zip archive without extracting it
+
+    Use as a context manager so the archive is closed:
+
+        with ZipBundleReader(zip_file) as reader:
+            for directory, subdirectories, filenames in reader.walk():
+                with reader.open(reader.member(directory, filenames[0])):
+                    ...
+    """
+
+    def __init__(self, zip_file):
+        """
+        :param zip_file: A path to a zip archive or a file-like object
+        """
+        self.zip_file = zipfile.ZipFile(zip_file, 'r')
+        self._filenames = {}
+        self._subdirectories = {}
+        for info in self.zip_file.infolist():
+            if info.is_dir():
+                self._add_directory(info.filename.rstrip('/'))
+            else:
+                directory, filename = posixpath.split(info.filename)
+                self._add_directory(directory)
+                self._filenames[directory].append(filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def walk(self):
+        """ Walks the archive's directories top-down, like os.walk
+        :return: A generator of (directory, subdirectories, filenames) tuples
+            where directory is '' for the root of the archive
+        """
+        for directory in sorted(self._filenames):
+            yield (
+                directory,
+                sorted(self._subdirectories[directory]),
+                list(self._filenames[directory]),
+            )
+
+    def filenames(self, directory):
+        """ Returns the names of the files directly under a directory"""
+        return list(self._filenames.get(directory, []))
+
+    @staticmethod
+    def member(directory, filename):
+        """ Returns the archive member name of a file in a directory"""
+        return posixpath.join(directory, filename)
+
+    def open(self, member):
+        """ Opens a member for reading in binary mode"""
+        return self.zip_file.open(member)
+
+    def read(self, member):
+        """ Returns the decompressed bytes of a member"""
+        return self.zip_file.read(member)
+
+    def close(self):
+        self.zip_file.close()
+
+    def _add_directory(self, directory):
+        if directory in self._filenames:
+            return
+        self._filenames[directory] = []
+        self._subdirectories[directory] = set()
+        if directory:
+            parent, name = posixpath.split(directory)
+            self._add_directory(parent)
+            self._subdirectories[parent].add(name)
+
+
+class ZipStreamWriter():
+    """ Writes a zip archive as a stream of bytes chunks
+
+    Every write method is a generator of the chunks produced so far, so that
+    the archive can be consumed while it is being built:
+
+        def stream():
+            writer = ZipStreamWriter()
+            yield from writer.write_file(path, 'article.pdf')
+            yield from writer.finish()
+
+    Members whose extension is in STORED_EXTENSIONS are stored rather than
+    compressed, which saves CPU on PDFs and images.
+    """
+
+    def __init__(self, compression=zipfile.ZIP_DEFLATED):
+        """
+        :param compression: The zipfile compression used for members that are
+            not in STORED_EXTENSIONS
+        """
+        self.compression = compression
+        self._buffer = _ChunkBuffer()
+        # The buffer can't seek, so zipfile writes data descriptors
+        self.zip_file = zipfile.ZipFile(self._buffer, mode='w')
+
+    def write_file(self, path, arcname):
+        """ Adds a file from disk to the archive, reading it in chunks
+        :param path: Path of the file to add
+        :param arcname: Name of the member in the archive
+        """
+        info = zipfile.ZipInfo.from_file(path, arcname)
+        info.compress_type = self.compress_type(arcname)
+        with open(path, 'rb') as source:
+            yield from self._write(info, iter(
+                lambda: source.read(CHUNK_SIZE), b'',
+            ))
+
+    def write_lines(self, arcname, lines, encoding='utf-8'):
+        """ Adds a member built from an iterable of strings
+        :param arcname: Name of the member in the archive
+        :param lines: An iterable of strings, such as a CSV generator
+        :param encoding: Encoding of the member
+        """
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        info.external_attr = 0o644 << 16
+        info.compress_type = self.compress_type(arcname)
+        yield from self._write(
+            info, (line.encode(encoding) for line in lines),
+        )
+
+    def finish(self):
+        """ Writes the central directory, ending the archive"""
+        self.zip_file.close()
+        yield from self._buffer.drain()
+
+    def compress_type(self, arcname):
+        extension = os.path.splitext(arcname)[1].lower()
+        if extension in STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return self.compression
+
+    def _write(self, info, chunks):
+        with self.zip_file.open(info, mode='w') as member:
+            for chunk in chunks:
+                member.write(chunk)
+                yield from self._buffer.drain()
+        yield from self._buffer.drain()
+
+
+class _ChunkBuffer():
+    """ A write-only, unseekable file that hands back what was written"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return (chunk for chunk in chunks if chunk)
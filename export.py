@@ -1,124 +1,261 @@
-import zipfile
+import hashlib
+import json
 import os
 import uuid
 import csv
 from itertools import (
-    chain,
     count,
     filterfalse,
 )
 from uuid import uuid4
-from plugins.imports import plugin_settings
-
-from bs4 import BeautifulSoup
+from plugins.imports import bundles, models, plugin_settings
+from plugins.imports.utils import chunked, DEFAULT_BATCH_SIZE
 
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Prefetch, Q, QuerySet
+from django.http import FileResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
+from django.utils import formats, timezone
+from identifiers import models as id_models
 from submission import models as submission_models
 
 from core import files, models as core_models
 
 
+EXPORT_CACHE_DIR = os.path.join(files.TEMP_DIR, 'export_cache')
+EXPORT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+AUTHOR_RECORD_KEYS = {
+    'Author salutation': 'salutation',
+    'Author given name': 'given_name',
+    'Author middle name': 'middle_name',
+    'Author surname': 'surname',
+    'Author suffix': 'suffix',
+    'Author email': 'email',
+    'Author ORCID': 'orcid',
+    'Author institution': 'institution',
+    'Author department': 'department',
+    'Author biography': 'biography',
+}
+
 CSV_HEADER_ROW = "Article identifier, Article title, Section Name, Volume number, Issue number, Subtitle, Abstract," \
                  "publication stage, keywords, date/time accepted, date/time publishded , DOI, Author Salutation," \
                  "Author first name,Author Middle Name, Author last name, Author Institution, Biography," \
                  "Author Email, Is Corporate (Y/N), "
 
 
-def html_table_to_csv(html):
-    filepath = files.get_temp_file_path_from_name(
-        '{0}.csv'.format(uuid.uuid4())
-    )
-    soup = BeautifulSoup(str(html), 'lxml')
-    with open(filepath, "w", encoding="utf-8") as f:
-        wr = csv.writer(f)
-        for table in soup.find_all("table"):
-            for row in table.find_all("tr"):
-                cells = [cell.string for cell in row.findChildren(['th', 'td'])]
-                wr.writerow(cells)
-            wr.writerow([])
-
-    f.close()
-    return filepath
-
-
 def export_csv(request, article, article_files):
-    elements = [
-        'general.html',
-        'authors.html',
-        'files.html',
-        'dates.html',
-        'funding.html',
-    ]
-
-    context = {
-        'article': article,
-        'journal': request.journal,
-        'files': article_files,
-    }
-
-    html = ''
-    for element in elements:
-        html = html + render_to_string(
-            'import/elements/{element}'.format(element=element),
-            context,
+    def chunks(writer):
+        yield from writer.write_lines(
+            'article_data.csv',
+            iter_article_summary_csv(
+                [article],
+                {article.pk: article_files},
+                journal=request.journal,
+            ),
         )
-    csv_file_path = html_table_to_csv(html)
+        yield from write_article_files(writer, article_files)
+
+    return stream_zip(
+        chunks,
+        'export_{}_{}_csv.zip'.format(article.journal.code, article.pk),
+    )
 
-    zip_file_name = 'export_{}_{}_csv.zip'.format(article.journal.code, article.pk)
-    zip_path = os.path.join(files.TEMP_DIR, zip_file_name)
-    zip_file = zipfile.ZipFile(zip_path, mode='w')
 
-    zip_file.write(
-        csv_file_path,
-        'article_data.csv'
+def iter_article_summary_csv(
+        articles, files_by_article=None, batch_size=DEFAULT_BATCH_SIZE,
+        journal=None,
+):
+    """ Yields a CSV of the summaries of the given articles, one after another
+    :param articles: A queryset or iterable of articles
+    :param files_by_article: Optional dict of the files to list for each
+        article by article ID. Defaults to every file of the article
+    :param batch_size: Number of articles to load per batch
+    :param journal: Optional journal named in the summaries. Defaults to the
+        journal of each article
+    :return: A generator of CSV lines
+    """
+    writer = csv.writer(EchoBuffer())
+    planned = iter_planned_articles(
+        articles,
+        batch_size=batch_size,
+        plan=plan_summary_articles,
+    )
+    for batch in chunked(planned, batch_size):
+        batch_files = files_by_article
+        if batch_files is None:
+            batch_files = get_files_by_article(batch)
+        for article in batch:
+            article_files = batch_files.get(article.pk, [])
+            rows = article_summary_rows(article, article_files, journal)
+            for row in rows:
+                yield writer.writerow(row)
+
+
+def plan_summary_articles(articles):
+    """ Loads everything article_summary_rows reads alongside articles"""
+    return articles.select_related(
+        'journal',
+        'section',
+        'license',
+        'correspondence_author',
+    ).prefetch_related(
+        'keywords',
+        'funders',
+        'articlestagelog_set',
+        Prefetch(
+            'frozenauthor_set',
+            queryset=submission_models.FrozenAuthor.objects.select_related(
+                'author',
+            ),
+        ),
     )
 
-    for file in article_files:
-        if os.path.exists(file.self_article_path()):
-            zip_file.write(
-                file.self_article_path(),
-                file.original_filename,
-            )
 
-    zip_file.close()
+def get_files_by_article(articles):
+    """ Returns the files of the given articles in a dict by article ID"""
+    files_by_article = {}
+    for file in core_models.File.objects.filter(
+        article_id__in=[article.pk for article in articles],
+    ).order_by('pk'):
+        files_by_article.setdefault(file.article_id, []).append(file)
+    return files_by_article
+
 
-    return files.serve_temp_file(zip_path, zip_file_name)
+def article_summary_rows(article, article_files, journal=None):
+    """ Returns the general, authors, files, dates and funding sections of an
+    article as CSV rows, each section followed by an empty row
+    :param article: A submission.models.Article
+    :param article_files: The core.models.File objects to list
+    :param journal: Optional journal to name, defaults to the article's
+    """
+    rows = [
+        ['Journal', (journal or article.journal).name],
+        ['ID', article.pk],
+        ['Title', article.title],
+        ['Section', article.section.name if article.section else ''],
+        [
+            'Correspondence Author',
+            article.correspondence_author.full_name()
+            if article.correspondence_author else '',
+        ],
+        ['Licence', article.license.name if article.license else ''],
+        ['Language', article.get_language_display()],
+        ['Abstract', article.abstract],
+        [
+            'Keywords',
+            ', '.join(str(keyword) for keyword in article.keywords.all())
+            or 'No keywords recorded',
+        ],
+        ['Comments to the Editor', article.comments_editor],
+        [],
+        [
+            'First Name', 'Middle Name', 'Last name', 'Email Address',
+            'Affiliation', 'ORCiD',
+        ],
+    ]
+    for author in article.frozenauthor_set.all():
+        affiliation = author.affiliation
+        if callable(affiliation):
+            affiliation = affiliation()
+        rows.append([
+            author.first_name,
+            author.middle_name,
+            author.last_name,
+            author.author.email if author.author else '',
+            affiliation,
+            author.author.orcid if author.author else '',
+        ])
+    rows.append([])
+
+    rows.append(['ID', 'Original Filename', 'Janeway Filename', 'Download Link'])
+    for file in article_files:
+        rows.append([
+            file.pk,
+            file.original_filename,
+            file.uuid_filename,
+            'Download',
+        ])
+    rows.append([])
+
+    rows.append(['Started', format_summary_date(article.date_started)])
+    rows.append(['Submitted', format_summary_date(article.date_submitted)])
+    for log in reversed(list(article.articlestagelog_set.all())):
+        rows.append([
+            '[Moved to Stage] {}'.format(log.stage_to),
+            format_summary_date(log.date_time),
+        ])
+    rows.append([])
+
+    rows.append(['Name', 'Fundref ID', 'Grant ID'])
+    for funder in article.funders.all():
+        rows.append([funder.name, funder.fundref_id, funder.funding_id])
+    rows.append([])
+
+    return rows
+
+
+def format_summary_date(value):
+    """ Formats a date as the article templates would display it"""
+    if not value:
+        return ''
+    return formats.localize(timezone.template_localtime(value))
 
 
 def export_html(request, article, article_files):
-    html_file_path = files.create_temp_file(
-        render_to_string(
-            'import/export.html',
-            context={
-                'article': article,
-                'journal': request.journal,
-                'files': article_files,
-            }
-        ),
-        '{code}-{pk}.html'.format(
-            code=article.journal.code,
-            pk=article.pk,
-        )
+    html = render_to_string(
+        'import/export.html',
+        context={
+            'article': article,
+            'journal': request.journal,
+            'files': article_files,
+        }
     )
 
-    zip_file_name = 'export_{}_{}_html.zip'.format(article.journal.code, article.pk)
-    zip_path = os.path.join(files.TEMP_DIR, zip_file_name)
-    zip_file = zipfile.ZipFile(zip_path, mode='w')
-    zip_file.write(
-        html_file_path,
-        'article_data.html'
+    def chunks(writer):
+        yield from writer.write_lines('article_data.html', [html])
+        yield from write_article_files(writer, article_files)
+
+    return stream_zip(
+        chunks,
+        'export_{}_{}_html.zip'.format(article.journal.code, article.pk),
     )
 
+
+def write_article_files(writer, article_files):
     for file in article_files:
         if os.path.exists(file.self_article_path()):
-            zip_file.write(
+            yield from writer.write_file(
                 file.self_article_path(),
                 file.original_filename,
             )
 
-    zip_file.close()
 
-    return files.serve_temp_file(zip_path, zip_file_name)
+def stream_zip(chunks, zip_file_name, cache=None, cache_key=None):
+    """ Streams a zip archive built on the fly as the response is consumed
+    Nothing is written to disk, so concurrent exports can't clobber each
+    other.
+    :param chunks: A function taking a bundles.ZipStreamWriter and yielding
+        the chunks of the members it writes to it
+    :param zip_file_name: The filename the browser should save the zip as
+    :param cache: Optional ExportArtifactCache in which to keep the archive
+    :param cache_key: The key under which to cache the archive
+    :return: A StreamingHttpResponse
+    """
+    def stream():
+        writer = bundles.ZipStreamWriter()
+        yield from chunks(writer)
+        yield from writer.finish()
+
+    streamed = stream()
+    if cache:
+        streamed = cache.store(cache_key, streamed)
+
+    response = StreamingHttpResponse(streamed, content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename="{}"'.format(
+        zip_file_name,
+    )
+    return response
 
 
 def add_author_information(row, author, frozen, article):
@@ -162,42 +299,243 @@ def export_using_import_format(articles):
     Exports data for an article using the schema specified for the 
     Import / Export / Update tool.
     """
-
-    body_rows = []
-    default_headers = plugin_settings.UPDATE_CSV_HEADERS
-    custom_headers = {}
-
-    for article in articles:
-        body_rows.extend(generate_rows_for_article(article))
-        if article.journal.id not in custom_headers:
-            custom_headers[article.journal.id] = set(
-                article.journal.field_set.values_list("name", flat=True)
-            )
-
     csv_name = '{0}.csv'.format(uuid.uuid4())
     filepath = files.get_temp_file_path_from_name(
         csv_name,
     )
 
     with open(filepath, "w", encoding="utf-8") as f:
-        export_headers = set(chain(
-            default_headers,
-            *custom_headers.values()
-        ))
-        wr = csv.DictWriter(f, fieldnames=export_headers)
-        wr.writeheader()
-        for row in body_rows:
-            wr.writerow(row)
+        f.writelines(iter_import_format_csv(articles))
 
     return filepath, csv_name
 
 
+def stream_using_import_format(articles, filename):
+    """ Streams the Import / Export / Update CSV for the given articles
+    :param articles: A queryset or iterable of articles
+    :param filename: The filename the browser should save the CSV as
+    :return: A StreamingHttpResponse
+    """
+    response = StreamingHttpResponse(
+        iter_import_format_csv(articles),
+        content_type='text/csv',
+    )
+    response['Content-Disposition'] = 'attachment; filename="{}"'.format(
+        filename,
+    )
+    return response
+
+
+def iter_import_format_csv(articles):
+    """ Yields the Import / Export / Update CSV for the given articles
+    Each line is generated as it is consumed, so exports of any size run in
+    constant memory.
+    :param articles: A queryset or iterable of articles
+    :return: A generator of CSV lines
+    """
+    writer = csv.DictWriter(
+        EchoBuffer(),
+        fieldnames=get_import_format_headers(articles),
+    )
+    yield writer.writeheader()
+    for article in iter_planned_articles(articles):
+        for row in generate_rows_for_article(article):
+            yield writer.writerow(row)
+
+
+def get_import_format_headers(articles):
+    """ Returns the default headers followed by those of custom fields
+    :param articles: A queryset or iterable of articles
+    """
+    if isinstance(articles, QuerySet):
+        journal_ids = articles.order_by().values('journal_id')
+    else:
+        journal_ids = {article.journal_id for article in articles}
+    field_names = submission_models.Field.objects.filter(
+        journal_id__in=journal_ids,
+    ).values_list('name', flat=True)
+    default_headers = plugin_settings.UPDATE_CSV_HEADERS
+    return default_headers + sorted(
+        set(field_names).difference(default_headers)
+    )
+
+
+def get_export_articles(journal, stage=None, issue=None):
+    """ Returns the articles of a journal that can be exported
+    :param journal: A journal.models.Journal
+    :param stage: Optional article stage to filter by
+    :param issue: Optional journal.models.Issue to filter by
+    """
+    articles = submission_models.Article.objects.filter(
+        journal=journal,
+    ).exclude(
+        stage=submission_models.STAGE_UNSUBMITTED,
+    ).order_by('pk')
+    if stage:
+        articles = articles.filter(stage=stage)
+    if issue:
+        articles = articles.filter(issues=issue)
+    return articles
+
+
+def plan_delta_export(journal, since=None, stage=None, issue=None):
+    """ Selects the articles changed since a time or the last export run
+    Articles and frozen authors are compared by their last_modified dates.
+    Identifiers and field answers carry no timestamps, so they are compared
+    against the digests recorded by the export run preceding `since`.
+    :param journal: A journal.models.Journal
+    :param since: Optional datetime, defaults to the start of the last run
+        for the journal, stage and issue. Every article is selected if there
+        is none
+    :param stage: Optional article stage to filter by
+    :param issue: Optional journal.models.Issue to filter by
+    :return: A tuple of the changed articles and an unsaved ExportRun, to be
+        saved once the export has been written
+    """
+    started = timezone.now()
+    articles = get_export_articles(journal, stage=stage, issue=issue)
+    runs = models.ExportRun.objects.filter(
+        journal=journal,
+        stage=stage,
+        issue=issue,
+    )
+    if since is None:
+        previous = runs.first()
+        since = previous.started if previous else None
+    else:
+        previous = runs.filter(started__lte=since).first()
+
+    digests = get_article_digests(articles)
+    run = models.ExportRun(
+        journal=journal,
+        stage=stage,
+        issue=issue,
+        since=since,
+        started=started,
+        digests=digests,
+    )
+    if since is None:
+        run.article_count = articles.count()
+        return articles, run
+
+    changed_ids = set(articles.filter(
+        Q(last_modified__gt=since) | Q(frozenauthor__last_modified__gt=since)
+    ).values_list('pk', flat=True))
+    previous_digests = previous.digests if previous else {}
+    for article_id in set(digests).union(previous_digests):
+        if digests.get(article_id) != previous_digests.get(article_id):
+            changed_ids.add(int(article_id))
+
+    changed = articles.filter(pk__in=changed_ids)
+    run.article_count = changed.count()
+    return changed, run
+
+
+def get_article_digests(articles):
+    """ Digests the identifiers and field answers of the given articles
+    :param articles: A queryset of articles
+    :return: A dict of SHA-256 digests keyed by article ID as a string, as
+        stored in ExportRun.digests
+    """
+    identifiers = id_models.Identifier.objects.filter(
+        article__in=articles,
+    ).order_by(
+        'article_id', 'id_type', 'identifier',
+    ).values_list('article_id', 'id_type', 'identifier')
+    field_answers = submission_models.FieldAnswer.objects.filter(
+        article__in=articles,
+    ).order_by(
+        'article_id', 'field__name', 'pk',
+    ).values_list('article_id', 'field__name', 'answer')
+
+    hashes = {}
+    for kind, values in (('identifier', identifiers), ('field', field_answers)):
+        for article_id, *value in values:
+            if article_id not in hashes:
+                hashes[article_id] = hashlib.sha256()
+            hashes[article_id].update(
+                json.dumps([kind] + value).encode('utf-8'),
+            )
+    return {
+        str(article_id): digest.hexdigest()
+        for article_id, digest in hashes.items()
+    }
+
+
+def plan_export_articles(articles):
+    """ Loads everything generate_rows_for_article reads alongside articles
+    :param articles: A queryset of articles
+    :return: The queryset with the related objects joined or prefetched
+    """
+    return articles.select_related(
+        'journal',
+        'section',
+        'license',
+        'primary_issue',
+        'projected_issue',
+        'correspondence_author',
+    ).prefetch_related(
+        'keywords',
+        'authors',
+        'articleauthororder_set',
+        Prefetch(
+            'identifier_set',
+            queryset=id_models.Identifier.objects.order_by('pk'),
+        ),
+        Prefetch(
+            'frozenauthor_set',
+            queryset=submission_models.FrozenAuthor.objects.select_related(
+                'author',
+            ),
+        ),
+        Prefetch(
+            'fieldanswer_set',
+            queryset=submission_models.FieldAnswer.objects.select_related(
+                'field',
+            ),
+        ),
+    )
+
+
+def iter_planned_articles(
+        articles, batch_size=DEFAULT_BATCH_SIZE, plan=plan_export_articles,
+):
+    """ Iterates over articles planned for export in batches
+    QuerySet.iterator() skips prefetch_related, so querysets are read in
+    batches of primary keys instead, each costing a fixed number of queries.
+    :param articles: A queryset or iterable of articles
+    :param batch_size: Number of articles to load per batch
+    :param plan: A function adding the related lookups to a queryset
+    """
+    if not isinstance(articles, QuerySet):
+        yield from articles
+        return
+
+    pks = articles.values_list('pk', flat=True)
+    for batch in chunked(pks.iterator(), batch_size):
+        planned = plan(
+            articles.model.objects.filter(pk__in=batch),
+        ).in_bulk()
+        for pk in batch:
+            yield planned[pk]
+
+
+class EchoBuffer():
+    """ A file-like object that returns what is written to it
+
+    Lets csv writers produce lines for a generator instead of a file.
+    """
+
+    def write(self, value):
+        return value
+
+
 def generate_rows_for_article(article):
     body_rows = []
     row = {}
 
-    if article.issue:
-        issue = article.issue
+    if article.primary_issue:
+        issue = article.primary_issue
     elif article.projected_issue:
         issue = article.projected_issue
     else:
@@ -213,8 +551,9 @@ def generate_rows_for_article(article):
     row['Licence'] = article.license.short_name if article.license else ''
     row['Language'] = article.get_language_display()
     row['Peer reviewed (Y/N)'] = 'Y' if article.peer_reviewed else 'N'
-    row['DOI'] = article.get_doi() if article.get_doi() else ''
-    row['DOI (URL form)'] = "https://doi.org/{}".format(article.get_doi()) if article.get_doi() else ''
+    doi = get_article_doi(article)
+    row['DOI'] = doi if doi else ''
+    row['DOI (URL form)'] = "https://doi.org/{}".format(doi) if doi else ''
     row['Date accepted'] = article.date_accepted.isoformat() if article.date_accepted else ''
     row['Date published'] = article.date_published.isoformat() if article.date_published else ''
     row['Article number'] = article.article_number
@@ -235,12 +574,37 @@ def generate_rows_for_article(article):
 
     export_custom_submission_fields(row, article)
 
-    if article.frozen_authors():
-        author_list = article.frozen_authors()
+    authors, frozen = get_ordered_authors(article)
+    for author in authors:
+        row = add_author_information(row, author, frozen, article)
+        body_rows.append(row)
+        row = {}
+
+    # Handle article with no authors
+    if not authors:
+        body_rows.append(row)
+
+    return body_rows
+
+
+def get_ordered_authors(article):
+    """ Returns the article's authors in order
+    Frozen authors are used if the article has any, otherwise its accounts.
+    :param article: A submission.models.Article
+    :return: A tuple of the list of authors and whether they are frozen
+    """
+    # Read through the reverse relations so that prefetched rows are used
+    frozen_authors = article.frozenauthor_set.all()
+    if frozen_authors:
+        author_list = frozen_authors
         frozen = True
     else:
         author_list = article.authors.all()
         frozen = False
+        author_orders = {
+            author_order.author_id: author_order.order
+            for author_order in article.articleauthororder_set.all()
+        }
 
     author_dict = {}
 
@@ -248,29 +612,95 @@ def generate_rows_for_article(article):
         if frozen:
             order = author.order
         else:
-            try:
-                order = submission_models.ArticleAuthorOrder.objects.get(
-                    article=article,
-                    author=author
-                ).order
-            except submission_models.ArticleAuthorOrder.DoesNotExist:
+            order = author_orders.get(author.pk)
+            if order is None:
                 order = next(filterfalse(
                     set(author_dict.keys()).__contains__,
                     count(1)
                 ))
         author_dict[order] = author
 
-    for order in sorted(list(author_dict.keys())):
-        author = author_dict[order]
-        row = add_author_information(row, author, frozen, article)
-        body_rows.append(row)
-        row = {}
+    return [author_dict[order] for order in sorted(author_dict)], frozen
 
-    # Handle article with no authors
-    if not author_dict:
-        body_rows.append(row)
 
-    return body_rows
+def iter_jsonl_export(articles):
+    """ Yields one JSON document per article, with nested authors, keywords,
+    identifiers and custom field answers
+    Articles are read in the same planned batches as the CSV export.
+    :param articles: A queryset or iterable of articles
+    :return: A generator of newline terminated JSON lines
+    """
+    for article in iter_planned_articles(articles):
+        yield json.dumps(
+            article_export_record(article),
+            cls=DjangoJSONEncoder,
+        ) + '\n'
+
+
+def article_export_record(article):
+    """ Returns the metadata of an article as a JSON serialisable dict"""
+    issue = article.primary_issue or article.projected_issue
+    authors, frozen = get_ordered_authors(article)
+    return {
+        'id': article.pk,
+        'journal': article.journal.code,
+        'title': article.title,
+        'abstract': article.abstract,
+        'section': article.section.name if article.section else None,
+        'stage': article.stage,
+        'language': article.language,
+        'licence': article.license.short_name if article.license else None,
+        'rights': article.rights,
+        'peer_reviewed': article.peer_reviewed,
+        'date_accepted': article.date_accepted,
+        'date_published': article.date_published,
+        'article_number': article.article_number,
+        'first_page': article.first_page,
+        'last_page': article.last_page,
+        'page_numbers': article.page_numbers,
+        'competing_interests': article.competing_interests,
+        'journal_title_override': article.publication_title,
+        'issn_override': article.ISSN_override,
+        'issue': {
+            'volume': issue.volume,
+            'issue': issue.issue,
+            'title': issue.issue_title,
+            'date': issue.date,
+        } if issue else None,
+        'doi': get_article_doi(article),
+        'identifiers': [
+            {'type': identifier.id_type, 'identifier': identifier.identifier}
+            for identifier in article.identifier_set.all()
+        ],
+        'keywords': [keyword.word for keyword in article.keywords.all()],
+        'authors': [
+            author_export_record(author, frozen, article)
+            for author in authors
+        ],
+        'fields': {
+            field_answer.field.name: field_answer.answer
+            for field_answer in article.fieldanswer_set.all()
+        },
+    }
+
+
+def author_export_record(author, frozen, article):
+    """ Returns the author columns of the CSV export as a dict"""
+    row = add_author_information({}, author, frozen, article)
+    record = {
+        key: row[header] for header, key in AUTHOR_RECORD_KEYS.items()
+    }
+    record['is_primary'] = row['Author is primary (Y/N)'] == 'Y'
+    record['is_corporate'] = row['Author is corporate (Y/N)'] == 'Y'
+    return record
+
+
+def get_article_doi(article):
+    """ Returns the article's DOI, read from its identifier_set"""
+    for identifier in article.identifier_set.all():
+        if identifier.id_type == 'doi':
+            return identifier.identifier
+    return None
 
 
 def export_custom_submission_fields(row, article):
@@ -278,21 +708,168 @@ def export_custom_submission_fields(row, article):
         row[field_answer.field.name] = field_answer.answer
 
 
-def zip_export_files(journal, articles, csv_path):
+def zip_export_files(journal, articles, cache=None, filters=None):
+    """ Streams a zip of the import-format CSV and the articles' export files
+    :param journal: The journal being exported
+    :param articles: A queryset of articles
+    :param cache: Optional ExportArtifactCache. A cached archive is served
+        if nothing exported has changed since it was built
+    :param filters: A dict of the filters used to select the articles, part
+        of the cache key
+    :return: A StreamingHttpResponse
+    """
     zip_file_name = 'export_{}_csv.zip'.format(journal.code)
-    zip_path = os.path.join(files.TEMP_DIR, zip_file_name)
-    zip_file = zipfile.ZipFile(zip_path, mode='w')
+    cache_key = None
+    if cache:
+        cache_key = cache.key(journal, articles, filters)
+        cached_path = cache.get(cache_key)
+        if cached_path:
+            return FileResponse(
+                open(cached_path, 'rb'),
+                as_attachment=True,
+                filename=zip_file_name,
+                content_type='application/zip',
+            )
 
-    zip_file.write(
-        csv_path,
-        'article_data.csv'
-    )
-    for article in articles:
-        for export_file in article.export_files:
-            zip_file.write(
+    def chunks(writer):
+        yield from writer.write_lines(
+            'article_data.csv',
+            iter_import_format_csv(articles),
+        )
+        export_files = models.ExportFile.objects.filter(
+            article__in=articles,
+        ).select_related('file')
+        for export_file in export_files.iterator():
+            yield from writer.write_file(
                 export_file.file.self_article_path(),
-                '{}/{}'.format(article.pk, export_file.file.original_filename),
+                '{}/{}'.format(
+                    export_file.article_id,
+                    export_file.file.original_filename,
+                ),
             )
 
-    zip_file.close()
-    return files.serve_temp_file(zip_path, zip_file_name)
+    return stream_zip(
+        chunks,
+        zip_file_name,
+        cache=cache,
+        cache_key=cache_key,
+    )
+
+
+def get_export_watermark(journal, articles):
+    """ Returns a summary of the last changes to the given articles
+    Timestamped rows are summarised with aggregates. Changes to identifiers,
+    field answers, keywords and authors touch the article's last_modified.
+    Sections, licences and issues are covered by the journal's
+    ExportCacheGeneration row, so computing the watermark costs a fixed
+    number of queries.
+    :param journal: The journal being exported
+    :param articles: A queryset of articles
+    :return: A JSON serialisable dict
+    """
+    return {
+        'articles': articles.aggregate(
+            count=Count('pk'),
+            last_modified=Max('last_modified'),
+        ),
+        'frozen_authors': submission_models.FrozenAuthor.objects.filter(
+            article__in=articles,
+        ).aggregate(
+            count=Count('pk'),
+            last_modified=Max('last_modified'),
+        ),
+        'files': models.ExportFile.objects.filter(
+            article__in=articles,
+        ).aggregate(
+            count=Count('pk'),
+            last_modified=Max('file__last_modified'),
+        ),
+        'generation': models.ExportCacheGeneration.objects.filter(
+            journal=journal,
+        ).values_list('changed', flat=True).first(),
+    }
+
+
+class ExportArtifactCache():
+    """ A directory of export archives keyed by the state they were built from
+
+    Archives are evicted least recently used first once the directory grows
+    past max_bytes. Serving an archive marks it as used by touching it.
+    """
+
+    def __init__(
+            self, directory=EXPORT_CACHE_DIR, max_bytes=EXPORT_CACHE_MAX_BYTES,
+    ):
+        """
+        :param directory: Directory holding the cached archives, created if
+            it doesn't exist
+        :param max_bytes: Size the directory is trimmed to after each store
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, journal, articles, filters=None):
+        """ Returns the cache key for an export of the given articles
+        :param journal: The journal being exported
+        :param articles: A queryset of articles
+        :param filters: A dict of the filters used to select the articles
+        """
+        state = json.dumps(
+            [journal.pk, filters or {}, get_export_watermark(journal, articles)],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(state.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, '{}.zip'.format(key))
+
+    def get(self, key):
+        """ Returns the path of the cached archive for the key or None"""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def store(self, key, chunks):
+        """ Caches an archive as it is streamed
+        The archive is only added once every chunk has been consumed, so an
+        interrupted download leaves nothing behind.
+        :param key: The cache key
+        :param chunks: An iterable of bytes
+        :return: A generator of the same chunks
+        """
+        temp_path = os.path.join(
+            self.directory, '{}.part'.format(uuid.uuid4().hex),
+        )
+        try:
+            with open(temp_path, 'wb') as cached:
+                for chunk in chunks:
+                    cached.write(chunk)
+                    yield chunk
+            os.replace(temp_path, self.path(key))
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        self.evict()
+
+    def evict(self):
+        """ Removes the least recently used archives over max_bytes"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.zip'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
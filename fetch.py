@@ -0,0 +1,175 @@
+"""
+Concurrent downloading of the remote files referenced by CSV imports.
+
+Galley URIs are handed to a URIPrefetcher ahead of the database work, which
+downloads them on a bounded pool of threads sharing a keep-alive session and
+spools them to temporary files. The importers then consume the local copies.
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import os
+import tempfile
+import threading
+from urllib.parse import urlparse
+import uuid
+
+from django.conf import settings
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CHUNK_SIZE = 64 * 1024
+
+# A spooled download. `headers` lets it stand in for a response when
+# parsing the filename out of the Content-Disposition header.
+Prefetched = namedtuple('Prefetched', ('path', 'url', 'headers'))
+
+
+def is_remote_uri(uri):
+    return bool(uri) and urlparse(uri).scheme in {"http", "https"}
+
+
+class URIPrefetcher():
+    """ Downloads remote URIs concurrently, spooling them to temp files
+
+    Use as a context manager so the pool, session and spooled files are
+    cleaned up:
+
+        with URIPrefetcher() as prefetcher:
+            prefetcher.prefetch(uris)
+            prefetched = prefetcher.get(uri)
+            prefetcher.release(uris)
+
+    Each URI is downloaded once however many times it is prefetched, and its
+    spooled copy is kept until it has been released as many times.
+    """
+
+    def __init__(
+            self, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+            retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, headers=None,
+    ):
+        """
+        :param workers: Number of downloads to run at once
+        :param per_host: Maximum number of concurrent downloads per host
+        :param retries: Times to retry a download that failed to connect or
+            returned one of RETRY_STATUSES
+        :param backoff: Backoff factor between retries, in seconds
+        :param headers: Headers to send with every request
+        """
+        self.per_host = per_host
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(
+            pool_connections=workers,
+            pool_maxsize=workers,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=backoff,
+                status_forcelist=RETRY_STATUSES,
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._futures = {}
+        self._refs = {}
+        self._host_limits = {}
+        self._lock = threading.Lock()
+        self._temp_dir = tempfile.TemporaryDirectory(
+            dir=os.path.join(settings.BASE_DIR, 'files/temp'),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def prefetch(self, uris):
+        """ Starts downloading the given URIs in the background
+        Non remote URIs are ignored and URIs already being downloaded are
+        not downloaded again.
+        :param uris: An iterable of URIs
+        """
+        for uri in uris:
+            if not is_remote_uri(uri):
+                continue
+            if uri not in self._futures:
+                self._futures[uri] = self._executor.submit(self._download, uri)
+            self._refs[uri] = self._refs.get(uri, 0) + 1
+
+    def get(self, uri):
+        """ Returns the spooled copy of a URI, waiting for it if needed
+        URIs that were not prefetched are downloaded straight away and kept
+        until they are released or the prefetcher is closed.
+        :param uri: A remote URI
+        :return: A Prefetched tuple
+        :raises: requests.exceptions.RequestException if the download failed
+        """
+        if uri not in self._futures:
+            self.prefetch([uri])
+        return self._futures[uri].result()
+
+    def release(self, uris):
+        """ Removes the spooled copies of the given URIs once unused
+        Downloads that are still queued are cancelled and those in progress
+        are removed as soon as they finish.
+        :param uris: An iterable of URIs, as passed to prefetch
+        """
+        for uri in uris:
+            if uri not in self._refs:
+                continue
+            self._refs[uri] -= 1
+            if self._refs[uri] > 0:
+                continue
+            del self._refs[uri]
+            future = self._futures.pop(uri)
+            if not future.cancel():
+                future.add_done_callback(_remove_spool)
+
+    def close(self):
+        for future in self._futures.values():
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        self._futures = {}
+        self._refs = {}
+        self.session.close()
+        self._temp_dir.cleanup()
+
+    def _host_limit(self, uri):
+        host = urlparse(uri).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(
+                    self.per_host)
+            return self._host_limits[host]
+
+    def _download(self, uri):
+        path = os.path.join(self._temp_dir.name, uuid.uuid4().hex)
+        with self._host_limit(uri):
+            logger.debug("Fetching %s", uri)
+            with self.session.get(uri, stream=True) as response:
+                response.raise_for_status()
+                with open(path, "wb") as spool:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        spool.write(chunk)
+        return Prefetched(path, uri, response.headers)
+
+
+def _remove_spool(future):
+    if future.exception() is None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(future.result().path)
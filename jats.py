@@ -1,18 +1,17 @@
 """
 Set of functions for importing articles from JATS XML
 """
-import datetime
 import hashlib
 import mimetypes
 import os
-import tempfile
 import traceback
 import uuid
-import zipfile
 import json
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 
-from bs4 import BeautifulSoup
 from django.conf import settings
 from django.core.files.base import ContentFile
 from django.db import transaction
@@ -33,11 +32,24 @@ from review import models as review_models
 from review.const import VisibilityOptions as VO
 from identifiers.models import DOI_REGEX_PATTERN
 
-from plugins.imports import common
+from plugins.imports import common, fetch, models
+from plugins.imports.bundles import ZipBundleReader
+from plugins.imports.jats_metadata import (
+    fingerprint_jats,
+    get_jats_article_metadata,
+    get_jats_preprint_metadata,
+    parse_jats_article,
+)
 from plugins.imports.utils import DummyRequest
 
 logger = get_logger(__name__)
 
+FINGERPRINT_CHUNK_SIZE = 64 * 1024
+
+
+def open_binary(path):
+    return open(path, 'rb')
+
 
 def import_jats_article(
         jats_contents, journal=None,
@@ -48,321 +60,290 @@ def import_jats_article(
     :param jats_contents: (str) the JATS XML to be imported
     :param journal: Journal in which to import the article
     """
-    jats_soup = BeautifulSoup((jats_contents), 'lxml')
-    metadata_soup = jats_soup.find("article-meta")
-    if not metadata_soup:
-        err = ValueError("Invalid JATS-XML or no <article-meta> found")
-        logger.exception(err)
-        raise err
-    if not owner:
-        owner = Account.objects.get(pk=1)
-
-    # Gather metadata
-    meta = {}
-    meta["journal"] = get_jats_journal_metadata(jats_soup)
-    meta["title"] = get_jats_title(metadata_soup)
-    meta["abstract"] = get_jats_abstract(metadata_soup)
-    meta["issue"], meta["volume"] = get_jats_issue(jats_soup)
-    meta["issue_doi"] = get_jats_issue_doi(jats_soup)
-    meta["keywords"] = get_jats_keywords(metadata_soup)
-    meta["section_name"] = get_jats_section_name(jats_soup)
-    meta["date_published"] = get_jats_pub_date(jats_soup) or datetime.date.today()
-    meta["license_url"], meta["license_text"] = get_jats_license(jats_soup)
-    meta["rights"] = get_jats_rights_statement(jats_soup)
-    meta["authors"] = []
-    meta["date_submitted"] = None
-    meta["date_accepted"] = None
-    try:
-        meta["first_page"] = int(metadata_soup.find("fpage").text)
-    except (ValueError, AttributeError):
-        meta["first_page"] = None
-    try:
-        meta["last_page"] = int(metadata_soup.find("lpage").text)
-    except (ValueError, AttributeError):
-        meta["last_page"] = None
-    history_soup = metadata_soup.find("history")
-
-    if history_soup:
-        meta["date_submitted"] = get_jats_sub_date(history_soup)
-        meta["date_accepted"] = get_jats_acc_date(history_soup)
-
-    authors_soup = metadata_soup.find("contrib-group")
-    author_notes = metadata_soup.find("author_notes")
-    if authors_soup:
-        meta["authors"] = get_jats_authors(
-            authors_soup,
-            metadata_soup,
-            author_notes,
-        )
-
-    meta["identifiers"] = get_jats_identifiers(metadata_soup)
-
+    meta = get_jats_article_metadata(jats_contents)
     if not persist:
         return meta
-    else:
-        # Persist Article
-        article = save_article(meta, journal, owner=owner, stage=stage)
-        # Save Galleys
-        for galley in article.galley_set.all():
-            galley.delete()
-        if not isinstance(jats_contents, bytes):
-            jats_contents = jats_contents.encode("utf-8")
-        xml_file = ContentFile(jats_contents)
-        xml_file.name = filename or uuid.uuid4()
-        request = request or DummyRequest(owner)
-        galley = save_galley(article, request, xml_file, True, "XML")
+    return save_jats_article(
+        meta, jats_contents, journal, filename, owner, images,
+        request=request, stage=stage,
+    )
+
+
+def save_jats_article(
+        meta, jats_contents, journal=None, filename=None, owner=None,
+        images=None, request=None, stage=None, open_file=open_binary,
+        references=None,
+):
+    """ Persists an article and its XML galley from its JATS metadata
+    :param meta: The metadata returned by get_jats_article_metadata
+    :param jats_contents: (str or bytes) the JATS XML the metadata came from
+    :param journal: Journal in which to import the article
+    :param open_file: Callable opening the paths of local images in binary
+        mode
+    :param references: Optional JATSReferences shared by a batch of imports
+    :return: An instance of submission.models.Article
+    """
+    if not owner:
+        owner = Account.objects.get(pk=1)
+    article = save_article(
+        meta, journal, owner=owner, stage=stage, references=references,
+    )
+    # Save Galleys
+    for galley in article.galley_set.all():
+        galley.delete()
+    if not isinstance(jats_contents, bytes):
+        jats_contents = jats_contents.encode("utf-8")
+    xml_file = ContentFile(jats_contents)
+    xml_file.name = filename or uuid.uuid4()
+    request = request or DummyRequest(owner)
+    galley = save_galley(article, request, xml_file, True, "XML")
 
     if images:
-        load_jats_images(images, galley, request)
+        load_jats_images(images, galley, request, open_file=open_file)
     return article
 
 
-def import_jats_zipped(zip_file, journal=None, owner=None, persist=True, stage=None):
+def import_jats_zipped(
+        zip_file, journal=None, owner=None, persist=True, stage=None,
+        progress_callback=None, workers=None,
+):
     """ Import a batch of Zipped JATS articles and their associated files
+    Files are read straight from the archive as they are needed, it is never
+    extracted to disk. With more than one worker, the JATS files are parsed
+    by a pool of processes while the articles are saved, in order, by this
+    process.
     :param zip_file: The zipped jats to be imported
     :param journal: Journal in which to import the articles
     :param owner: An instance of core.models.Account
+    :param progress_callback: Optional callable, called with the number of
+        articles imported and the errors so far after every article
+    :param workers: Number of processes parsing JATS files
     """
     errors = []
     articles = []
-    jats_files_info = []
-    image_map = {}
-    temp_path = os.path.join(settings.BASE_DIR, 'files/temp')
-    with zipfile.ZipFile(zip_file, 'r') as zf:
-        with tempfile.TemporaryDirectory(dir=temp_path) as temp_dir:
-            zf.extractall(path=temp_dir)
-
-            for root, dirs, filenames in os.walk(temp_dir):
-                try:
-                    jats_path = jats_filename = pdf_path = pdf_filename = None
-                    supplements = []
-
-                    for filename in filenames:
-                        mimetype, _ = mimetypes.guess_type(filename)
-                        file_path = os.path.join(root, filename)
-                        if mimetype in files.XML_MIMETYPES:
-                            jats_path = file_path
-                            jats_filename = filename
-                        elif mimetype in files.PDF_MIMETYPES:
-                            pdf_path = file_path
-                            pdf_filename = filename
-                        else:
-                            supplements.append(file_path)
-
-
-                    if jats_path:
-                        # Check nested dirs relative to xml like ./figures
-                        for dir_ in dirs:
-                            dir_path = os.path.join(root, dir_)
-                            for filename in os.listdir(dir_path):
-                                mimetype, _ = mimetypes.guess_type(filename)
-                                file_path = os.path.join(dir_path, filename)
-                                supplements.append(file_path)
-
-                        logger.info("[JATS] Importing from %s", jats_path)
-                        with open(jats_path, 'r') as jats_file:
-                            article = import_jats_article(
-                                jats_file.read(), journal, persist,
-                                jats_filename, owner, supplements,
-                                stage=stage,
-                            )
-                            articles.append((jats_filename, article))
-                        if pdf_path:
-                            import_pdf(article, pdf_path, pdf_filename)
-                except Exception as err:
-                    logger.warning(err)
-                    logger.warning(traceback.format_exc())
-                    errors.append((filenames, err))
+    references = JATSReferences()
+    with ZipBundleReader(zip_file) as bundle_reader:
+        bundles = []
+        for root, dirs, filenames in bundle_reader.walk():
+            jats_path = jats_filename = pdf_path = pdf_filename = None
+            supplements = []
+
+            for filename in filenames:
+                mimetype, _ = mimetypes.guess_type(filename)
+                file_path = bundle_reader.member(root, filename)
+                if mimetype in files.XML_MIMETYPES:
+                    jats_path = file_path
+                    jats_filename = filename
+                elif mimetype in files.PDF_MIMETYPES:
+                    pdf_path = file_path
+                    pdf_filename = filename
+                else:
+                    supplements.append(file_path)
+
+            if jats_path:
+                # Check nested dirs relative to xml like ./figures
+                for dir_ in dirs:
+                    dir_path = bundle_reader.member(root, dir_)
+                    for filename in bundle_reader.filenames(dir_path):
+                        file_path = bundle_reader.member(dir_path, filename)
+                        supplements.append(file_path)
+                bundles.append((
+                    jats_path, jats_filename, pdf_path, pdf_filename,
+                    supplements, filenames,
+                ))
+
+        parsed = parse_jats_documents(
+            (bundle_reader.read(bundle[0]) for bundle in bundles),
+            parse_jats_article if persist else get_jats_article_metadata,
+            workers=workers,
+        )
+        for bundle, (result, parse_error) in zip(bundles, parsed):
+            jats_path, jats_filename, pdf_path, pdf_filename, \
+                supplements, filenames = bundle
+            try:
+                if parse_error:
+                    raise parse_error
+                if persist:
+                    meta, raw_sha256 = result
+                    article = sync_jats_article(
+                        meta, raw_sha256, jats_path, pdf_path, supplements,
+                        journal, owner, stage=stage,
+                        open_file=bundle_reader.open,
+                        references=references,
+                    )
+                else:
+                    logger.info("[JATS] Importing from %s", jats_path)
+                    article = result
+                articles.append((jats_filename, article))
+            except Exception as err:
+                logger.warning(err)
+                logger.warning(traceback.format_exc())
+                errors.append((filenames, err))
+
+            if progress_callback:
+                progress_callback(len(articles), errors)
 
     return articles, errors
 
 
-def get_jats_journal_metadata(soup):
-    journal_metadata = {}
-    journal_soup = soup.find("journal-meta")
-    if journal_soup:
-        # Journal code
-        id_soup = journal_soup.find(
-            "journal-id", {"journal-id-type": "publisher-id"})
-        if id_soup:
-            journal_metadata["code"] = id_soup.text
+def sync_jats_article(
+        meta, raw_sha256, jats_path, pdf_path=None, supplements=None,
+        journal=None, owner=None, stage=None, open_file=open_binary,
+        references=None,
+):
+    """ Imports a JATS article, skipping what hasn't changed since last time
+    Articles are matched by journal and DOI to the JATSFingerprint recorded
+    when they were last imported. The XML is only canonicalised when its
+    bytes changed, to tell a reserialised document from an edited one. If
+    the XML is unchanged, only the PDF and images whose contents changed are
+    reloaded and an unchanged article is skipped altogether. Otherwise the
+    article is imported in full.
+    :param meta: The metadata returned by get_jats_article_metadata
+    :param raw_sha256: The SHA-256 of the JATS XML returned by
+        parse_jats_article
+    :param jats_path: Path to the JATS XML
+    :param pdf_path: Optional path to the PDF of the article
+    :param supplements: Paths to the images of the article
+    :param open_file: Callable opening the paths in binary mode
+    :return: An instance of submission.models.Article
+    """
+    supplements = supplements or []
+    assets = {
+        os.path.basename(path): fingerprint_file(path, open_file)
+        for path in supplements + [pdf_path] if path
+    }
+    if references is None:
+        references = JATSReferences()
+    journal = references.get_import_journal(meta, journal)
+    fingerprint = get_jats_fingerprint(meta, journal, stage=stage)
+    xml_sha256 = xml_galley = None
+    if fingerprint:
+        if fingerprint.raw_sha256 == raw_sha256:
+            xml_sha256 = fingerprint.xml_sha256
         else:
-            abbrev_soup = journal_soup.find("abbrev-journal-title")
-            if abbrev_soup:
-                journal_metadata["code"] = abbrev_soup.text
-
-        # Journal title
-        title_soup = journal_soup.find("journal-title")
-        if title_soup:
-            journal_metadata["title"] = title_soup.text
-        issn_soup = journal_soup.find("issn")
-        if issn_soup:
-            journal_metadata["issn"] = issn_soup.text
-    return journal_metadata
-
-
-def get_jats_title(soup):
-    title_soup = soup.find("article-title")
-    italics = None
-    if title_soup:
-        title_str = "".join(str(child) for child in title_soup.children)
-        clean_title = title_str.replace(
-            "italic>", "i>",
-        ).replace(
-            "bold>", "b>",
-        )
-        return clean_title
-    else:
-        return "[Untitled]"
-
-
-def get_jats_abstract(soup):
-    abstract = soup.find("abstract")
-    if abstract:
-        return abstract.text
-    else:
-        return ""
-
-
-def get_jats_issue(soup):
-    issue = soup.find("issue")
-    issue = issue.text if issue else 0
-
-    volume = soup.find("volume")
-    volume = volume.text if volume else 0
-
-    return (int(issue), int(volume))
-
-
-def get_jats_issue_doi(soup):
-    issue_doi_soup = soup.find("issue-id", attrs={"pub-id-type": "doi"})
-    if issue_doi_soup:
-        return issue_doi_soup.text
-    return None
-
-
-def get_jats_pub_date(soup):
-    pub_date_soup = soup.find("pub-date", attrs={'date-type': 'pub'})
-    if not pub_date_soup:
-        pub_date_soup = soup.find("pub-date")
-
-    if pub_date_soup:
-        day = pub_date_soup.find("day")
-        day = day.text if day else 1
-
-        month = pub_date_soup.find("month")
-        month = month.text if month else 1
-
-        year = pub_date_soup.find("year").text
-
-        return datetime.date(day=int(day), month=int(month), year=int(year))
-    else:
-        return None
-
-
-def get_jats_sub_date(soup):
-    sub_date_soup = soup.find("date", {"date-type": "received"})
-    if sub_date_soup:
-        day = sub_date_soup.find("day")
-        day = day.text if day else 1
-
-        month = sub_date_soup.find("month")
-        month = month.text if month else 1
-
-        year = sub_date_soup.find("year").text
-
-        return datetime.date(day=int(day), month=int(month), year=int(year))
+            with open_file(jats_path) as jats_file:
+                xml_sha256 = fingerprint_jats(jats_file.read())
+        if fingerprint.xml_sha256 == xml_sha256:
+            xml_galley = fingerprint.article.galley_set.filter(
+                type="xml").first()
+
+    if xml_galley:
+        article = fingerprint.article
+        changed = fingerprint.changed_assets(assets)
+        if not changed:
+            logger.info("[JATS] Skipping unchanged %s", jats_path)
+            return article
+        logger.info(
+            "[JATS] Updating %s from %s", ", ".join(sorted(changed)), jats_path)
+        images = [
+            path for path in supplements
+            if os.path.basename(path) in changed
+        ]
+        if images:
+            request = DummyRequest(owner or Account.objects.get(pk=1))
+            load_jats_images(images, xml_galley, request, open_file=open_file)
+        if pdf_path and os.path.basename(pdf_path) in changed:
+            import_pdf(
+                article, pdf_path, os.path.basename(pdf_path),
+                open_file=open_file,
+            )
     else:
-        return None
-
-
-def get_jats_acc_date(soup):
-    acc_date_soup = soup.find("date", {"date-type": "accepted"})
-    if acc_date_soup:
-        day = acc_date_soup.find("day")
-        day = day.text if day else 1
+        logger.info("[JATS] Importing from %s", jats_path)
+        with open_file(jats_path) as jats_file:
+            jats_contents = jats_file.read()
+        if xml_sha256 is None:
+            xml_sha256 = fingerprint_jats(jats_contents)
+        article = save_jats_article(
+            meta, jats_contents, journal,
+            os.path.basename(jats_path), owner, supplements,
+            stage=stage, open_file=open_file, references=references,
+        )
+        if pdf_path:
+            import_pdf(
+                article, pdf_path, os.path.basename(pdf_path),
+                open_file=open_file,
+            )
 
-        month = acc_date_soup.find("month")
-        month = month.text if month else 1
+    models.JATSFingerprint.objects.update_or_create(
+        article=article,
+        defaults={
+            "raw_sha256": raw_sha256,
+            "xml_sha256": xml_sha256,
+            "assets": assets,
+        },
+    )
+    return article
 
-        year = acc_date_soup.find("year").text
 
-        return datetime.date(day=int(day), month=int(month), year=int(year))
-    else:
+def get_jats_fingerprint(meta, journal, stage=None):
+    """ Returns the fingerprint of the article a JATS import would update
+    :param meta: The metadata returned by get_jats_article_metadata
+    :param journal: The journal the article is imported into
+    :param stage: Optional stage the article is imported into
+    :return: An instance of JATSFingerprint or None
+    """
+    doi = meta["identifiers"]["doi"]
+    if not doi:
         return None
-
-
-def get_jats_keywords(soup):
-    jats_keywords_soup = soup.find("kwd-group")
-    if jats_keywords_soup:
-        return {
-            keyword.text.strip()
-            for keyword in jats_keywords_soup.find_all("kwd")
-        }
-    else:
-        return set()
-
-
-def get_jats_section_name(soup):
-    return soup.find("article").attrs.get("article-type")
-
-
-def get_jats_authors(soup, metadata_soup, author_notes=None):
-    authors = []
-    for author in soup.find_all("contrib", {"contrib-type": "author"}):
-        institution = None
-        if author.find("aff"):
-            institution = author.find("aff").text
-
-
-        # in some cases the aff may be outside <contrib> in this case
-        # we can look for something like:
-        # <xref ref-type="aff" rid="aff1">1</xref>
-
-        if not institution:
-            aff_xref = author.find('xref', {'ref-type': 'aff'})
-            if aff_xref:
-                aff_id = aff_xref.get('rid')
-                if aff_id:
-                    aff = metadata_soup.find('aff', {'id': aff_id})
-                    if aff:
-                        try:
-                            aff.find('label').decompose()
-                        except AttributeError:
-                            pass
-                        institution = aff.text.strip()
-
-        if author.find("surname"):
-            email_jats = author.find("email")
-            email = None
-            if email_jats:
-                email = email_jats.text
-            author_data = {
-                "first_name": author.find("given-names").text,
-                "last_name": author.find("surname").text,
-                "email": email,
-                "correspondence": False,
-                "institution": institution,
-                "orcid": get_orcid(author),
-            }
-            if author.attrs.get("corresp") == "yes" and author_notes:
-                author_data["correspondence"] = True
-                corresp_email = author_notes.find("email")
-                if corresp_email:
-                    author_data["email"] = corresp_email.text
-            authors.append(author_data)
-    return authors
-
-
-def get_orcid(author_soup):
-    contrib_ids = author_soup.findAll('contrib-id')
-    for ci in contrib_ids:
-        if ci.attrs.get('contrib-id-type') == 'orcid':
-            orcid = ci.text
-            if orcid.startswith('https://'):
-                orcid = orcid.replace('https://orcid.org/', '')
-            return orcid
-    return None
+    fingerprints = models.JATSFingerprint.objects.select_related(
+        "article",
+    ).filter(
+        article__journal=journal,
+        article__identifier__id_type="doi",
+        article__identifier__identifier=doi,
+    )
+    if stage:
+        fingerprints = fingerprints.filter(article__stage=stage)
+    return fingerprints.first()
+
+
+def fingerprint_file(path, open_file=open_binary):
+    digest = hashlib.sha256()
+    with open_file(path) as f:
+        for chunk in iter(lambda: f.read(FINGERPRINT_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_jats_documents(documents, parser, workers=None, mp_context=None):
+    """ Parses JATS documents, optionally on a pool of worker processes
+    Up to twice as many documents as workers are parsed ahead of the one
+    being consumed, so the metadata is yielded in the same order as the
+    documents.
+    :param documents: An iterable of JATS XML documents as bytes
+    :param parser: A function from plugins.imports.jats_metadata taking a
+        document and returning its metadata. Workers import it without
+        setting Django up, so they work with any start method.
+    :param workers: Number of worker processes. Documents are parsed in this
+        process when it is not greater than one.
+    :param mp_context: Optional multiprocessing context of the workers
+    :return: A generator of (metadata, exception) tuples, one of which is None
+    """
+    if not workers or workers < 2:
+        for document in documents:
+            try:
+                yield parser(document), None
+            except Exception as err:
+                yield None, err
+        return
+
+    pending = deque()
+    with ProcessPoolExecutor(
+            max_workers=workers, mp_context=mp_context,
+    ) as executor:
+        for document in documents:
+            pending.append(executor.submit(parser, document))
+            if len(pending) >= workers * 2:
+                yield _parsed_result(pending.popleft())
+        while pending:
+            yield _parsed_result(pending.popleft())
+
+
+def _parsed_result(future):
+    try:
+        return future.result(), None
+    except Exception as err:
+        return None, err
 
 
 def get_article(id_soup, journal):
@@ -381,19 +362,142 @@ def get_article(id_soup, journal):
         return article
 
 
-def save_article(metadata, journal=None, issue=None, owner=None, stage=None):
-    if not journal and metadata["journal"] and metadata["journal"].get("code"):
-        journal = get_or_create_journal(metadata)
-    elif not journal:
-        journal = get_lost_found_journal()
+class JATSReferences():
+    """ Batch scoped lookups for JATS imports
 
-    with transaction.atomic():
-        section, _ = submission_models.Section.objects \
-            .get_or_create(
+    Memoises the journals, sections, licences, issue types, issues and
+    keywords resolved while importing a batch of articles, so that articles
+    from the same journal don't repeat the same queries. Lookups made inside
+    atomic() are staged and only kept once the block succeeds, so rows
+    created by an article that is rolled back are never served to the next
+    one.
+    """
+
+    def __init__(self):
+        # The first layer holds committed lookups, each atomic() block
+        # stages its own on top of it
+        self._layers = [{}]
+
+    @contextmanager
+    def atomic(self):
+        """ Runs a transaction, forgetting its lookups if it is rolled back"""
+        self._layers.append({})
+        try:
+            with transaction.atomic():
+                yield
+        except Exception:
+            self._layers.pop()
+            raise
+        staged = self._layers.pop()
+        self._layers[-1].update(staged)
+
+    def get_journal(self, metadata):
+        journal_metadata = metadata["journal"]
+        key = (
+            journal_metadata["code"],
+            journal_metadata.get("issn"),
+            journal_metadata.get("title"),
+        )
+        return self._memoise(
+            "journals", key, lambda: get_or_create_journal(metadata))
+
+    def get_lost_found_journal(self):
+        return self._memoise("journals", None, get_lost_found_journal)
+
+    def get_import_journal(self, metadata, journal=None):
+        """ Returns the journal an article is imported into
+        Defaults to the journal named by the metadata or the lost and found
+        journal when it names none.
+        """
+        if journal:
+            return journal
+        if metadata["journal"] and metadata["journal"].get("code"):
+            return self.get_journal(metadata)
+        return self.get_lost_found_journal()
+
+    def get_section(self, journal, name):
+        return self._memoise(
+            "sections", (journal.pk, name),
+            lambda: submission_models.Section.objects.get_or_create(
+                journal=journal,
+                name=name,
+            )[0],
+        )
+
+    def get_licence(self, journal, url, text=None):
+        def get_or_create():
+            try:
+                return submission_models.Licence.objects.get(
+                    url=url, journal=journal,
+                )
+            except submission_models.Licence.DoesNotExist:
+                return submission_models.Licence.objects.create(
+                    url=url,
+                    journal=journal,
+                    short_name=url[-14:],
+                    name="Imported License",
+                    text=text,
+                )
+        return self._memoise("licences", (journal.pk, url), get_or_create)
+
+    def get_issue_type(self, journal):
+        return self._memoise(
+            "issue_types", journal.pk,
+            lambda: journal_models.IssueType.objects.get(
+                code="issue",
                 journal=journal,
-                name=metadata["section_name"],
+            ),
         )
-        section.save()
+
+    def get_issue(self, journal, metadata, date):
+        def get_or_create():
+            return journal_models.Issue.objects.get_or_create(
+                volume=metadata["volume"],
+                issue=metadata["issue"],
+                journal=journal,
+                defaults={
+                    "issue_type": self.get_issue_type(journal),
+                    "doi": metadata["issue_doi"],
+                    "date": date,
+                }
+            )[0]
+        key = (journal.pk, metadata["volume"], metadata["issue"])
+        return self._memoise("issues", key, get_or_create)
+
+    def get_keywords(self, words):
+        return [
+            self._memoise(
+                "keywords", word,
+                lambda: submission_models.Keyword.objects.get_or_create(
+                    word=word,
+                )[0],
+            )
+            for word in words
+        ]
+
+    def _memoise(self, kind, key, lookup):
+        for layer in reversed(self._layers):
+            if (kind, key) in layer:
+                return layer[(kind, key)]
+        value = self._layers[-1][(kind, key)] = lookup()
+        return value
+
+
+def save_article(
+        metadata, journal=None, issue=None, owner=None, stage=None,
+        references=None,
+):
+    """ Creates or updates an article from its JATS metadata
+    :param metadata: The metadata returned by get_jats_article_metadata
+    :param references: Optional JATSReferences shared by a batch of imports
+    :return: An instance of submission.models.Article
+    """
+    if references is None:
+        references = JATSReferences()
+    journal = references.get_import_journal(metadata, journal)
+
+    with references.atomic():
+        section = references.get_section(journal, metadata["section_name"])
 
         article = get_article(metadata.get("identifiers", {}), journal)
         if not article:
@@ -473,43 +577,19 @@ def save_article(metadata, journal=None, issue=None, owner=None, stage=None):
             )
             if account and author["correspondence"]:
                 article.correspondence_author = account
-            article.save()
 
-        for kwd in metadata["keywords"]:
-            keyword, _ = submission_models.Keyword.objects.get_or_create(word=kwd)
-            article.keywords.add(keyword)
+        article.keywords.add(*references.get_keywords(metadata["keywords"]))
 
         if metadata["license_url"]:
-            url = metadata["license_url"]
-            try:
-                lic = submission_models.Licence.objects.get(
-                    url=url, journal=article.journal,
-                )
-            except submission_models.Licence.DoesNotExist:
-                lic = submission_models.Licence.objects.create(
-                    url=url,
-                    journal=article.journal,
-                    short_name=url[-14:],
-                    name="Imported License",
-                    text=metadata.get("license_text")
-                )
-            article.license = lic
-            article.save()
+            article.license = references.get_licence(
+                article.journal,
+                metadata["license_url"],
+                metadata.get("license_text"),
+            )
 
         if not issue:
-            issue_type = journal_models.IssueType.objects.get(
-                code="issue",
-                journal=journal,
-            )
-            issue, _ = journal_models.Issue.objects.get_or_create(
-                volume=metadata["volume"],
-                issue=metadata["issue"],
-                journal=journal,
-                defaults={
-                    "issue_type": issue_type,
-                    "doi": metadata["issue_doi"],
-                    "date": article.date_published,
-                }
+            issue = references.get_issue(
+                journal, metadata, article.date_published,
             )
         issue.articles.add(article)
         article.primary_issue = issue
@@ -518,23 +598,29 @@ def save_article(metadata, journal=None, issue=None, owner=None, stage=None):
         return article
 
 
-def import_pdf(article, pdf_path, pdf_filename):
+def import_pdf(article, pdf_path, pdf_filename, open_file=open_binary):
     owner = article.owner or Account.objects.get(pk=1)
-    with open(pdf_path, "rb") as f:
+    with open_file(pdf_path) as f:
         content_file = ContentFile(f.read())
         content_file.name = pdf_filename
+    galley = article.galley_set.filter(type="pdf").first()
+    if galley:
+        files.overwrite_file(
+            content_file, galley.file,
+            ('articles', article.pk)
+        )
+    else:
         article_file = files.save_file_to_article(
             content_file, article, owner, label="PDF",
         )
-        core_models.Galley.objects.get_or_create(
+        core_models.Galley.objects.create(
             article=article,
             type="pdf",
-            defaults={
-                "label": "PDF",
-                "file": article_file,
-            }
+            label="PDF",
+            file=article_file,
         )
 
+
 def get_or_create_journal(metadata):
     # Try to get it with journal code
     code = metadata["journal"]["code"]
@@ -559,6 +645,7 @@ def get_or_create_journal(metadata):
     if not journal:
         # Create a new journal
         journal = journal_models.Journal.objects.create(code=code)
+        created = True
 
     if created:
         journal.title = metadata["journal"].get("title", code)
@@ -579,128 +666,145 @@ def get_lost_found_journal():
     journal.setup_directory()
     return journal
 
-def get_jats_identifiers(soup):
-    ids = {
-        "pubid": None,
-        "doi": None,
-        "handle": None,
-    }
-    for article_id in soup.find_all("article-id"):
-        if article_id.attrs.get("pub-id-type") == "doi":
-            ids["doi"] = article_id.text
-        elif article_id.attrs.get("pub-id-type") == "publisher-id":
-            ids["pubid"] = article_id.text
-        elif article_id.attrs.get("pub-id-type") == "handle":
-            ids["handle"] = article_id.text
-
-
-    return ids
-
-
-def get_jats_license(soup):
-    license_url = license_text = None
-    license_soup = soup.find("license")
-    if license_soup:
-        license_url = license_soup.get("xlink:href")
-        license_text = " ".join((
-            license_p.text
-            for license_p in license_soup.find_all("license-p")
-        ))
-    return license_url, license_text
-
-
-def get_jats_rights_statement(soup):
-    text = None
-    rights_soup = soup.find("copyright-statement")
-    if rights_soup:
-        text = rights_soup.text
-    return text
-
-
 def default_email(seed):
     hashed = hashlib.md5(str(seed).encode("utf-8")).hexdigest()
     return "{0}{1}".format(hashed, settings.DUMMY_EMAIL_DOMAIN)
 
 
-def load_jats_images(images, galley, request):
+def load_jats_images(images, galley, request, open_file=open_binary):
+    """ Links images to the figures referenced by an XML galley
+    The galley is parsed once into an index of the filenames it references
+    and every image is resolved against it. Remote images are downloaded
+    concurrently before they are saved.
+    :param images: An iterable of local paths and remote URIs of images
+    :param galley: An XML core.models.Galley
+    :param request: A request or DummyRequest used to save the images
+    :param open_file: Callable opening local paths in binary mode
+    """
+    referenced = set(galley.all_images())
+    to_link = {}
     for img_uri in images:
         _, filename = os.path.split(img_uri)
-        missing_images = galley.has_missing_image_files()
-        all_images = galley.all_images()
-        if filename in all_images:
-            if img_uri.startswith("http"):
-                # fetch remote image
-                content_file = fetch_remote_image(img_uri)
+        if filename in referenced:
+            to_link[filename] = img_uri
+    if not to_link:
+        return
+
+    linked = {image.original_filename: image for image in galley.images.all()}
+    remote_uris = [uri for uri in to_link.values() if fetch.is_remote_uri(uri)]
+    prefetcher = fetch.URIPrefetcher() if remote_uris else None
+    try:
+        if prefetcher:
+            prefetcher.prefetch(remote_uris)
+        for filename, img_uri in to_link.items():
+            if fetch.is_remote_uri(img_uri):
+                try:
+                    prefetched = prefetcher.get(img_uri)
+                except requests.exceptions.RequestException as e:
+                    logger.error(
+                        "Failed to download image from %s: %s", img_uri, e)
+                    continue
+                with open(prefetched.path, 'rb') as image:
+                    content_file = ContentFile(image.read())
+                prefetcher.release([img_uri])
             else:
-                image = open(img_uri, 'rb')
-                content_file = ContentFile(image.read())
+                with open_file(img_uri) as image:
+                    content_file = ContentFile(image.read())
             content_file.name = filename
 
-            if filename in missing_images:
-                save_galley_image(galley, request, content_file)
-            else:
-                to_replace = galley.images.get(original_filename=filename)
+            if filename in linked:
                 files.overwrite_file(
-                    content_file, to_replace,
+                    content_file, linked[filename],
                     ('articles', galley.article.pk)
                 )
+            else:
+                save_galley_image(galley, request, content_file)
+    finally:
+        if prefetcher:
+            prefetcher.close()
 
 
-def import_jats_preprint_zipped(zip_file, repository=None, owner=None, persist=True, stage=None):
+def import_jats_preprint_zipped(
+        zip_file, repository=None, owner=None, persist=True, stage=None,
+        workers=None,
+):
     """ Import a batch of Zipped JATS preprints and their associated files
+    As with import_jats_zipped, files are read straight from the archive.
     :param zip_file: The zipped jats to be imported
     :param repository: Respository in which to import the articles
     :param owner: An instance of core.models.Account
+    :param workers: Number of processes parsing JATS files, as in
+        import_jats_zipped
     """
     errors = []
     preprints = []
-    temp_path = os.path.join(settings.BASE_DIR, 'files/temp')
-    with zipfile.ZipFile(zip_file, 'r') as zf:
-        with tempfile.TemporaryDirectory(dir=temp_path) as temp_dir:
-            zf.extractall(path=temp_dir)
-
-            for root, path, filenames in os.walk(temp_dir):
-                try:
-                    review_files = [] # HTML files are treated as reviews
-                    jats_path = jats_filename = pdf_path = pdf_filename = manifest = None
-
-                    for filename in filenames:
-                        mimetype, _ = mimetypes.guess_type(filename)
-                        file_path = os.path.join(root, filename)
-                        if mimetype in files.XML_MIMETYPES:
-                            jats_path = file_path
-                            jats_filename = filename
-                        elif mimetype in files.PDF_MIMETYPES:
-                            pdf_path = file_path
-                            pdf_filename = filename
-                        elif mimetype in files.HTML_MIMETYPES:
-                            review_files.append(file_path)
-                        elif mimetype == 'application/json' and filename == 'manifest.json':
-                            with open(file_path, 'r', encoding="utf-8") as manifest_file:
-                                manifest = json.loads(manifest_file.read())
-
-                    if jats_path:
-                        logger.info("[JATS] Importing from %s", jats_path)
-                        with open(jats_path, 'r') as jats_file:
-                            preprint = import_jats_preprint(
-                                jats_file.read(),
-                                repository,
-                                persist,
-                                jats_filename,
-                                owner,
-                                manifest,
-                                pdf_path,
-                                pdf_filename,
-                            )
-                            preprints.append((jats_filename, preprint))
-
-                        if persist and review_files and preprint and preprint.article:
-                            import_html_reviews(preprint, review_files, owner)
-
-                except Exception as err:
-                    logger.warning(err)
-                    logger.warning(traceback.format_exc())
-                    errors.append((filenames, err))
+    with ZipBundleReader(zip_file) as bundle_reader:
+        bundles = []
+        for root, path, filenames in bundle_reader.walk():
+            review_files = [] # HTML files are treated as reviews
+            jats_path = jats_filename = pdf_path = pdf_filename = manifest_path = None
+
+            for filename in filenames:
+                mimetype, _ = mimetypes.guess_type(filename)
+                file_path = bundle_reader.member(root, filename)
+                if mimetype in files.XML_MIMETYPES:
+                    jats_path = file_path
+                    jats_filename = filename
+                elif mimetype in files.PDF_MIMETYPES:
+                    pdf_path = file_path
+                    pdf_filename = filename
+                elif mimetype in files.HTML_MIMETYPES:
+                    review_files.append(file_path)
+                elif mimetype == 'application/json' and filename == 'manifest.json':
+                    manifest_path = file_path
+
+            if jats_path:
+                bundles.append((
+                    jats_path, jats_filename, pdf_path, pdf_filename,
+                    review_files, manifest_path, filenames,
+                ))
+
+        parsed = parse_jats_documents(
+            (bundle_reader.read(bundle[0]) for bundle in bundles),
+            get_jats_preprint_metadata,
+            workers=workers,
+        )
+        for bundle, (meta, parse_error) in zip(bundles, parsed):
+            jats_path, jats_filename, pdf_path, pdf_filename, \
+                review_files, manifest_path, filenames = bundle
+            try:
+                if parse_error:
+                    raise parse_error
+                manifest = None
+                if manifest_path:
+                    manifest = json.loads(
+                        bundle_reader.read(manifest_path).decode("utf-8"))
+
+                logger.info("[JATS] Importing from %s", jats_path)
+                if persist:
+                    preprint = save_preprint(
+                        meta,
+                        repository,
+                        owner=owner,
+                        manifest=manifest,
+                        pdf_path=pdf_path,
+                        pdf_filename=pdf_filename,
+                        open_file=bundle_reader.open,
+                    )
+                else:
+                    preprint = meta
+                preprints.append((jats_filename, preprint))
+
+                if persist and review_files and preprint and preprint.article:
+                    import_html_reviews(
+                        preprint, review_files, owner,
+                        open_file=bundle_reader.open,
+                    )
+
+            except Exception as err:
+                logger.warning(err)
+                logger.warning(traceback.format_exc())
+                errors.append((filenames, err))
 
     return preprints, errors
 
@@ -715,24 +819,7 @@ def import_jats_preprint(
         pdf_path=None,
         pdf_filename=None,
 ):
-    jats_soup = BeautifulSoup((jats_contents), 'lxml')
-    metadata_soup = jats_soup.find("article-meta")
-    meta = dict()
-    meta["title"] = get_jats_title(metadata_soup)
-    meta["abstract"] = get_jats_abstract(metadata_soup)
-    meta["keywords"] = get_jats_keywords(metadata_soup)
-    meta["date_published"] = get_jats_pub_date(jats_soup) or datetime.date.today()
-    meta["license_url"], meta["license_text"] = get_jats_license(jats_soup)
-    meta["authors"] = []
-    authors_soup = metadata_soup.find("contrib-group")
-    author_notes = metadata_soup.find("author_notes")
-    if authors_soup:
-        meta["authors"] = get_jats_authors(
-            authors_soup,
-            metadata_soup,
-            author_notes,
-        )
-    meta["identifiers"] = get_jats_identifiers(metadata_soup)
+    meta = get_jats_preprint_metadata(jats_contents)
 
     if not persist:
         return meta
@@ -746,10 +833,6 @@ def import_jats_preprint(
             pdf_path=pdf_path,
             pdf_filename=pdf_filename,
         )
-        if not isinstance(jats_contents, bytes):
-            jats_contents = jats_contents.encode("utf-8")
-        xml_file = ContentFile(jats_contents)
-        xml_file.name = filename or uuid.uuid4()
         return preprint
 
 
@@ -760,6 +843,7 @@ def save_preprint(
         manifest={},
         pdf_path=None,
         pdf_filename=None,
+        open_file=open_binary,
 ):
     with transaction.atomic():
         ident = article = None
@@ -828,7 +912,7 @@ def save_preprint(
             preprint.save()
 
         if pdf_path and pdf_filename:
-            with open(pdf_path, "rb") as f:
+            with open_file(pdf_path) as f:
                 content_file = ContentFile(f.read())
                 content_file.name = pdf_filename
                 file, _ = repository_models.PreprintFile.objects.get_or_create(
@@ -837,7 +921,7 @@ def save_preprint(
                     mime_type='application/pdf',
                     defaults={
                         'file': content_file,
-                        'size': os.path.getsize(pdf_path),
+                        'size': content_file.size,
                     }
                 )
 
@@ -861,7 +945,7 @@ def save_preprint(
         return preprint
 
 
-def import_html_reviews(preprint, review_files, owner):
+def import_html_reviews(preprint, review_files, owner, open_file=open_binary):
     review_round, _ = review_models.ReviewRound.objects.get_or_create(
         round_number=1,
         article=preprint.article,
@@ -870,8 +954,8 @@ def import_html_reviews(preprint, review_files, owner):
         journal=preprint.article.journal,
     ).first()
     for review_file in review_files:
-        with open(review_file, 'r') as r_file:
-            contents = r_file.read()
+        with open_file(review_file) as r_file:
+            contents = r_file.read().decode("utf-8")
             try:
                 review_doi = re.findall(
                     DOI_REGEX_PATTERN,
@@ -912,19 +996,3 @@ def import_html_reviews(preprint, review_files, owner):
                 identifier=review_doi,
                 review=review_assignment,
             )
-
-
-def fetch_remote_image(url):
-    try:
-        response = requests.get(url, stream=True)
-        if response.status_code == 200:
-            image_blob = response.content
-            content_file = ContentFile(image_blob)
-
-            return content_file
-        else:
-            response.raise_for_status()
-    except Exception as e:
-        logger.error(f"Failed to download image from {url}: {e}")
-        logger.exception(e)
-    return None
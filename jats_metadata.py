@@ -0,0 +1,417 @@
+"""
+Parsing of the metadata of JATS XML documents.
+
+Nothing here depends on Django, so that documents can be parsed by pools of
+worker processes which never set Django up, whatever their start method.
+"""
+import copy
+import datetime
+import hashlib
+import html
+from html.entities import html5
+import io
+import re
+
+from lxml import etree
+
+
+# The JATS DTD is neither fetched nor used to expand entities
+JATS_PARSER_OPTIONS = {
+    "load_dtd": False,
+    "no_network": True,
+    "resolve_entities": False,
+    "recover": True,
+    "huge_tree": True,
+}
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+# Named entities that XML defines. Others come from the DTD, which isn't
+# loaded, so they are replaced by character references before parsing.
+XML_ENTITIES = {"amp", "lt", "gt", "quot", "apos"}
+ENTITY_REF = re.compile(rb"&([A-Za-z][A-Za-z0-9]*);")
+
+# Relative to <front>
+JOURNAL_META = etree.XPath("journal-meta")
+ARTICLE_META = etree.XPath("article-meta")
+
+# Relative to <journal-meta>
+PUBLISHER_ID = etree.XPath("journal-id[@journal-id-type='publisher-id']")
+ABBREV_JOURNAL_TITLE = etree.XPath(".//abbrev-journal-title")
+JOURNAL_TITLE = etree.XPath(".//journal-title")
+ISSN = etree.XPath(".//issn")
+
+# Relative to <article-meta>
+ARTICLE_TITLE = etree.XPath(".//article-title")
+ABSTRACT = etree.XPath(".//abstract")
+ISSUE = etree.XPath(".//issue")
+VOLUME = etree.XPath(".//volume")
+ISSUE_DOI = etree.XPath(".//issue-id[@pub-id-type='doi']")
+PUB_DATE = etree.XPath(".//pub-date[@date-type='pub']")
+ANY_PUB_DATE = etree.XPath(".//pub-date")
+RECEIVED_DATE = etree.XPath(".//history/date[@date-type='received']")
+ACCEPTED_DATE = etree.XPath(".//history/date[@date-type='accepted']")
+KWD_GROUP = etree.XPath(".//kwd-group")
+KWD = etree.XPath(".//kwd")
+LICENSE = etree.XPath(".//license")
+LICENSE_P = etree.XPath(".//license-p")
+COPYRIGHT_STATEMENT = etree.XPath(".//copyright-statement")
+FPAGE = etree.XPath(".//fpage")
+LPAGE = etree.XPath(".//lpage")
+ARTICLE_ID = etree.XPath(".//article-id")
+CONTRIB_GROUP = etree.XPath(".//contrib-group")
+AUTHOR_NOTES = etree.XPath(".//author-notes")
+AFF = etree.XPath(".//aff")
+
+# Relative to a <contrib>
+AUTHOR_CONTRIBS = etree.XPath(".//contrib[@contrib-type='author']")
+AFF_XREF_ID = etree.XPath(".//xref[@ref-type='aff']/@rid")
+SURNAME = etree.XPath(".//surname")
+GIVEN_NAMES = etree.XPath(".//given-names")
+EMAIL = etree.XPath(".//email")
+ORCID = etree.XPath(".//contrib-id[@contrib-id-type='orcid']")
+
+# Relative to a date element
+DAY = etree.XPath("day")
+MONTH = etree.XPath("month")
+YEAR = etree.XPath("year")
+
+
+def fingerprint_jats(jats_contents):
+    """ Returns the SHA-256 of a JATS document in canonical form
+    Whitespace between elements, comments, the declaration and the DOCTYPE
+    are left out so that reserialising a document doesn't change it.
+    :param jats_contents: (str or bytes) the JATS XML
+    """
+    if not isinstance(jats_contents, bytes):
+        jats_contents = jats_contents.encode("utf-8")
+    parser = etree.XMLParser(
+        remove_blank_text=True,
+        remove_comments=True,
+        **JATS_PARSER_OPTIONS,
+    )
+    root = etree.fromstring(jats_contents, parser)
+    return hashlib.sha256(etree.tostring(root, method="c14n")).hexdigest()
+
+
+def parse_jats_article(jats_contents):
+    """ Returns the metadata and SHA-256 of a JATS article"""
+    if not isinstance(jats_contents, bytes):
+        jats_contents = jats_contents.encode("utf-8")
+    return (
+        get_jats_article_metadata(jats_contents),
+        hashlib.sha256(jats_contents).hexdigest(),
+    )
+
+
+def get_jats_article_metadata(jats_contents):
+    """ Extracts the metadata of a JATS article without persisting it
+    :param jats_contents: (str or bytes) the JATS XML
+    :return: A dict of article metadata as expected by save_article
+    """
+    section_name, front = parse_jats_front(jats_contents)
+    metadata = xpath_first(ARTICLE_META, front)
+    if metadata is None:
+        raise ValueError("Invalid JATS-XML or no <article-meta> found")
+
+    meta = {}
+    meta["journal"] = get_jats_journal_metadata(front)
+    meta["title"] = get_jats_title(metadata)
+    meta["abstract"] = get_jats_abstract(metadata)
+    meta["issue"], meta["volume"] = get_jats_issue(metadata)
+    meta["issue_doi"] = get_jats_issue_doi(metadata)
+    meta["keywords"] = get_jats_keywords(metadata)
+    meta["section_name"] = section_name
+    meta["date_published"] = get_jats_pub_date(metadata) or datetime.date.today()
+    meta["license_url"], meta["license_text"] = get_jats_license(metadata)
+    meta["rights"] = get_jats_rights_statement(metadata)
+    meta["date_submitted"] = get_jats_sub_date(metadata)
+    meta["date_accepted"] = get_jats_acc_date(metadata)
+    try:
+        meta["first_page"] = int(element_text(xpath_first(FPAGE, metadata)))
+    except (ValueError, TypeError):
+        meta["first_page"] = None
+    try:
+        meta["last_page"] = int(element_text(xpath_first(LPAGE, metadata)))
+    except (ValueError, TypeError):
+        meta["last_page"] = None
+    meta["authors"] = get_jats_authors(metadata)
+    meta["identifiers"] = get_jats_identifiers(metadata)
+
+    return meta
+
+
+def parse_jats_front(jats_contents):
+    """ Parses a JATS document up to the end of its <front>
+    The body and back matter, which make up most of the document, are never
+    parsed into a tree.
+    :param jats_contents: (str or bytes) the JATS XML
+    :return: A tuple of the article-type and the <front> element, which is
+        None if the document has no <front>
+    """
+    if not isinstance(jats_contents, bytes):
+        jats_contents = jats_contents.encode("utf-8")
+    front_end = jats_contents.find(b"</front>")
+    if front_end == -1:
+        jats_contents = resolve_entities(jats_contents)
+    else:
+        jats_contents = resolve_entities(jats_contents[:front_end]) \
+            + jats_contents[front_end:]
+    article_type = None
+    events = etree.iterparse(
+        io.BytesIO(jats_contents),
+        events=("start", "end"),
+        tag=("article", "front"),
+        **JATS_PARSER_OPTIONS,
+    )
+    for event, element in events:
+        if event == "start" and element.tag == "article":
+            article_type = element.get("article-type")
+        elif event == "end" and element.tag == "front":
+            return article_type, element
+    return article_type, None
+
+
+def resolve_entities(jats_contents):
+    """ Replaces the named entities XML doesn't define by character references
+    Without the DTD, the parser would otherwise keep them as unresolved
+    entity nodes and, in recover mode, drop text after them. Unknown
+    entities are removed.
+    :param jats_contents: (bytes) the JATS XML
+    """
+    def replace(match):
+        name = match.group(1).decode("ascii")
+        if name in XML_ENTITIES:
+            return match.group(0)
+        value = html5.get(name + ";", "")
+        return b"".join(b"&#%d;" % ord(char) for char in value)
+
+    return ENTITY_REF.sub(replace, jats_contents)
+
+
+def node_text(node):
+    """ Returns the text of an entity, or nothing for comments and PIs"""
+    if node.tag is etree.Entity:
+        text = html.unescape(node.text)
+        if text != node.text:
+            return text
+    return ""
+
+
+def xpath_first(xpath, element):
+    """ Returns the first result of a compiled XPath or None"""
+    if element is None:
+        return None
+    results = xpath(element)
+    return results[0] if results else None
+
+
+def element_text(element, exclude=None):
+    """ Returns the text content of an element and its descendants
+    :param element: An lxml element or None
+    :param exclude: Optional tag name whose subtrees are left out
+    :return: A str or None if there is no element
+    """
+    if element is None:
+        return None
+    parts = [element.text or ""]
+    for child in element:
+        if not isinstance(child.tag, str):
+            parts.append(node_text(child))
+        elif child.tag != exclude:
+            parts.append(element_text(child, exclude))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def get_jats_journal_metadata(front):
+    journal_metadata = {}
+    journal_meta = xpath_first(JOURNAL_META, front)
+    if journal_meta is not None:
+        # Journal code
+        code = xpath_first(PUBLISHER_ID, journal_meta)
+        if code is None:
+            code = xpath_first(ABBREV_JOURNAL_TITLE, journal_meta)
+        if code is not None:
+            journal_metadata["code"] = element_text(code)
+
+        # Journal title
+        title = xpath_first(JOURNAL_TITLE, journal_meta)
+        if title is not None:
+            journal_metadata["title"] = element_text(title)
+        issn = xpath_first(ISSN, journal_meta)
+        if issn is not None:
+            journal_metadata["issn"] = element_text(issn)
+    return journal_metadata
+
+
+def get_jats_title(metadata):
+    title = xpath_first(ARTICLE_TITLE, metadata)
+    if title is not None:
+        # Markup is kept so that italics and bold survive the import
+        parts = [title.text or ""]
+        for child in title:
+            if isinstance(child.tag, str):
+                # Copied so the document's unused namespaces aren't serialised
+                child_copy = copy.deepcopy(child)
+                etree.cleanup_namespaces(child_copy)
+                parts.append(
+                    etree.tostring(child_copy, encoding=str, with_tail=False))
+            else:
+                parts.append(node_text(child))
+            parts.append(child.tail or "")
+        clean_title = "".join(parts).replace(
+            "italic>", "i>",
+        ).replace(
+            "bold>", "b>",
+        )
+        return clean_title
+    else:
+        return "[Untitled]"
+
+
+def get_jats_abstract(metadata):
+    return element_text(xpath_first(ABSTRACT, metadata)) or ""
+
+
+def get_jats_issue(metadata):
+    issue = element_text(xpath_first(ISSUE, metadata)) or 0
+    volume = element_text(xpath_first(VOLUME, metadata)) or 0
+
+    return (int(issue), int(volume))
+
+
+def get_jats_issue_doi(metadata):
+    return element_text(xpath_first(ISSUE_DOI, metadata))
+
+
+def get_jats_date(date_element):
+    if date_element is None:
+        return None
+    day = element_text(xpath_first(DAY, date_element)) or 1
+    month = element_text(xpath_first(MONTH, date_element)) or 1
+    year = element_text(xpath_first(YEAR, date_element))
+
+    return datetime.date(day=int(day), month=int(month), year=int(year))
+
+
+def get_jats_pub_date(metadata):
+    pub_date = xpath_first(PUB_DATE, metadata)
+    if pub_date is None:
+        pub_date = xpath_first(ANY_PUB_DATE, metadata)
+    return get_jats_date(pub_date)
+
+
+def get_jats_sub_date(metadata):
+    return get_jats_date(xpath_first(RECEIVED_DATE, metadata))
+
+
+def get_jats_acc_date(metadata):
+    return get_jats_date(xpath_first(ACCEPTED_DATE, metadata))
+
+
+def get_jats_keywords(metadata):
+    keywords = xpath_first(KWD_GROUP, metadata)
+    if keywords is not None:
+        return {element_text(keyword).strip() for keyword in KWD(keywords)}
+    else:
+        return set()
+
+
+def get_jats_authors(metadata):
+    authors = []
+    contrib_group = xpath_first(CONTRIB_GROUP, metadata)
+    if contrib_group is None:
+        return authors
+
+    affiliations = {aff.get("id"): aff for aff in AFF(metadata)}
+    author_notes = xpath_first(AUTHOR_NOTES, metadata)
+    for author in AUTHOR_CONTRIBS(contrib_group):
+        institution = element_text(xpath_first(AFF, author))
+
+        # in some cases the aff may be outside <contrib> in this case
+        # we can look for something like:
+        # <xref ref-type="aff" rid="aff1">1</xref>
+
+        if not institution:
+            aff_id = xpath_first(AFF_XREF_ID, author)
+            if aff_id and aff_id in affiliations:
+                institution = element_text(
+                    affiliations[aff_id], exclude="label",
+                ).strip()
+
+        surname = xpath_first(SURNAME, author)
+        if surname is not None:
+            author_data = {
+                "first_name": element_text(xpath_first(GIVEN_NAMES, author)) or "",
+                "last_name": element_text(surname),
+                "email": element_text(xpath_first(EMAIL, author)),
+                "correspondence": False,
+                "institution": institution,
+                "orcid": get_orcid(author),
+            }
+            if author.get("corresp") == "yes" and author_notes is not None:
+                author_data["correspondence"] = True
+                corresp_email = xpath_first(EMAIL, author_notes)
+                if corresp_email is not None:
+                    author_data["email"] = element_text(corresp_email)
+            authors.append(author_data)
+    return authors
+
+
+def get_orcid(author):
+    orcid = element_text(xpath_first(ORCID, author))
+    if orcid and orcid.startswith('https://'):
+        orcid = orcid.replace('https://orcid.org/', '')
+    return orcid
+
+
+def get_jats_identifiers(metadata):
+    ids = {
+        "pubid": None,
+        "doi": None,
+        "handle": None,
+    }
+    for article_id in ARTICLE_ID(metadata):
+        if article_id.get("pub-id-type") == "doi":
+            ids["doi"] = element_text(article_id)
+        elif article_id.get("pub-id-type") == "publisher-id":
+            ids["pubid"] = element_text(article_id)
+        elif article_id.get("pub-id-type") == "handle":
+            ids["handle"] = element_text(article_id)
+
+    return ids
+
+
+def get_jats_license(metadata):
+    license_url = license_text = None
+    license_element = xpath_first(LICENSE, metadata)
+    if license_element is not None:
+        license_url = license_element.get(XLINK_HREF)
+        license_text = " ".join((
+            element_text(license_p)
+            for license_p in LICENSE_P(license_element)
+        ))
+    return license_url, license_text
+
+
+def get_jats_rights_statement(metadata):
+    return element_text(xpath_first(COPYRIGHT_STATEMENT, metadata))
+
+
+def get_jats_preprint_metadata(jats_contents):
+    """ Extracts the metadata of a JATS preprint without persisting it
+    :param jats_contents: (str or bytes) the JATS XML
+    :return: A dict of preprint metadata as expected by save_preprint
+    """
+    _, front = parse_jats_front(jats_contents)
+    metadata = xpath_first(ARTICLE_META, front)
+    if metadata is None:
+        raise ValueError("Invalid JATS-XML or no <article-meta> found")
+    meta = dict()
+    meta["title"] = get_jats_title(metadata)
+    meta["abstract"] = get_jats_abstract(metadata)
+    meta["keywords"] = get_jats_keywords(metadata)
+    meta["date_published"] = get_jats_pub_date(metadata) or datetime.date.today()
+    meta["license_url"], meta["license_text"] = get_jats_license(metadata)
+    meta["authors"] = get_jats_authors(metadata)
+    meta["identifiers"] = get_jats_identifiers(metadata)
+    return meta
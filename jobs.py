@@ -0,0 +1,213 @@
+"""
+A database backed queue for running imports out of the request cycle.
+
+Views queue an ImportJob and the process_import_jobs management command claims
+and runs queued jobs, recording progress on the job as it goes.
+"""
+import csv
+from datetime import timedelta
+import os
+import shutil
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone, translation
+
+from core import files
+from plugins.imports import jats, models, utils
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Running jobs that record no progress for this long are failed, assuming
+# their worker was killed
+STALE_JOB_TIMEOUT = timedelta(hours=1)
+
+
+def queue_job(import_type, path, journal=None, owner=None, **kwargs):
+    """ Queues a file for import by the worker
+    :param import_type: One of the ImportJob.TYPE_* constants
+    :param path: Path to the file to be imported
+    :param journal: The journal to import into
+    :param owner: The core.models.Account that requested the import
+    :return: An instance of ImportJob
+    """
+    return models.ImportJob.objects.create(
+        import_type=import_type,
+        path=path,
+        journal=journal,
+        owner=owner,
+        folder_path=kwargs.get('folder_path'),
+        stage=kwargs.get('stage'),
+    )
+
+
+def claim_next_job():
+    """ Claims the oldest queued job
+    The claim is a conditional UPDATE, so concurrent workers never run the
+    same job without needing row locks or a message broker.
+    :return: The claimed ImportJob or None if the queue is empty
+    """
+    queued = models.ImportJob.objects.filter(
+        status=models.ImportJob.STATUS_QUEUED,
+    ).values_list('pk', flat=True)
+    for job_id in queued[:10]:
+        claimed = models.ImportJob.objects.filter(
+            pk=job_id,
+            status=models.ImportJob.STATUS_QUEUED,
+        ).update(
+            status=models.ImportJob.STATUS_RUNNING,
+            started=timezone.now(),
+            heartbeat=timezone.now(),
+        )
+        if claimed:
+            return models.ImportJob.objects.get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    """ Runs a claimed job and records its outcome
+    :param job: An instance of ImportJob with STATUS_RUNNING
+    """
+    logger.info("Running %s", job)
+    runner = JOB_RUNNERS[job.import_type]
+    try:
+        with translation.override(settings.LANGUAGE_CODE):
+            errors = runner(job)
+    except Exception as e:
+        logger.exception(e)
+        job.status = models.ImportJob.STATUS_FAILED
+        job.errors = job.errors + [{'error': str(e)}]
+        job.error_count = len(job.errors)
+    else:
+        job.status = models.ImportJob.STATUS_COMPLETE
+        job.errors = errors
+        job.error_count = len(errors)
+    finally:
+        remove_job_files(job)
+        # Progress is written straight to the table while the job runs
+        job.refresh_from_db(fields=['rows_done'])
+    job.finished = timezone.now()
+    job.save(update_fields=[
+        'status', 'errors', 'error_count', 'finished', 'error_file',
+    ])
+    logger.info("Finished %s", job)
+
+    return job
+
+
+def remove_job_files(job):
+    """ Removes the uploaded file of a job and the folder it was unpacked to
+    :param job: An instance of ImportJob
+    """
+    files.unlink_temp_file(job.path)
+    if job.folder_path:
+        shutil.rmtree(job.folder_path, ignore_errors=True)
+
+
+def fail_stale_jobs(timeout=STALE_JOB_TIMEOUT):
+    """ Fails running jobs whose worker stopped recording progress
+    A worker that is killed mid job never finishes it, so its job would
+    otherwise be left running. Stale jobs are not requeued as imports that
+    were cut short can't safely be run again.
+    :param timeout: A timedelta after which a job without progress is stale
+    :return: The number of jobs failed
+    """
+    cutoff = timezone.now() - timeout
+    stale = models.ImportJob.objects.filter(
+        Q(heartbeat__lt=cutoff)
+        | Q(heartbeat__isnull=True, started__lt=cutoff),
+        status=models.ImportJob.STATUS_RUNNING,
+    )
+    count = 0
+    for job in stale:
+        failed = models.ImportJob.objects.filter(
+            pk=job.pk,
+            status=models.ImportJob.STATUS_RUNNING,
+        ).update(
+            status=models.ImportJob.STATUS_FAILED,
+            errors=job.errors + [{'error': 'The import stopped responding'}],
+            error_count=job.error_count + 1,
+            finished=timezone.now(),
+        )
+        if failed:
+            logger.warning("Failed stale %s", job)
+            remove_job_files(job)
+            count += 1
+    return count
+
+
+def run_queued_jobs(stale_timeout=STALE_JOB_TIMEOUT):
+    """ Runs queued jobs until the queue is empty
+    Stale running jobs are failed first.
+    :param stale_timeout: Passed on to fail_stale_jobs
+    :return: The number of jobs run
+    """
+    fail_stale_jobs(stale_timeout)
+    count = 0
+    job = claim_next_job()
+    while job:
+        run_job(job)
+        count += 1
+        job = claim_next_job()
+    return count
+
+
+def record_progress(job, rows_done, errors):
+    models.ImportJob.objects.filter(pk=job.pk).update(
+        rows_done=rows_done,
+        error_count=len(errors),
+        heartbeat=timezone.now(),
+    )
+
+
+def run_update_job(job):
+    with open(job.path, 'r', encoding="utf-8-sig") as f:
+        errors, _actions = utils.update_article_metadata(
+            csv.DictReader(f),
+            job.folder_path,
+            owner=job.owner,
+            import_id=os.path.basename(job.path),
+            validate=True,
+            progress_callback=lambda done, errs: record_progress(job, done, errs),
+        )
+    return [
+        {key: str(value) for key, value in error.items()}
+        for error in errors
+    ]
+
+
+def run_article_metadata_job(job):
+    request = utils.DummyRequest(job.owner, job.journal)
+    with open(job.path, 'r', encoding="utf-8-sig") as f:
+        _, errors, error_file = utils.import_article_metadata(
+            request,
+            csv.reader(f),
+            progress_callback=lambda done, errs: record_progress(job, done, errs),
+        )
+    job.error_file = error_file
+    return [
+        {'row': line_no, 'error': str(error)}
+        for line_no, error in errors.items()
+    ]
+
+
+def run_jats_job(job):
+    _articles, errors = jats.import_jats_zipped(
+        job.path,
+        job.journal,
+        owner=job.owner,
+        stage=job.stage,
+        progress_callback=lambda done, errs: record_progress(job, done, errs),
+    )
+    return [
+        {'files': ', '.join(filenames), 'error': str(error)}
+        for filenames, error in errors
+    ]
+
+
+JOB_RUNNERS = {
+    models.ImportJob.TYPE_UPDATE: run_update_job,
+    models.ImportJob.TYPE_ARTICLE_METADATA: run_article_metadata_job,
+    models.ImportJob.TYPE_JATS: run_jats_job,
+}
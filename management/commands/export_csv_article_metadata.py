@@ -0,0 +1,101 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_aware, make_aware
+from journal import models
+
+from plugins.imports import export
+
+FORMATS = {
+    'import': export.iter_import_format_csv,
+    'summary': export.iter_article_summary_csv,
+    'jsonl': export.iter_jsonl_export,
+}
+
+
+class Command(BaseCommand):
+    """ Exports article metadata in one of FORMATS"""
+
+    help = "Exports article metadata in the CSV import format, as article " \
+           "summaries or as JSON lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('journal_code')
+        parser.add_argument(
+            '--stage', default=None,
+            help="Only export articles in the given stage",
+        )
+        parser.add_argument(
+            '--issue', type=int, default=None,
+            help="Only export articles in the issue with the given ID",
+        )
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS), default='import',
+            help="'import' for the Import / Export / Update schema, "
+                 "'summary' for the sections of the per-article CSV export "
+                 "or 'jsonl' for one JSON document per article",
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help="Path of the file to write, defaults to stdout",
+        )
+        parser.add_argument(
+            '--since', default=None,
+            help="Only export articles changed after this ISO 8601 datetime "
+                 "and record the export run",
+        )
+        parser.add_argument(
+            '--delta', action='store_true', default=False,
+            help="Only export articles changed since the last recorded "
+                 "export run and record this one",
+        )
+
+    def handle(self, *args, **options):
+        journal = models.Journal.objects.get(code=options["journal_code"])
+        since = None
+        if options["since"]:
+            since = parse_datetime(options["since"])
+            if since is None:
+                raise CommandError(
+                    "Invalid datetime: {}".format(options["since"]))
+            if not is_aware(since):
+                since = make_aware(since)
+
+        issue = None
+        if options["issue"]:
+            try:
+                issue = models.Issue.objects.get(
+                    pk=options["issue"],
+                    journal=journal,
+                )
+            except models.Issue.DoesNotExist:
+                raise CommandError(
+                    "No issue {} in {}".format(options["issue"], journal))
+
+        run = None
+        if since or options["delta"]:
+            articles, run = export.plan_delta_export(
+                journal,
+                since=since,
+                stage=options["stage"],
+                issue=issue,
+            )
+        else:
+            articles = export.get_export_articles(
+                journal,
+                stage=options["stage"],
+                issue=issue,
+            )
+
+        lines = FORMATS[options["format"]](articles)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
+
+        if run:
+            run.save()
+            self.stderr.write(
+                "Exported {} changed articles".format(run.article_count))
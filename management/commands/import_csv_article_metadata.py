@@ -7,7 +7,7 @@ from django.core.management.base import BaseCommand
 from journal import models
 
 from plugins.imports.utils import DummyRequest
-from plugins.imports.utils import import_article_metadata
+from plugins.imports.utils import import_article_metadata, DEFAULT_BATCH_SIZE
 
 class Command(BaseCommand):
     """ CLI interface for the CSV importer"""
@@ -18,6 +18,10 @@ class Command(BaseCommand):
         parser.add_argument('csv_file')
         parser.add_argument('journal_code')
         parser.add_argument('--owner-id', default=1)
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help="Number of rows to commit per transaction",
+        )
 
     def handle(self, *args, **options):
         journal = models.Journal.objects.get(code=options["journal_code"])
@@ -26,7 +30,9 @@ class Command(BaseCommand):
         with open(options["csv_file"], "r") as f:
             reader = csv.reader(f, delimiter=",")
             request = DummyRequest(owner, journal)
-            _, err, err_file= import_article_metadata(request, reader)
+            _, err, err_file= import_article_metadata(
+                request, reader, chunk_size=options["chunk_size"],
+            )
 
             for e in err:
                 print(e)
@@ -17,6 +17,8 @@ class Command(BaseCommand):
         parser.add_argument('-r', '--repository_code')
         parser.add_argument('-o', '--owner_id', default=1)
         parser.add_argument('-d', '--dry-run', action="store_true", default=False)
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Number of processes parsing JATS files")
 
     def handle(self, *args, **options):
         repository = None
@@ -28,14 +30,17 @@ class Command(BaseCommand):
         persist = True
         if options["dry_run"]:
             persist = False
-        preprints = import_jats_preprint_zipped(
+        preprints, errors = import_jats_preprint_zipped(
             options["zip_file"],
             repository,
             owner=owner,
             persist=persist,
+            workers=options["workers"],
         )
         for preprint in preprints:
             if not persist:
                 pprint.pprint(preprint)
             else:
                 print("Imported Preprint %s" % preprint)
+        for filenames, error in errors:
+            print("Failed to import %s: %s" % (", ".join(filenames), error))
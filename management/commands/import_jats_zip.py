@@ -1,3 +1,4 @@
+import logging
 import pprint
 
 from django.core.management.base import BaseCommand
@@ -19,6 +20,8 @@ class Command(BaseCommand):
         parser.add_argument('-j', '--journal_code')
         parser.add_argument('-o', '--owner_id', default=1)
         parser.add_argument('-d', '--dry-run', action="store_true", default=False)
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Number of processes parsing JATS files")
 
     def handle(self, *args, **options):
         verbosity = int(options['verbosity'])
@@ -34,12 +37,15 @@ class Command(BaseCommand):
         persist = True
         if options["dry_run"]:
             persist = False
-        articles = import_jats_zipped(
+        articles, errors = import_jats_zipped(
             options["zip_file"], journal,
             owner=owner, persist=persist,
+            workers=options["workers"],
         )
         for article in articles:
             if not persist:
                 pprint.pprint(article)
             else:
                 print("Imported Article %s" % article)
+        for filenames, error in errors:
+            print("Failed to import %s: %s" % (", ".join(filenames), error))
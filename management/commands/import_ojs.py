@@ -3,6 +3,7 @@ from journal import models
 
 from django.core.management.base import BaseCommand
 from plugins.imports import ojs
+from plugins.imports.ojs.cache import DEFAULT_TTL, SQLiteResponseCache
 
 
 class Command(BaseCommand):
@@ -34,16 +35,26 @@ class Command(BaseCommand):
         parser.add_argument('--ignore-galleys', action="store_true",
                             default=False,
                             help="Imports only article metrics")
+        parser.add_argument('--cache', default=None,
+                            help="Path to a SQLite file caching OJS responses")
+        parser.add_argument('--cache-ttl', type=int, default=DEFAULT_TTL,
+                            help="Seconds before cached responses are "
+                            "revalidated")
 
     def handle(self, *args, **options):
         journal = models.Journal.objects.get(code=options["journal_code"])
         if not options["password"]:
             password = getpass.getpass(
                 "Enter password for user %s: " % options["username"])
+        cache = None
+        if options["cache"]:
+            cache = SQLiteResponseCache(
+                options["cache"], ttl=options["cache_ttl"])
         client = self.IMPORT_CLIENT(
             options["journal_url"],
             options["username"],
             options["password"] or password,
+            cache=cache,
         )
 
         if options["users"]:
@@ -68,3 +79,5 @@ class Command(BaseCommand):
         else:
             ojs.import_published_articles(
                 client, journal, not options["ignore_galleys"])
+        if cache:
+            cache.close()
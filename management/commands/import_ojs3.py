@@ -4,6 +4,7 @@ from journal import models
 
 from django.core.management.base import BaseCommand
 from plugins.imports import ojs
+from plugins.imports.ojs.cache import DEFAULT_TTL, SQLiteResponseCache
 
 
 class Command(BaseCommand):
@@ -36,6 +37,15 @@ class Command(BaseCommand):
         parser.add_argument('--ignore-galleys', action="store_true",
                             default=False,
                             help="Do not import article galleys")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Number of threads fetching articles from OJS")
+        parser.add_argument('--resume', action="store_true", default=False,
+                            help="Resume from where the last import stopped")
+        parser.add_argument('--cache', default=None,
+                            help="Path to a SQLite file caching OJS responses")
+        parser.add_argument('--cache-ttl', type=int, default=DEFAULT_TTL,
+                            help="Seconds before cached responses are "
+                            "revalidated")
 
 
     def handle(self, *args, **options):
@@ -44,21 +54,26 @@ class Command(BaseCommand):
         if not password:
             password = getpass.getpass(
                 "Enter password for user %s: " % options["username"])
+        cache = None
+        if options["cache"]:
+            cache = SQLiteResponseCache(
+                options["cache"], ttl=options["cache_ttl"])
         client = self.IMPORT_CLIENT(
             options["journal_url"],
             options["username"],
             password,
+            cache=cache,
         )
         if options["issues"]:
-            ojs.import_ojs3_issues(client, journal)
+            ojs.import_ojs3_issues(client, journal, resume=options["resume"])
         elif options["metrics"]:
-            ojs.import_ojs3_metrics(client, journal)
+            ojs.import_ojs3_metrics(client, journal, resume=options["resume"])
         elif options["issue_id"]:
             ojs.import_ojs3_issues(client, journal, issue_id=options["issue_id"])
         elif options["unpublished_issues"]:
             ojs.import_ojs3_unpublished_issues(client, journal)
         elif options["users"]:
-            ojs.import_ojs3_users(client, journal)
+            ojs.import_ojs3_users(client, journal, resume=options["resume"])
         elif options["just_galleys"]:
             ojs.import_ojs3_galleys(client, journal, options["ojs_id"])
         else:
@@ -67,4 +82,8 @@ class Command(BaseCommand):
                 ojs_id=options["ojs_id"],
                 editorial=options["editorial"],
                 galleys=not options["ignore_galleys"],
+                workers=options["workers"],
+                resume=options["resume"],
             )
+        if cache:
+            cache.close()
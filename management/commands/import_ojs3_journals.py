@@ -3,6 +3,7 @@ from journal import models
 
 from django.core.management.base import BaseCommand
 from plugins.imports import ojs
+from plugins.imports.ojs.cache import DEFAULT_TTL, SQLiteResponseCache
 
 
 class Command(BaseCommand):
@@ -24,20 +25,38 @@ class Command(BaseCommand):
         parser.add_argument('--include_articles', action="store_true",
                             default=False,
                             help="Include importing journal articles")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Number of threads fetching articles from OJS")
+        parser.add_argument('--resume', action="store_true", default=False,
+                            help="Resume from where the last import stopped")
+        parser.add_argument('--cache', default=None,
+                            help="Path to a SQLite file caching OJS responses")
+        parser.add_argument('--cache-ttl', type=int, default=DEFAULT_TTL,
+                            help="Seconds before cached responses are "
+                            "revalidated")
 
 
     def handle(self, *args, **options):
         if not options["password"]:
             password = getpass.getpass(
                 "Enter password for user %s: " % options["username"])
+        cache = None
+        if options["cache"]:
+            cache = SQLiteResponseCache(
+                options["cache"], ttl=options["cache_ttl"])
         client = self.IMPORT_CLIENT(
             options["ojs_url"],
             options["username"],
             options["password"] or password,
+            cache=cache,
         )
         ojs.import_ojs3_journals(
             client,
             journal_acronym=options["journal_acronym"],
             include_content=options["include_articles"],
             update_journals=options["update_journals"],
+            workers=options["workers"],
+            resume=options["resume"],
         )
+        if cache:
+            cache.close()
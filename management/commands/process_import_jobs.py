@@ -0,0 +1,38 @@
+from datetime import timedelta
+import time
+
+from django.core.management.base import BaseCommand
+
+from plugins.imports import jobs
+
+
+class Command(BaseCommand):
+    """ Runs imports queued from the Imports plugin web interface"""
+
+    help = "Runs queued import jobs. Keeps polling for new jobs unless --once"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action="store_true", default=False,
+            help="Exit once the queue is empty",
+        )
+        parser.add_argument(
+            '--sleep', type=int, default=10,
+            help="Seconds to wait between polls of an empty queue",
+        )
+        parser.add_argument(
+            '--stale-after', type=int,
+            default=int(jobs.STALE_JOB_TIMEOUT.total_seconds() // 60),
+            help="Minutes after which a running job that records no "
+                 "progress is failed",
+        )
+
+    def handle(self, *args, **options):
+        stale_timeout = timedelta(minutes=options["stale_after"])
+        while True:
+            count = jobs.run_queued_jobs(stale_timeout)
+            if count:
+                print("Ran %d import job(s)" % count)
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
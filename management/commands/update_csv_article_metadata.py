@@ -8,7 +8,7 @@ from django.core.management.base import BaseCommand
 from journal import models
 
 from plugins.imports.utils import DummyRequest
-from plugins.imports.utils import update_article_metadata
+from plugins.imports.utils import update_article_metadata, DEFAULT_BATCH_SIZE
 
 class Command(BaseCommand):
     """ CLI interface for the CSV importer"""
@@ -18,6 +18,10 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('csv_file')
         parser.add_argument('--owner-id', default=1)
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help="Number of articles to prefetch and write per batch",
+        )
 
     def handle(self, *args, **options):
         owner = Account.objects.get(pk=options["owner_id"])
@@ -27,7 +31,8 @@ class Command(BaseCommand):
             rows, actions = update_article_metadata(
                 reader,
                 owner=owner,
-                import_id=uuid.uuid4()
+                import_id=uuid.uuid4(),
+                batch_size=options["batch_size"],
             )
 
             for row in rows:
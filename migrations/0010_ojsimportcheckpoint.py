@@ -0,0 +1,29 @@
+# Generated by Django 3.2.20 on 2026-10-18 11:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0041_issue_short_description'),
+        ('imports', '0009_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OJSImportCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phase', models.CharField(choices=[('users', 'Users'), ('articles', 'Articles'), ('issues', 'Issues'), ('metrics', 'Metrics')], max_length=20)),
+                ('last_ojs_id', models.CharField(blank=True, help_text='OJS ID of the last object imported in this phase', max_length=255, null=True)),
+                ('finished', models.DateTimeField(blank=True, help_text='Set once every object in this phase has been imported', null=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('journal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='journal.journal')),
+            ],
+            options={
+                'unique_together': {('journal', 'phase')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.20 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imports', '0010_ojsimportcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ojsfile',
+            name='ojs_updated',
+            field=models.CharField(blank=True, help_text='The updatedAt value of the file when it was imported', max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='ojsfile',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 digest of the imported file contents', max_length=64, null=True),
+        ),
+    ]
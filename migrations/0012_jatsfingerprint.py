@@ -0,0 +1,25 @@
+# Generated by Django 3.2.20 on 2026-10-18 13:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0066_article_issn_override'),
+        ('imports', '0011_ojsfile_dedup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JATSFingerprint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('xml_sha256', models.CharField(help_text='SHA-256 digest of the canonicalised JATS XML', max_length=64)),
+                ('assets', models.JSONField(blank=True, default=dict, help_text='SHA-256 digests of the PDF and images, by filename')),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='jats_fingerprint', to='submission.article')),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.20 on 2026-10-18 15:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0041_issue_short_description'),
+        ('imports', '0012_jatsfingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(blank=True, max_length=200, null=True)),
+                ('since', models.DateTimeField(blank=True, help_text='Articles changed after this time were exported. Every article was exported if blank', null=True)),
+                ('started', models.DateTimeField(default=django.utils.timezone.now)),
+                ('article_count', models.PositiveIntegerField(default=0)),
+                ('digests', models.JSONField(blank=True, default=dict, help_text='SHA-256 digests of the identifiers and field answers of each article, by article ID')),
+                ('journal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='journal.journal')),
+            ],
+            options={
+                'ordering': ('-started',),
+                'get_latest_by': 'started',
+            },
+        ),
+    ]
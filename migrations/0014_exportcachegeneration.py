@@ -0,0 +1,24 @@
+# Generated by Django 3.2.20 on 2026-10-18 17:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0041_issue_short_description'),
+        ('imports', '0013_exportrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportCacheGeneration',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('changed', models.DateTimeField(default=django.utils.timezone.now)),
+                ('journal', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='journal.journal')),
+            ],
+        ),
+    ]
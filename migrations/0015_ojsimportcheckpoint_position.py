@@ -0,0 +1,18 @@
+# Generated by Django 3.2.20 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imports', '0014_exportcachegeneration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ojsimportcheckpoint',
+            name='position',
+            field=models.PositiveIntegerField(default=0, help_text='Number of listed OJS objects up to and including the last one imported, used to resume near it'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.20 on 2026-10-18 18:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0041_issue_short_description'),
+        ('imports', '0015_ojsimportcheckpoint_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportrun',
+            name='issue',
+            field=models.ForeignKey(blank=True, help_text='Only articles in this issue were exported, if set', null=True, on_delete=django.db.models.deletion.CASCADE, to='journal.issue'),
+        ),
+    ]
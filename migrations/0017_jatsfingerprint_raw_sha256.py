@@ -0,0 +1,19 @@
+# Generated by Django 3.2.20 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imports', '0016_exportrun_issue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jatsfingerprint',
+            name='raw_sha256',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 digest of the JATS XML as imported', max_length=64),
+            preserve_default=False,
+        ),
+    ]
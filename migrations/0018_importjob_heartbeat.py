@@ -0,0 +1,18 @@
+# Generated by Django 3.2.20 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('imports', '0017_jatsfingerprint_raw_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='heartbeat',
+            field=models.DateTimeField(blank=True, help_text='Last time the worker running this job recorded progress', null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.20 on 2026-10-18 21:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def delete_generations(apps, schema_editor):
+    # The rows only mark changes, they are recreated on the next change
+    ExportCacheGeneration = apps.get_model('imports', 'ExportCacheGeneration')
+    ExportCacheGeneration.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0041_issue_short_description'),
+        ('imports', '0018_importjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            delete_generations,
+            reverse_code=migrations.RunPython.noop,
+        ),
+        migrations.AlterField(
+            model_name='exportcachegeneration',
+            name='journal',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='journal.journal'),
+        ),
+    ]
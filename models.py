@@ -1,4 +1,6 @@
+from django.apps import apps
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.utils import timezone
 
 
@@ -129,3 +131,286 @@ class OJSFile(models.Model):
         'core.File',
         on_delete=models.CASCADE,
     )
+    ojs_updated = models.CharField(
+        max_length=255, blank=True, null=True,
+        help_text='The updatedAt value of the file when it was imported',
+    )
+    sha256 = models.CharField(
+        max_length=64, blank=True, null=True, db_index=True,
+        help_text='SHA-256 digest of the imported file contents',
+    )
+
+
+class OJSImportCheckpoint(models.Model):
+    """Records how far an OJS import got for a journal in each phase"""
+    PHASE_USERS = 'users'
+    PHASE_ARTICLES = 'articles'
+    PHASE_ISSUES = 'issues'
+    PHASE_METRICS = 'metrics'
+    PHASE_CHOICES = (
+        (PHASE_USERS, 'Users'),
+        (PHASE_ARTICLES, 'Articles'),
+        (PHASE_ISSUES, 'Issues'),
+        (PHASE_METRICS, 'Metrics'),
+    )
+
+    journal = models.ForeignKey('journal.Journal', on_delete=models.CASCADE)
+    phase = models.CharField(max_length=20, choices=PHASE_CHOICES)
+    last_ojs_id = models.CharField(
+        max_length=255, blank=True, null=True,
+        help_text='OJS ID of the last object imported in this phase',
+    )
+    position = models.PositiveIntegerField(
+        default=0,
+        help_text='Number of listed OJS objects up to and including the '
+                  'last one imported, used to resume near it',
+    )
+    finished = models.DateTimeField(
+        blank=True, null=True,
+        help_text='Set once every object in this phase has been imported',
+    )
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (
+            ('journal', 'phase'),
+        )
+
+    def __str__(self):
+        return '{} {} import checkpoint ({})'.format(
+            self.journal,
+            self.phase,
+            self.last_ojs_id,
+        )
+
+    def advance(self, ojs_id):
+        self.last_ojs_id = ojs_id
+        self.position += 1
+        self.save(update_fields=['last_ojs_id', 'position', 'updated'])
+
+    def finish(self):
+        self.finished = timezone.now()
+        self.save(update_fields=['finished', 'updated'])
+
+    def reset(self):
+        self.last_ojs_id = None
+        self.position = 0
+        self.finished = None
+        self.save(
+            update_fields=['last_ojs_id', 'position', 'finished', 'updated'])
+
+
+class JATSFingerprint(models.Model):
+    """Records the contents a JATS article was last imported from"""
+    article = models.OneToOneField(
+        'submission.Article',
+        on_delete=models.CASCADE,
+        related_name='jats_fingerprint',
+    )
+    raw_sha256 = models.CharField(
+        max_length=64, blank=True,
+        help_text='SHA-256 digest of the JATS XML as imported',
+    )
+    xml_sha256 = models.CharField(
+        max_length=64,
+        help_text='SHA-256 digest of the canonicalised JATS XML',
+    )
+    assets = models.JSONField(
+        default=dict, blank=True,
+        help_text='SHA-256 digests of the PDF and images, by filename',
+    )
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return 'JATS fingerprint for {}'.format(self.article)
+
+    def changed_assets(self, assets):
+        """ Returns the filenames of the given assets that differ
+        :param assets: A dict of SHA-256 digests by filename
+        """
+        return {
+            filename for filename, digest in assets.items()
+            if self.assets.get(filename) != digest
+        }
+
+
+class ExportRun(models.Model):
+    """Records a delta export of a journal's article metadata"""
+    journal = models.ForeignKey('journal.Journal', on_delete=models.CASCADE)
+    stage = models.CharField(max_length=200, blank=True, null=True)
+    issue = models.ForeignKey(
+        'journal.Issue',
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+        help_text='Only articles in this issue were exported, if set',
+    )
+    since = models.DateTimeField(
+        blank=True, null=True,
+        help_text='Articles changed after this time were exported. '
+                  'Every article was exported if blank',
+    )
+    started = models.DateTimeField(default=timezone.now)
+    article_count = models.PositiveIntegerField(default=0)
+    digests = models.JSONField(
+        default=dict, blank=True,
+        help_text='SHA-256 digests of the identifiers and field answers of '
+                  'each article, by article ID',
+    )
+
+    class Meta:
+        ordering = ('-started',)
+        get_latest_by = 'started'
+
+    def __str__(self):
+        return '{} export run at {} ({} articles)'.format(
+            self.journal,
+            self.started,
+            self.article_count,
+        )
+
+
+class ExportCacheGeneration(models.Model):
+    """Marks when data the exports read without a timestamp last changed
+
+    Each journal's row covers changes to its sections, licences and issues.
+    Changes to article identifiers, field answers, keywords and authors
+    touch the article instead, which the export watermark already follows.
+    """
+    journal = models.OneToOneField(
+        'journal.Journal',
+        on_delete=models.CASCADE,
+    )
+    changed = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return 'Export cache generation for {} ({})'.format(
+            self.journal,
+            self.changed,
+        )
+
+    @classmethod
+    def bump(cls, journal_id):
+        """ Invalidates the cached exports of a journal
+        :param journal_id: The ID of the journal
+        """
+        updated = cls.objects.filter(journal_id=journal_id).update(
+            changed=timezone.now(),
+        )
+        if not updated:
+            cls.objects.create(journal_id=journal_id)
+
+
+def touch_articles(**filters):
+    """ Marks the matching articles as modified without sending signals"""
+    Article = apps.get_model('submission', 'Article')
+    Article.objects.filter(**filters).update(last_modified=timezone.now())
+
+
+def bump_journal_export_generation(sender, instance, **kwargs):
+    ExportCacheGeneration.bump(instance.journal_id)
+
+
+def touch_related_article(sender, instance, **kwargs):
+    if instance.article_id:
+        touch_articles(pk=instance.article_id)
+
+
+def touch_m2m_articles(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            touch_articles(pk=instance.pk)
+    elif action in {'post_add', 'post_remove'}:
+        touch_articles(pk__in=pk_set)
+    elif action == 'pre_clear':
+        # The links are gone by post_clear
+        touch_articles(pk__in=sender.objects.filter(
+            **{instance._meta.model_name: instance},
+        ).values('article_id'))
+
+
+for signal in (post_save, post_delete):
+    for sender in ('submission.Section', 'submission.Licence', 'journal.Issue'):
+        signal.connect(bump_journal_export_generation, sender=sender)
+    for sender in (
+        'identifiers.Identifier',
+        'submission.FieldAnswer',
+        'submission.ArticleAuthorOrder',
+    ):
+        signal.connect(touch_related_article, sender=sender)
+# The through models Article.keywords and Article.authors create
+for sender in ('submission.Article_keywords', 'submission.Article_authors'):
+    m2m_changed.connect(touch_m2m_articles, sender=sender)
+
+
+class ImportJob(models.Model):
+    """A queued import, run out of band by the process_import_jobs command"""
+    TYPE_UPDATE = 'update'
+    TYPE_ARTICLE_METADATA = 'article_metadata'
+    TYPE_JATS = 'jats'
+    TYPE_CHOICES = (
+        (TYPE_UPDATE, 'Import / Export / Update'),
+        (TYPE_ARTICLE_METADATA, 'Article metadata'),
+        (TYPE_JATS, 'JATS zip'),
+    )
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    import_type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    path = models.CharField(
+        max_length=999,
+        help_text='Path to the file to be imported',
+    )
+    folder_path = models.CharField(max_length=999, blank=True, null=True)
+    stage = models.CharField(max_length=200, blank=True, null=True)
+    journal = models.ForeignKey(
+        'journal.Journal',
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+    )
+    owner = models.ForeignKey(
+        'core.Account',
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+    )
+    rows_done = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    error_file = models.CharField(max_length=999, blank=True, null=True)
+    created = models.DateTimeField(default=timezone.now)
+    started = models.DateTimeField(blank=True, null=True)
+    heartbeat = models.DateTimeField(
+        blank=True, null=True,
+        help_text='Last time the worker running this job recorded progress',
+    )
+    finished = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ('created',)
+
+    def __str__(self):
+        return '{} import {} ({})'.format(
+            self.get_import_type_display(),
+            self.pk,
+            self.status,
+        )
+
+    @property
+    def is_finished(self):
+        return self.status in {self.STATUS_COMPLETE, self.STATUS_FAILED}
@@ -0,0 +1,153 @@
+"""
+An on-disk cache of OJS API responses.
+
+Responses are kept in a SQLite database so that the cache survives between
+runs and can be shared by several import processes. Fresh entries are served
+without a request. Stale entries are revalidated with If-None-Match and
+If-Modified-Since, so an unchanged resource costs a 304 response rather than
+the whole payload.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_TTL = 60 * 60
+
+
+class SQLiteResponseCache():
+    """ A cache of OJS API responses stored in a SQLite database file"""
+
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        """
+        :param path: Path to the SQLite database, created if it doesn't exist
+        :param ttl: Seconds for which a cached response is served without
+            revalidating it with the server
+        """
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False,
+        )
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY,"
+                " status INTEGER,"
+                " headers TEXT,"
+                " content BLOB,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " stored REAL"
+                ")"
+            )
+
+    def fetch(self, session, url, headers=None):
+        """ Gets the URL through the cache
+        :param session: The requests.Session to use for the request
+        :param url: The URL to fetch
+        :param headers: Optional request headers
+        :return: A requests.Response
+        """
+        entry = self.load(url)
+        if entry and time.time() - entry["stored"] < self.ttl:
+            self.hits += 1
+            return self.build_response(url, entry)
+
+        request_headers = dict(headers or {})
+        if entry and entry["etag"]:
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+        response = session.get(url, headers=request_headers)
+
+        if entry and response.status_code == 304:
+            self.revalidated += 1
+            self.touch(url)
+            return self.build_response(url, entry)
+
+        self.misses += 1
+        if response.ok:
+            self.store(url, response)
+        return response
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+        }
+
+    @staticmethod
+    def build_response(url, entry):
+        response = requests.Response()
+        response.url = url
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry["content"]
+        return response
+
+    def load(self, url):
+        """ Returns the cached entry for the URL or None"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, headers, content, etag, last_modified, stored"
+                " FROM responses WHERE url = ?",
+                (url, ),
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, content, etag, last_modified, stored = row
+        return {
+            "status": status,
+            "headers": json.loads(headers),
+            "content": content,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored": stored,
+        }
+
+    def store(self, url, response):
+        """ Caches the given response for the URL"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (url, status, headers, content, etag, last_modified, stored)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.status_code,
+                    json.dumps(dict(response.headers)),
+                    response.content,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    time.time(),
+                ),
+            )
+
+    def touch(self, url):
+        """ Marks the cached entry for the URL as fresh"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE responses SET stored = ? WHERE url = ?",
+                (time.time(), url),
+            )
+
+    def close(self):
+        logger.info("OJS response cache %s: %s", self.path, self.stats())
+        self._connection.close()
@@ -1,7 +1,11 @@
+import copy
 from datetime import date
 from dateutil.relativedelta import relativedelta
+import functools
 import os
+import queue
 import re
+import threading
 from urllib import parse as urlparse
 
 import requests
@@ -14,16 +18,29 @@ from plugins.imports import common
 
 logger = get_logger(__name__)
 
+DEFAULT_READ_AHEAD = 2
+# Results listed before a checkpoint's recorded position that are scanned
+# for its OJS ID, in case objects were deleted from the listing since
+RESUME_MARGIN = 20
+
+
 class PaginatedResults():
     OFFSET_KEY = ""
     PAGE_KEY = ""
     RESULTS_KEY = None
+    TOTAL_KEY = None
 
-    def __init__(self, url, client, per_page=20, **client_params):
+    def __init__(
+            self, url, client, per_page=20, read_ahead=DEFAULT_READ_AHEAD,
+            start=0, **client_params,
+    ):
         """ An iterator that yields results from an API using pagination
         :param URL: URL of the API endpoint.
         :param client: The request client to use for fetching results.
         :param per_page: Number of results to be fetched per page.
+        :param read_ahead: Number of pages to fetch ahead of the results being
+            consumed, from a background thread. 0 fetches pages on demand.
+        :param start: Offset of the first result to be yielded.
         :param key: Optional attribute name from which to get the results.
             To be used if the api doesnt return an array but an object like
             {"results": [...]}
@@ -35,39 +52,112 @@ class PaginatedResults():
         self._results = iter([])
         self._client_params = client_params
         self._cached = None
+        self._read_ahead = read_ahead
+        self._start = start
+        self._skip = 0
+        self._pages = None
+        self._stop = threading.Event()
 
     def __iter__(self):
-        if self._results is None:
-            self.results = self._fetch_results
         return self
 
     def __next__(self):
-        try:
-            return next(self._results)
-        except StopIteration:
-            self._fetch_results()
-            return next(self)
+        while True:
+            try:
+                return next(self._results)
+            except StopIteration:
+                self._results = iter(self._next_page_results())
+
+    def __del__(self):
+        self._stop.set()
+
+    def close(self):
+        """ Stops fetching pages ahead of the results being consumed"""
+        self._stop.set()
 
     def _next_page(self):
         if self._page == None:
-            self._page = 1
+            self._page = self._start // self._per_page + 1
+            self._skip = self._start % self._per_page
         else:
             self._page += 1
 
-    def _fetch_results(self):
-        self._next_page()
-        url = self.build_url(self._url, self._page, self._per_page)
-        data = self._client(url, **self._client_params).json()
-        if data:
-            if self.RESULTS_KEY:
-                data = data.get(self.RESULTS_KEY, [])
-        if not data:
-            raise StopIteration
-        if self._cached and self._cached == data:
-            # There is no out of bounds error, API returns last results again
-            raise StopIteration
-        self._cached = data
-        self._results = iter(data)
+    def _next_page_results(self):
+        if self._pages is None:
+            if self._read_ahead:
+                self._pages = self._read_pages_ahead()
+            else:
+                self._pages = self.iter_pages()
+        return next(self._pages)
+
+    def iter_pages(self):
+        """ Yields each page of results, stopping after the last one
+        The total number of results is used to detect the last page when the
+        API provides it (TOTAL_KEY). Otherwise pages are requested until one
+        comes back empty or repeats the previous one.
+        """
+        fetched = self._start
+        while not self._stop.is_set():
+            self._next_page()
+            url = self.build_url(self._url, self._page, self._per_page)
+            data = self._client(url, **self._client_params).json()
+            total = None
+            if data:
+                if self.TOTAL_KEY:
+                    total = data.get(self.TOTAL_KEY)
+                if self.RESULTS_KEY:
+                    data = data.get(self.RESULTS_KEY, [])
+            if not data:
+                return
+            if total is None and self._cached == data:
+                # There is no out of bounds error, API returns last results again
+                return
+            self._cached = data
+            if self._skip:
+                data = data[self._skip:]
+                self._skip = 0
+            if data:
+                yield data
+            fetched += len(data)
+            if total is not None and fetched >= total:
+                return
+
+    def _read_pages_ahead(self):
+        """ Yields the pages fetched by a background thread running iter_pages
+        """
+        pages = queue.Queue(maxsize=self._read_ahead)
+        end = object()
+        stop = self._stop
+        # The thread works on a copy so that it holds no reference to this
+        # iterator, which can then be garbage collected (stopping the
+        # thread) if it is abandoned before the last page.
+        reader = copy.copy(self)
+        reader._pages = None
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+
+        def read():
+            try:
+                for page in reader.iter_pages():
+                    put(page)
+            except Exception as e:
+                put(e)
+            put(end)
+
+        threading.Thread(target=read, daemon=True).start()
+        while True:
+            page = pages.get()
+            if page is end:
+                return
+            if isinstance(page, Exception):
+                raise page
+            yield page
 
     @classmethod
     def build_url(cls, url, page, offset):
@@ -80,6 +170,32 @@ class PaginatedResults():
         return urlparse.urlunparse(url_parts)
         
 
+def resume_after(paginate, ojs_id, key=None, position=None):
+    """ Yields the results listed after the one with the given OJS ID
+    When the position of the ID in the listing is known, the listing starts
+    shortly before it rather than from the first page. If the ID is not found,
+    for instance because the object was deleted from OJS, the listing starts
+    over and every result is yielded instead.
+    :param paginate: Callable returning a PaginatedResults for a start offset
+    :param ojs_id: The OJS ID to resume after or None
+    :param key: Optional callable returning the OJS ID of a result
+    :param position: Optional number of results listed up to the OJS ID
+    """
+    if ojs_id is None:
+        yield from paginate(start=0)
+        return
+    if key is None:
+        key = lambda result: result["id"]
+    start = max(0, (position or 0) - RESUME_MARGIN)
+    results = paginate(start=start)
+    for result in results:
+        if str(key(result)) == str(ojs_id):
+            yield from results
+            return
+    logger.warning("OJS ID %s not found, unable to resume", ojs_id)
+    yield from paginate(start=0)
+
+
 class OJS2PaginatedResults(PaginatedResults):
     OFFSET_KEY = "limit"
     PAGE_KEY = "page"
@@ -89,6 +205,7 @@ class OJS3PaginatedResults(PaginatedResults):
     OFFSET_KEY = "count"
     PAGE_KEY = "offset"
     RESULTS_KEY = "items"
+    TOTAL_KEY = "itemsMax"
 
     def _next_page(self):
         """Calculate next page parameter for the next request
@@ -97,7 +214,7 @@ class OJS3PaginatedResults(PaginatedResults):
         e.g with a count of 10, to get page 2 we set the offset to  0 + 10
         """
         if self._page == None:
-            self._page = 0 # We start at 0 because it is an offset not a page
+            self._page = self._start # Start at an offset rather than a page
         else:
             self._page += self._per_page
 
@@ -114,13 +231,20 @@ class OJSBaseClient():
         "Content-Type": "application/x-www-form-urlencoded",
     }
 
-    def __init__(self, journal_url, username=None, password=None, session=None):
-        """"A Client for consumption of OJS APIs"""
+    def __init__(
+            self, journal_url, username=None, password=None, session=None,
+            cache=None,
+    ):
+        """"A Client for consumption of OJS APIs
+        :param cache: Optional ojs.cache.SQLiteResponseCache through which API
+            responses are fetched. Streamed requests (files) bypass it.
+        """
         self.journal_url = journal_url
         self.base_url = urlparse.urlunsplit(
             urlparse.urlsplit(journal_url)._replace(path="/")
         )
         self._auth_dict = {}
+        self.cache = None
         self.session = session or requests.Session()
         self.session.headers.update(**self.HEADERS)
         self.authenticated = False
@@ -130,6 +254,13 @@ class OJSBaseClient():
                 'password': password,
             }
             self.login()
+        # Login requests must reach the server to set the session cookies
+        self.cache = cache
+
+    def get(self, request_url, headers=None, stream=False):
+        if self.cache is not None and not stream:
+            return self.cache.fetch(self.session, request_url, headers=headers)
+        return self.session.get(request_url, headers=headers, stream=stream)
 
     def login(self, username=None, password=None):
         # Fetch Login page
@@ -162,7 +293,7 @@ class OJSJanewayClient(OJSBaseClient):
 
 
     def fetch(self, request_url, headers=None, stream=False):
-        resp = self.session.get(request_url, headers=headers, stream=stream)
+        resp = self.get(request_url, headers=headers, stream=stream)
         if not resp.ok:
             resp.raise_for_status()
         return resp
@@ -414,12 +545,40 @@ class OJS3APIClient(OJSBaseClient):
     SUBMISSION_FILE_INTERNAL_REVIEW_FILE = 19
     SUBMISSION_FILE_INTERNAL_REVIEW_REVISION = 20
 
+    # Responses kept by a staging client, keyed by URL
+    _staged_responses = None
+
     def fetch(self, request_url, headers=None, stream=False):
-        resp = self.session.get(request_url, headers=headers, stream=stream)
+        if self._staged_responses is not None:
+            return self._fetch_staged(
+                request_url, headers=headers, stream=stream)
+        resp = self.get(request_url, headers=headers, stream=stream)
         if not resp.ok:
             resp.raise_for_status()
         return resp
 
+    def staging_client(self):
+        """ Returns a copy of this client that keeps every response it fetches
+        The copy shares its session, and so its authentication, with this
+        client. Once a URL has been fetched through the copy, the stored
+        response is served instead of requesting it again. This allows the
+        API calls and files needed to import an article to be staged from a
+        worker thread ahead of the import itself.
+        """
+        staged = copy.copy(self)
+        staged._staged_responses = {}
+        return staged
+
+    def _fetch_staged(self, request_url, headers=None, stream=False):
+        if request_url not in self._staged_responses:
+            resp = self.get(request_url, headers=headers, stream=stream)
+            if not resp.ok:
+                resp.raise_for_status()
+            # Read the body now so that it can be served more than once
+            resp.content
+            self._staged_responses[request_url] = resp
+        return self._staged_responses[request_url]
+
     def fetch_file(self, url, filename=None, extension=None, exc_mimes=None):
         """ Fetches  file from given URL
         :param url: The URL from where to fetch the file
@@ -478,7 +637,17 @@ class OJS3APIClient(OJSBaseClient):
     def get_published_articles(self):
         return self.get_articles(stages=[self.STATUS_PUBLISHED, self.STATUS_QUEUED])
 
-    def get_articles(self, stages=None):
+    def get_articles(self, stages=None, after=None, position=None):
+        for article in self.get_article_summaries(
+                stages, after=after, position=position):
+            yield self.get_article(article["id"])
+
+    def get_article_summaries(self, stages=None, after=None, position=None):
+        """ Lists submissions without retrieving each one in full
+        :param stages: Optional list of OJS submission stages to filter by
+        :param after: Optional OJS ID of a submission to resume after
+        :param position: Optional number of submissions listed up to `after`
+        """
         request_url = (
             self.journal_url
             + self.API_PATH
@@ -488,9 +657,9 @@ class OJS3APIClient(OJSBaseClient):
             params = {"stages": stages}
             request_url += "?%s" % urlparse.urlencode(params)
         client = self.fetch
-        paginator = OJS3PaginatedResults(request_url, client)
-        for i, article in enumerate(paginator):
-            yield self.get_article(article["id"])
+        paginate = functools.partial(OJS3PaginatedResults, request_url, client)
+        for article in resume_after(paginate, after, position=position):
+            yield article
 
     def get_article(self, ojs_id):
         request_url = (
@@ -581,7 +750,7 @@ class OJS3APIClient(OJSBaseClient):
             yield f
 
 
-    def get_issues(self, unpublished=False):
+    def get_issues(self, unpublished=False, after=None, position=None):
         request_url = (
             self.journal_url
             + self.API_PATH
@@ -594,8 +763,8 @@ class OJS3APIClient(OJSBaseClient):
             request_url += "?%s" % urlparse.urlencode(query_params)
 
         client = self.fetch
-        paginator = OJS3PaginatedResults(request_url, client)
-        for i, issue in enumerate(paginator):
+        paginate = functools.partial(OJS3PaginatedResults, request_url, client)
+        for issue in resume_after(paginate, after, position=position):
             # The issue endpoint for each issue object provides more data
             yield self.get_issue(issue["id"])
 
@@ -622,7 +791,7 @@ class OJS3APIClient(OJSBaseClient):
         )
         return self.fetch_file(request_url)
 
-    def get_users(self):
+    def get_users(self, after=None, position=None):
         """ Retrieves all users for the given journal"""
         request_url = (
             self.journal_url
@@ -630,8 +799,8 @@ class OJS3APIClient(OJSBaseClient):
             + self.USERS_PATH % ''
         )
         client = self.fetch
-        paginator = OJS3PaginatedResults(request_url, client)
-        for _, user in enumerate(paginator):
+        paginate = functools.partial(OJS3PaginatedResults, request_url, client)
+        for user in resume_after(paginate, after, position=position):
             # The site endpoint for each issue object provides more metadata
             yield self.get_user(user["id"])
 
@@ -645,7 +814,7 @@ class OJS3APIClient(OJSBaseClient):
         response = self.fetch(request_url)
         return response.json()
 
-    def get_metrics(self, ojs_ids=None):
+    def get_metrics(self, ojs_ids=None, after=None, position=None):
         """ Retrieves the metrics for submissions"""
         request_url = (
             self.journal_url
@@ -659,6 +828,9 @@ class OJS3APIClient(OJSBaseClient):
         if ojs_ids:
             query_params["submissionIds"] = ','.join(ojs_ids)
         request_url += "?%s" % urlparse.urlencode(query_params)
-        paginator = OJS3PaginatedResults(request_url, self.fetch)
-        for result in paginator:
+        paginate = functools.partial(
+            OJS3PaginatedResults, request_url, self.fetch)
+        key = lambda result: result["publication"]["id"]
+        for result in resume_after(
+                paginate, after, key=key, position=position):
             yield result
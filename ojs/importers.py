@@ -1070,6 +1070,63 @@ def import_article_metrics(ojs_id, journal, views=0, downloads=0):
     metric.save()
 
 
+def bulk_import_article_metrics(journal, metrics, batch_size=None):
+    """ Imports the metrics of many articles with a few queries per batch
+    :param journal: The journal the articles were imported into
+    :param metrics: A mapping from an OJS article ID to a dict with the
+        "views" and/or "downloads" to record for that article
+    :param batch_size: Number of records resolved and saved per batch
+    :return: A dict with the number of inserted, updated and unmatched records
+    """
+    batch_size = batch_size or utils.DEFAULT_BATCH_SIZE
+    counts = {"inserted": 0, "updated": 0, "unmatched": 0}
+    for ojs_ids in utils.chunked(metrics, batch_size):
+        article_ids = dict(
+            identifiers_models.Identifier.objects.filter(
+                id_type="ojs_id",
+                identifier__in=[str(ojs_id) for ojs_id in ojs_ids],
+                article__journal=journal,
+            ).values_list("identifier", "article_id")
+        )
+        existing = {
+            access.article_id: access
+            for access in metrics_models.HistoricArticleAccess.objects.filter(
+                article_id__in=article_ids.values(),
+            )
+        }
+        to_create = []
+        to_update = {}
+        for ojs_id in ojs_ids:
+            article_id = article_ids.get(str(ojs_id))
+            if article_id is None:
+                logger.warning(
+                    "Article metric record for unimported article with OJS id "
+                    "%s" % ojs_id,
+                )
+                counts["unmatched"] += 1
+                continue
+            access = existing.get(article_id)
+            if access is None:
+                access = metrics_models.HistoricArticleAccess(
+                    article_id=article_id, views=0, downloads=0,
+                )
+                existing[article_id] = access
+                to_create.append(access)
+            else:
+                to_update[article_id] = access
+            for field, value in metrics[ojs_id].items():
+                setattr(access, field, value)
+
+        metrics_models.HistoricArticleAccess.objects.bulk_create(to_create)
+        metrics_models.HistoricArticleAccess.objects.bulk_update(
+            to_update.values(), ["views", "downloads"],
+        )
+        counts["inserted"] += len(to_create)
+        counts["updated"] += len(to_update)
+
+    return counts
+
+
 def import_user_metadata(user_data, journal):
     created = False
     if len(user_data["roles"]) == 0:
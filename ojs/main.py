@@ -1,14 +1,16 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
 
 from submission import models as submission_models
 
+from plugins.imports import models
 from plugins.imports.ojs import importers
 from plugins.imports.ojs import clients, ojs3_importers
 from plugins.imports.ojs.importers import (
     calculate_article_stage,
     create_workflow_log,
     import_article_metadata,
-    import_article_metrics,
     import_collection_metadata,
     import_copyediting,
     import_typesetting,
@@ -148,16 +150,15 @@ def import_metrics(ojs_client, journal):
     except Exception as e:
         logger.warning("Couldn't retrieve metrics: %s" % e)
     else:
+        metrics = {}
         for article_views in metrics_data["views"]:
-            import_article_metrics(
-                article_views["id"], journal,
-                views=int(article_views["count"]),
-            )
+            metrics.setdefault(article_views["id"], {})["views"] = int(
+                article_views["count"])
         for article_downloads in metrics_data["downloads"]:
-            import_article_metrics(
-                article_downloads["id"], journal,
-                downloads=int(article_downloads["count"]),
-            )
+            metrics.setdefault(article_downloads["id"], {})["downloads"] = int(
+                article_downloads["count"])
+        counts = importers.bulk_import_article_metrics(journal, metrics)
+        logger.info("Imported metrics: %s", counts)
 
 
 def import_users(ojs_client, journal):
@@ -175,35 +176,157 @@ def import_journal_settings(ojs_client, journal):
     settings_dict = ojs_client.get_journal_settings
     return importers.import_journal_settings(settings_dict, journal)
 
+def get_ojs3_checkpoint(journal, phase, resume=False):
+    """ Gets the checkpoint recording the progress of an OJS3 import phase
+    Unless resuming, the checkpoint is reset so that the phase starts over.
+    :param journal: The journal being imported
+    :param phase: One of the OJSImportCheckpoint.PHASE_* constants
+    :param resume: Whether to resume from the last recorded OJS ID
+    :return: An instance of OJSImportCheckpoint
+    """
+    checkpoint, _ = models.OJSImportCheckpoint.objects.get_or_create(
+        journal=journal,
+        phase=phase,
+    )
+    if not resume:
+        checkpoint.reset()
+    elif checkpoint.finished:
+        logger.info("Skipping finished %s import for %s", phase, journal)
+    elif checkpoint.last_ojs_id:
+        logger.info(
+            "Resuming %s import for %s after OJS ID %s",
+            phase, journal, checkpoint.last_ojs_id,
+        )
+    return checkpoint
+
+
 def import_ojs3_articles(
         client, journal, ojs_id=None,
         editorial=False, raise_on_exc=False,
-        galleys=True,
+        galleys=True, workers=None, resume=False,
 ):
+    """ Imports OJS3 submissions into the given journal
+    With more than one worker, the API calls and files for upcoming articles
+    are staged concurrently by worker threads while the articles are
+    imported, one at a time, on the calling thread.
+    With resume, articles up to the last one recorded by the articles
+    checkpoint are skipped. The checkpoint only advances past articles that
+    were imported, stopping at the first failure so that resuming retries it.
+    """
+    checkpoint = None
     if ojs_id:
-        articles = [client.get_article(ojs_id)]
+        articles = ((client, client.get_article(ojs_id), None), )
     else:
-        articles = client.get_articles()
-    for d in articles:
-        try:
-            ojs3_importers.import_article(
-                client, journal, d,
+        checkpoint = get_ojs3_checkpoint(
+            journal, models.OJSImportCheckpoint.PHASE_ARTICLES, resume)
+        if checkpoint.finished:
+            return
+        if workers and workers > 1:
+            imported_files = set(
+                models.OJSFile.objects.filter(
+                    journal=journal,
+                ).values_list("ojs_id", "ojs_updated")
+            )
+            articles = stage_ojs3_articles(
+                client, workers, raise_on_exc=raise_on_exc,
+                after=checkpoint.last_ojs_id,
+                position=checkpoint.position,
                 editorial=editorial, galleys=galleys,
+                imported_files=imported_files,
             )
-        except Exception as e:
-            if raise_on_exc:
-                raise
-            logger.error("Article Import Failed: %s", e)
-            logger.exception(e)
+        else:
+            articles = (
+                (client, d, None)
+                for d in client.get_articles(
+                    after=checkpoint.last_ojs_id,
+                    position=checkpoint.position,
+                )
+            )
+    failed = False
+    for article_client, d, error in articles:
+        if error is None:
+            try:
+                ojs3_importers.import_article(
+                    article_client, journal, d,
+                    editorial=editorial, galleys=galleys,
+                )
+            except Exception as e:
+                if raise_on_exc:
+                    raise
+                logger.error("Article Import Failed: %s", e)
+                logger.exception(e)
+                error = e
+        if error is not None:
+            failed = True
+        elif checkpoint and not failed:
+            checkpoint.advance(d["id"])
+    if checkpoint and failed:
+        logger.warning(
+            "Some articles failed, %s checkpoint left at OJS ID %s",
+            journal, checkpoint.last_ojs_id,
+        )
+    elif checkpoint:
+        checkpoint.finish()
+
+
+def stage_ojs3_articles(
+        client, workers, raise_on_exc=False, after=None, position=None,
+        **kwargs,
+):
+    """ Stages OJS3 submissions for import from a pool of worker threads
+    Up to twice as many articles as workers are staged ahead of the one
+    being consumed. Articles are yielded in the order OJS lists them.
+    :param client: An OJS3APIClient
+    :param workers: Number of worker threads
+    :param raise_on_exc: Raise errors instead of logging and skipping
+    :param after: Optional OJS ID of a submission to resume after
+    :param position: Optional number of submissions listed up to `after`
+    :param kwargs: Passed on to ojs3_importers.stage_article
+    :return: A generator of (staging client, article dict, error) tuples,
+        where the error is the exception raised while staging, if any, and
+        the article dict is the submission's summary when staging failed.
+    """
+    pending = deque()
+    summaries = client.get_article_summaries(after=after, position=position)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for summary in summaries:
+            pending.append((summary, executor.submit(
+                ojs3_importers.stage_article, client, summary["id"], **kwargs
+            )))
+            if len(pending) >= workers * 2:
+                yield _staged_result(*pending.popleft(), raise_on_exc)
+        while pending:
+            yield _staged_result(*pending.popleft(), raise_on_exc)
+
+
+def _staged_result(summary, future, raise_on_exc=False):
+    try:
+        staged, article_dict = future.result()
+    except Exception as e:
+        if raise_on_exc:
+            raise
+        logger.error("Article Staging Failed: %s", e)
+        logger.exception(e)
+        return None, summary, e
+    return staged, article_dict, None
 
 
-def import_ojs3_issues(client, journal, issue_id=None):
+def import_ojs3_issues(client, journal, issue_id=None, resume=False):
     if issue_id:
-        issues = [client.get_issue(issue_id)]
-    else:
-        issues = client.get_issues()
-    for issue_dict in issues:
+        ojs3_importers.import_issue(
+            client, journal, client.get_issue(issue_id))
+        return
+    checkpoint = get_ojs3_checkpoint(
+        journal, models.OJSImportCheckpoint.PHASE_ISSUES, resume)
+    if checkpoint.finished:
+        return
+    for issue_dict in client.get_issues(
+            after=checkpoint.last_ojs_id,
+            position=checkpoint.position,
+    ):
         ojs3_importers.import_issue(client, journal, issue_dict)
+        checkpoint.advance(issue_dict["id"])
+    checkpoint.finish()
 
 
 def import_ojs3_unpublished_issues(client, journal):
@@ -214,7 +337,7 @@ def import_ojs3_unpublished_issues(client, journal):
 
 def import_ojs3_journals(
     client, journal_acronym=None, include_content=True, update_journals=True,
-    galleys=True,
+    galleys=True, workers=None, resume=False,
 ):
     journals = client.get_journals(journal_acronym)
     for journal_dict in journals:
@@ -225,29 +348,50 @@ def import_ojs3_journals(
         if include_content:
             journal_client = clients.OJS3APIClient(
                 journal_dict["url"],
+                cache=client.cache,
                 **client._auth_dict,
             )
             try:
-                import_ojs3_users(journal_client, journal)
-                import_ojs3_articles(journal_client, journal, galleys)
-                import_ojs3_issues(journal_client, journal)
-                import_ojs3_metrics(journal_client, journal)
+                import_ojs3_users(journal_client, journal, resume=resume)
+                import_ojs3_articles(
+                    journal_client, journal,
+                    galleys=galleys, workers=workers, resume=resume,
+                )
+                import_ojs3_issues(journal_client, journal, resume=resume)
+                import_ojs3_metrics(journal_client, journal, resume=resume)
             except Exception as e:
                 logger.exception("Error importing articles: %s", journal)
 
 
-def import_ojs3_users(client, journal):
-    for user_dict in client.get_users():
+def import_ojs3_users(client, journal, resume=False):
+    checkpoint = get_ojs3_checkpoint(
+        journal, models.OJSImportCheckpoint.PHASE_USERS, resume)
+    if checkpoint.finished:
+        return
+    for user_dict in client.get_users(
+            after=checkpoint.last_ojs_id,
+            position=checkpoint.position,
+    ):
         ojs3_importers.import_user(user_dict, journal)
-
-
-def import_ojs3_metrics(client, journal, ojs_ids=None):
-    metrics = client.get_metrics(ojs_ids=None)
-    for record in metrics:
-        ojs3_importers.import_article_metrics(client, journal, record)
-
-    for record in metrics:
-        ojs3_importers.import_article_metrics(client, journal, record)
+        checkpoint.advance(user_dict["id"])
+    checkpoint.finish()
+
+
+def import_ojs3_metrics(client, journal, ojs_ids=None, resume=False):
+    checkpoint = get_ojs3_checkpoint(
+        journal, models.OJSImportCheckpoint.PHASE_METRICS, resume)
+    if checkpoint.finished:
+        return
+    metrics = {
+        record["publication"]["id"]: {
+            "downloads": record["galleyViews"],
+            "views": record["abstractViews"],
+        }
+        for record in client.get_metrics(ojs_ids=ojs_ids)
+    }
+    counts = importers.bulk_import_article_metrics(journal, metrics)
+    logger.info("Imported metrics: %s", counts)
+    checkpoint.finish()
 
 
 def import_ojs3_galleys(client, journal, ojs_id=None):
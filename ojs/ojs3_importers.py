@@ -1,4 +1,5 @@
 from datetime import timedelta
+import hashlib
 
 from bs4 import BeautifulSoup
 from dateutil import parser as dateparser
@@ -166,6 +167,52 @@ def import_article(client, journal, article_dict, editorial=False, galleys=True)
     return article
 
 
+def stage_article(
+        client, ojs_id, editorial=False, galleys=True, imported_files=None,
+):
+    """ Fetches everything import_article needs from OJS for an article
+    Only the OJS API is used, so this can run on a worker thread while the
+    database work for other articles carries on.
+    :param client: An OJS3APIClient
+    :param ojs_id: The OJS ID of the submission
+    :param imported_files: Optional set of (OJS file ID, updatedAt) pairs
+        for files already imported, which won't be fetched again
+    :return: A tuple of a staging client holding the responses and the
+        article dict, ready to be passed to import_article
+    """
+    staged = client.staging_client()
+    article_dict = staged.get_article(ojs_id)
+    pub_article_dict = get_pub_article_dict(article_dict, staged)
+    file_jsons = []
+    if galleys:
+        file_jsons.extend(
+            galley["file"] for galley in pub_article_dict["galleys"]
+            if galley["file"] and not galley["urlRemote"]
+        )
+    if editorial:
+        submission_id = article_dict["id"]
+        file_jsons.extend(staged.get_manuscript_files(submission_id))
+        file_jsons.extend(
+            staged.get_copyediting_files(submission_id, drafts=True))
+        file_jsons.extend(staged.get_copyediting_files(submission_id))
+        file_jsons.extend(staged.get_prod_ready_files(submission_id))
+        for round_dict in article_dict["reviewRounds"]:
+            file_jsons.extend(staged.get_review_files(
+                submission_id, round_ids=[round_dict["id"]]))
+            file_jsons.extend(staged.get_review_files(
+                submission_id, round_ids=[round_dict["id"]], revisions=True))
+        for review_dict in article_dict["reviewAssignments"]:
+            file_jsons.extend(staged.get_review_files(
+                submission_id, review_ids=[review_dict["id"]]))
+    imported_files = imported_files or set()
+    for file_json in file_jsons:
+        if (file_json.get("id"), file_json.get("updatedAt")) in imported_files:
+            continue
+        staged.fetch_file(file_json["url"])
+
+    return staged, article_dict
+
+
 def import_article_metrics(client, journal, data):
     ojs_id = data["publication"]["id"]
     try:
@@ -716,6 +763,11 @@ def import_user_roles(user_dict, account, journal):
 
 
 def import_file(file_json, client, article, label=None, file_name=None, owner=None):
+    imported_file = get_imported_file(file_json, article)
+    if imported_file:
+        logger.debug("Skipping unchanged OJS file %s", file_json["id"])
+        return imported_file
+
     if not label:
         label = file_json.get("label", "file")
     if not file_name:
@@ -734,6 +786,21 @@ def import_file(file_json, client, article, label=None, file_name=None, owner=No
 
     django_file = client.fetch_file(file_json["url"])
     if django_file:
+        digest = hashlib.sha256(django_file.read()).hexdigest()
+        django_file.seek(0)
+        duplicate = models.OJSFile.objects.filter(
+            journal=article.journal,
+            sha256=digest,
+            file__article_id=article.pk,
+        ).select_related("file").first()
+        if duplicate:
+            logger.debug(
+                "OJS file %s is identical to %s",
+                file_json.get("id"), duplicate.file,
+            )
+            record_imported_file(file_json, article, duplicate.file, digest)
+            return duplicate.file
+
         janeway_file = core_files.save_file_to_article(
             django_file, article, owner, label=label or file_json["label"]
         )
@@ -754,10 +821,45 @@ def import_file(file_json, client, article, label=None, file_name=None, owner=No
             core_models.File.objects.filter(id=janeway_file.pk).update(
                 last_modified=attempt_to_make_timezone_aware(file_json["createdAt"])
             )
+        record_imported_file(file_json, article, janeway_file, digest)
 
         return janeway_file
 
 
+def get_imported_file(file_json, article):
+    """ Returns the file already imported for an unchanged OJS file
+    :param file_json: The OJS3 submission file data
+    :param article: The article the file is being imported into
+    :return: A core.models.File or None if the file has to be fetched
+    """
+    if not file_json.get("id") or not file_json.get("updatedAt"):
+        return None
+    imported = models.OJSFile.objects.filter(
+        journal=article.journal,
+        ojs_id=file_json["id"],
+        ojs_updated=file_json["updatedAt"],
+        file__article_id=article.pk,
+    ).select_related("file").first()
+    if imported:
+        return imported.file
+    return None
+
+
+def record_imported_file(file_json, article, janeway_file, digest=None):
+    """ Maps an OJS file to the Janeway file it was imported as"""
+    if not file_json.get("id"):
+        return
+    models.OJSFile.objects.update_or_create(
+        journal=article.journal,
+        ojs_id=file_json["id"],
+        defaults={
+            "file": janeway_file,
+            "ojs_updated": file_json.get("updatedAt"),
+            "sha256": digest,
+        },
+    )
+
+
 def get_or_create_issue(issue_dict, journal):
     issue_type = journal_models.IssueType.objects.get(
         journal=journal, code='issue')
@@ -1,13 +1,24 @@
 from django.test import TestCase
 
-from plugins.imports import utils, export, views
+from plugins.imports import utils, export, models, views
+from identifiers import models as id_models
 from submission import models as submission_models
 from journal import models as journal_models
 from utils.testing import helpers
 
+from bs4 import BeautifulSoup
 from rest_framework import routers
-from django.http import HttpRequest
+from django.db import connection
+from django.http import FileResponse, HttpRequest
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 import csv
+import io
+import json
+import os
+import tempfile
+import zipfile
 
 from plugins.imports.tests.test_utils import CSV_DATA_1, run_import, dict_from_csv_string
 
@@ -47,6 +58,47 @@ class TestExport(TestCase):
 
         self.assertEqual(expected_csv_data, csv_dict)
 
+    def test_stream_using_import_format_matches_file_export(self):
+        articles = submission_models.Article.objects.filter(id=1)
+        filepath, _csv_name = export.export_using_import_format(articles)
+        with open(filepath, 'r') as export_csv:
+            expected = export_csv.read()
+
+        response = export.stream_using_import_format(articles, 'export.csv')
+        streamed = b''.join(response.streaming_content).decode('utf-8')
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(expected, streamed)
+
+    def test_export_query_count_does_not_grow_with_articles(self):
+        for _ in range(3):
+            run_import(dict_from_csv_string(CSV_DATA_1), owner=self.test_user)
+        articles = submission_models.Article.objects.filter(
+            journal__code='TST',
+        )
+        self.assertGreater(articles.count(), 3)
+
+        with CaptureQueriesContext(connection) as single:
+            list(export.iter_import_format_csv(articles.filter(id=1)))
+        with CaptureQueriesContext(connection) as every:
+            rows = list(export.iter_import_format_csv(articles))
+
+        self.assertEqual(len(single), len(every))
+        self.assertGreater(len(rows), len(articles))
+
+    def test_zip_export_files_streams_archive(self):
+        articles = submission_models.Article.objects.filter(id=1)
+        journal = articles[0].journal
+        response = export.zip_export_files(journal, articles)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(
+            archive.read('article_data.csv').decode('utf-8'),
+            ''.join(export.iter_import_format_csv(articles)),
+        )
+
     def test_sorted_export_headers_match_import_headers(self):
         article_1 = submission_models.Article.objects.get(id=1)
         article_1.export_files = article_1.exportfile_set.all()
@@ -127,3 +179,178 @@ class TestExport(TestCase):
 
 
         self.assertEqual(2, lines)
+
+    def test_delta_export_selects_changed_articles(self):
+        run_import(dict_from_csv_string(CSV_DATA_1), owner=self.test_user)
+        journal = journal_models.Journal.objects.get(code='TST')
+        articles, run = export.plan_delta_export(journal)
+        self.assertIsNone(run.since)
+        self.assertEqual(run.article_count, articles.count())
+        run.save()
+
+        articles, run = export.plan_delta_export(journal)
+        self.assertEqual(run.since, models.ExportRun.objects.latest().started)
+        self.assertFalse(articles.exists())
+        run.save()
+
+        changed = submission_models.Article.objects.last()
+        id_models.Identifier.objects.create(
+            id_type='pubid',
+            identifier='delta-1',
+            article=changed,
+        )
+        articles, run = export.plan_delta_export(journal)
+        self.assertEqual([changed], list(articles))
+        self.assertEqual(1, run.article_count)
+
+    def test_plan_delta_export_by_issue(self):
+        article = submission_models.Article.objects.get(id=1)
+        issue = article.issues.first()
+        articles, run = export.plan_delta_export(article.journal, issue=issue)
+        self.assertEqual(run.issue, issue)
+        self.assertEqual(
+            set(articles),
+            set(issue.articles.exclude(
+                stage=submission_models.STAGE_UNSUBMITTED)),
+        )
+        run.save()
+
+        _articles, journal_run = export.plan_delta_export(article.journal)
+        self.assertIsNone(journal_run.since)
+
+    def test_zip_export_files_served_from_cache_until_changed(self):
+        articles = submission_models.Article.objects.filter(id=1)
+        journal = articles[0].journal
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = export.ExportArtifactCache(cache_dir)
+            first = export.zip_export_files(journal, articles, cache=cache)
+            first_zip = b''.join(first.streaming_content)
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+
+            cached = export.zip_export_files(journal, articles, cache=cache)
+            self.assertIsInstance(cached, FileResponse)
+            self.assertEqual(first_zip, b''.join(cached.streaming_content))
+
+            article = articles[0]
+            article.title = 'A changed title'
+            article.save()
+            changed = export.zip_export_files(journal, articles, cache=cache)
+            self.assertNotIsInstance(changed, FileResponse)
+
+    def test_export_cache_key_follows_related_changes(self):
+        articles = submission_models.Article.objects.filter(id=1)
+        article = articles[0]
+        journal = article.journal
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = export.ExportArtifactCache(cache_dir)
+            keys = {cache.key(journal, articles)}
+
+            article.section.name = 'A renamed section'
+            article.section.save()
+            keys.add(cache.key(journal, articles))
+
+            id_models.Identifier.objects.create(
+                id_type='pubid',
+                identifier='cached-1',
+                article=article,
+            )
+            keys.add(cache.key(journal, articles))
+
+            keyword = submission_models.Keyword.objects.create(word='cached')
+            article.keywords.add(keyword)
+            keys.add(cache.key(journal, articles))
+
+            keyword.article_set.clear()
+            keys.add(cache.key(journal, articles))
+
+            self.assertEqual(5, len(keys))
+
+            with CaptureQueriesContext(connection) as queries:
+                cache.key(journal, articles)
+            self.assertEqual(4, len(queries))
+
+    def test_article_summary_csv_batches_articles(self):
+        for _ in range(2):
+            run_import(dict_from_csv_string(CSV_DATA_1), owner=self.test_user)
+        articles = submission_models.Article.objects.filter(
+            journal__code='TST',
+        ).order_by('pk')
+
+        with CaptureQueriesContext(connection) as single:
+            list(export.iter_article_summary_csv(articles.filter(id=1)))
+        with CaptureQueriesContext(connection) as every:
+            lines = list(export.iter_article_summary_csv(articles))
+        self.assertEqual(len(single), len(every))
+
+        rows = list(csv.reader(lines))
+        titles = [row[1] for row in rows if row and row[0] == 'Title']
+        self.assertEqual(
+            list(articles.values_list('title', flat=True)),
+            titles,
+        )
+        self.assertIn(
+            ['First Name', 'Middle Name', 'Last name', 'Email Address',
+             'Affiliation', 'ORCiD'],
+            rows,
+        )
+
+    def test_article_summary_csv_matches_template_export(self):
+        article = submission_models.Article.objects.get(id=1)
+        # The templates rendered missing values as "None"
+        article.comments_editor = 'No comments'
+        article.date_submitted = timezone.now()
+        article.save()
+        article_files = export.get_files_by_article([article]).get(
+            article.pk, [],
+        )
+        context = {
+            'article': article,
+            'journal': article.journal,
+            'files': article_files,
+        }
+        html = ''.join(
+            render_to_string('import/elements/{}'.format(element), context)
+            for element in [
+                'general.html',
+                'authors.html',
+                'files.html',
+                'dates.html',
+                'funding.html',
+            ]
+        )
+        expected = []
+        for table in BeautifulSoup(html, 'lxml').find_all('table'):
+            for row in table.find_all('tr'):
+                expected.append([
+                    cell.string or ''
+                    for cell in row.findChildren(['th', 'td'])
+                ])
+            expected.append([])
+
+        lines = export.iter_article_summary_csv(
+            [article],
+            {article.pk: article_files},
+            journal=article.journal,
+        )
+        self.assertEqual(expected, list(csv.reader(lines)))
+
+    def test_jsonl_export_nests_article_metadata(self):
+        articles = submission_models.Article.objects.filter(id=1)
+        lines = list(export.iter_jsonl_export(articles))
+        self.assertEqual(1, len(lines))
+
+        record = json.loads(lines[0])
+        expected = dict_from_csv_string(CSV_DATA_1)
+        self.assertEqual(1, record['id'])
+        self.assertEqual(expected[1]['Article title'], record['title'])
+        self.assertEqual(expected[1]['DOI'], record['doi'])
+        self.assertIn(
+            {'type': 'doi', 'identifier': expected[1]['DOI']},
+            record['identifiers'],
+        )
+        self.assertEqual(['dinosaurs', 'Socratic teaching'], record['keywords'])
+        self.assertEqual(
+            [row['Author surname'] for row in expected.values()],
+            [author['surname'] for author in record['authors']],
+        )
+        self.assertTrue(record['authors'][0]['is_primary'])
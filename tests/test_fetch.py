@@ -0,0 +1,132 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from plugins.imports import fetch
+
+
+class FileServer(ThreadingHTTPServer):
+    """ Serves a few paths while recording the requests it gets"""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FileHandler)
+        self.requests = []
+        self.active = self.max_active = 0
+        self.lock = threading.Lock()
+
+    def url(self, path):
+        return "http://127.0.0.1:{}{}".format(self.server_port, path)
+
+
+class FileHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            attempts = server.requests.count(self.path)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+            if self.path.startswith("/flaky") and attempts == 1:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = self.path.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def read(prefetched):
+    with open(prefetched.path, "rb") as f:
+        return f.read()
+
+
+class TestURIPrefetcher(SimpleTestCase):
+
+    def setUp(self):
+        self.server = FileServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_failed_downloads_are_retried(self):
+        uri = self.server.url("/flaky")
+        with fetch.URIPrefetcher(backoff=0) as prefetcher:
+            prefetcher.prefetch([uri])
+
+            self.assertEqual(read(prefetcher.get(uri)), b"/flaky")
+        self.assertEqual(self.server.requests, ["/flaky", "/flaky"])
+
+    def test_downloads_are_limited_per_host(self):
+        uris = [self.server.url("/slow/{}".format(i)) for i in range(6)]
+        with fetch.URIPrefetcher(workers=6, per_host=2) as prefetcher:
+            prefetcher.prefetch(uris)
+            for uri in uris:
+                prefetcher.get(uri)
+
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual(self.server.max_active, 2)
+
+    def test_get_downloads_uris_not_prefetched(self):
+        uri = self.server.url("/file")
+        with fetch.URIPrefetcher() as prefetcher:
+            prefetched = prefetcher.get(uri)
+            self.assertEqual(read(prefetched), b"/file")
+            self.assertEqual(prefetcher.get(uri), prefetched)
+
+            prefetcher.release([uri])
+            self.assertFalse(os.path.exists(prefetched.path))
+        self.assertEqual(self.server.requests, ["/file"])
+
+    def test_repeated_uris_are_kept_until_released_again(self):
+        uri = self.server.url("/file")
+        with fetch.URIPrefetcher() as prefetcher:
+            prefetcher.prefetch([uri, None, "file:///local.pdf", uri])
+            prefetched = prefetcher.get(uri)
+
+            prefetcher.release([uri, None])
+            self.assertEqual(prefetcher.get(uri), prefetched)
+            prefetcher.release([uri])
+            self.assertFalse(os.path.exists(prefetched.path))
+        self.assertEqual(self.server.requests, ["/file"])
+
+    def test_released_downloads_are_cancelled_or_removed(self):
+        running = self.server.url("/slow/running")
+        queued = self.server.url("/slow/queued")
+        with fetch.URIPrefetcher(workers=1) as prefetcher:
+            prefetcher.prefetch([running, queued])
+            while not self.server.requests:
+                time.sleep(0.01)
+            prefetcher.release([running, queued])
+            # Downloads run in order on the only worker
+            prefetched = prefetcher.get(self.server.url("/file"))
+
+            spooled = os.listdir(os.path.dirname(prefetched.path))
+            self.assertEqual(spooled, [os.path.basename(prefetched.path)])
+        self.assertEqual(self.server.requests, ["/slow/running", "/file"])
+
+    def test_close_removes_spooled_files(self):
+        uri = self.server.url("/file")
+        with fetch.URIPrefetcher() as prefetcher:
+            prefetcher.prefetch([uri])
+            prefetched = prefetcher.get(uri)
+
+        self.assertFalse(os.path.exists(os.path.dirname(prefetched.path)))
@@ -0,0 +1,264 @@
+import datetime
+import hashlib
+import io
+import multiprocessing
+import zipfile
+
+from django.test import TestCase
+
+from plugins.imports import jats
+from submission import models as submission_models
+from utils.testing import helpers
+
+
+JATS_ARTICLE = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE article PUBLIC "-//NLM//DTD JATS (Z39.96) Journal Publishing DTD v1.2 20190208//EN" "JATS-journalpublishing1.dtd">
+<article xmlns:xlink="http://www.w3.org/1999/xlink" article-type="research-article">
+<front>
+<journal-meta>
+<journal-id journal-id-type="publisher-id">tst</journal-id>
+<journal-title-group><journal-title>Test Journal</journal-title></journal-title-group>
+<issn pub-type="epub">0000-0000</issn>
+</journal-meta>
+<article-meta>
+<article-id pub-id-type="doi">10.1234/tst.1</article-id>
+<article-id pub-id-type="publisher-id">42</article-id>
+<title-group><article-title>On <italic>Things</italic> &amp; Stuff</article-title></title-group>
+<contrib-group>
+<contrib contrib-type="author">
+<contrib-id contrib-id-type="orcid">https://orcid.org/0000-0001-2345-6789</contrib-id>
+<name><surname>Person</surname><given-names>Unreal</given-names></name>
+<email>unrealperson@example.com</email>
+<xref ref-type="aff" rid="aff1">1</xref>
+</contrib>
+<aff id="aff1"><label>1</label> University of Somewhere </aff>
+</contrib-group>
+<pub-date date-type="pub"><day>3</day><month>4</month><year>2020</year></pub-date>
+<volume>7</volume>
+<issue>2</issue>
+<fpage>10</fpage>
+<history>
+<date date-type="received"><month>1</month><year>2019</year></date>
+</history>
+<permissions>
+<copyright-statement>Copyright the authors</copyright-statement>
+<license xlink:href="https://creativecommons.org/licenses/by/4.0/"><license-p>CC BY</license-p></license>
+</permissions>
+<kwd-group><kwd> dinosaurs </kwd><kwd>teaching</kwd></kwd-group>
+<abstract><p>How it all went down.</p></abstract>
+</article-meta>
+</front>
+<body><p>Body text<issue>99</issue></p></body>
+</article>
+"""
+
+
+class TestJATSMetadata(TestCase):
+
+    def test_article_metadata(self):
+        meta = jats.get_jats_article_metadata(JATS_ARTICLE)
+
+        self.assertEqual(meta["journal"], {
+            "code": "tst",
+            "title": "Test Journal",
+            "issn": "0000-0000",
+        })
+        self.assertEqual(meta["title"], "On <i>Things</i> & Stuff")
+        self.assertEqual(meta["abstract"], "How it all went down.")
+        self.assertEqual((meta["issue"], meta["volume"]), (2, 7))
+        self.assertEqual(meta["section_name"], "research-article")
+        self.assertEqual(meta["date_published"], datetime.date(2020, 4, 3))
+        self.assertEqual(meta["date_submitted"], datetime.date(2019, 1, 1))
+        self.assertIsNone(meta["date_accepted"])
+        self.assertEqual((meta["first_page"], meta["last_page"]), (10, None))
+        self.assertEqual(meta["keywords"], {"dinosaurs", "teaching"})
+        self.assertEqual(
+            meta["license_url"],
+            "https://creativecommons.org/licenses/by/4.0/",
+        )
+        self.assertEqual(meta["rights"], "Copyright the authors")
+        self.assertEqual(meta["identifiers"], {
+            "doi": "10.1234/tst.1",
+            "pubid": "42",
+            "handle": None,
+        })
+        self.assertEqual(meta["authors"], [{
+            "first_name": "Unreal",
+            "last_name": "Person",
+            "email": "unrealperson@example.com",
+            "correspondence": False,
+            "institution": "University of Somewhere",
+            "orcid": "0000-0001-2345-6789",
+        }])
+
+    def test_entities_comments_and_instructions(self):
+        jats_article = JATS_ARTICLE.replace(
+            "On <italic>Things</italic> &amp; Stuff",
+            "On&nbsp;<italic>Things</italic> &mdash;<!-- c --> &amp;"
+            "<?pi x?> &unknown; Stuff",
+        ).replace(
+            "How it all went down.",
+            "How&nbsp;it <!-- c -->all &amp; <?pi x?>went&eacute; down.",
+        )
+        for document in [jats_article, jats_article.split("\n", 2)[2]]:
+            meta = jats.get_jats_article_metadata(document)
+
+            self.assertEqual(
+                meta["title"], "On\xa0<i>Things</i> — &  Stuff")
+            self.assertEqual(
+                meta["abstract"], "How\xa0it all & went\xe9 down.")
+
+    def test_missing_article_meta(self):
+        with self.assertRaises(ValueError):
+            jats.get_jats_article_metadata("<article><front/></article>")
+
+    def test_dry_run_zipped_import_with_workers(self):
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, "w") as zf:
+            zf.writestr("1/article.xml", JATS_ARTICLE)
+            zf.writestr("1/figures/fig1.png", b"")
+            zf.writestr("2/article.xml", "<article/>")
+            zf.writestr("3/article.xml", JATS_ARTICLE.replace("tst.1", "tst.2"))
+
+        articles, errors = jats.import_jats_zipped(
+            zip_file, persist=False, workers=2,
+        )
+
+        self.assertEqual(
+            [meta["identifiers"]["doi"] for _, meta in articles],
+            ["10.1234/tst.1", "10.1234/tst.2"],
+        )
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0][0], ["article.xml"])
+        self.assertIsInstance(errors[0][1], ValueError)
+
+    def test_parse_documents_with_spawned_workers(self):
+        documents = [JATS_ARTICLE.encode("utf-8"), b"<article/>"]
+
+        parsed = list(jats.parse_jats_documents(
+            documents, jats.parse_jats_article, workers=2,
+            mp_context=multiprocessing.get_context("spawn"),
+        ))
+
+        self.assertEqual(parsed[0], (jats.parse_jats_article(JATS_ARTICLE), None))
+        self.assertIsNone(parsed[1][0])
+        self.assertIsInstance(parsed[1][1], ValueError)
+
+
+class TestJATSReferences(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal, _ = helpers.create_journals()
+
+    def test_lookups_are_memoised(self):
+        references = jats.JATSReferences()
+        section = references.get_section(self.journal, "Article")
+        keywords = references.get_keywords(["dinosaurs", "teaching"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                references.get_section(self.journal, "Article"),
+                section,
+            )
+            self.assertEqual(
+                references.get_keywords(["teaching", "dinosaurs"]),
+                keywords[::-1],
+            )
+
+    def test_rolled_back_lookups_are_forgotten(self):
+        references = jats.JATSReferences()
+        with self.assertRaises(RuntimeError):
+            with references.atomic():
+                references.get_section(self.journal, "Rolled back")
+                raise RuntimeError
+
+        section = references.get_section(self.journal, "Rolled back")
+
+        self.assertTrue(
+            submission_models.Section.objects.filter(pk=section.pk).exists()
+        )
+
+
+class TestJATSFingerprints(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal, cls.other_journal = helpers.create_journals()
+        cls.owner = helpers.create_user("jats_owner@example.org")
+
+    def test_fingerprint_ignores_serialisation(self):
+        reserialised = JATS_ARTICLE.replace(
+            '<article xmlns:xlink="http://www.w3.org/1999/xlink" article-type="research-article">',
+            '<!-- Regenerated -->\n<article article-type="research-article"\n'
+            '         xmlns:xlink="http://www.w3.org/1999/xlink">',
+        )
+
+        self.assertEqual(
+            jats.fingerprint_jats(JATS_ARTICLE),
+            jats.fingerprint_jats(reserialised),
+        )
+        self.assertNotEqual(
+            jats.fingerprint_jats(JATS_ARTICLE),
+            jats.fingerprint_jats(JATS_ARTICLE.replace("Stuff", "Things")),
+        )
+
+    def test_reimport_skips_unchanged_articles(self):
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, "w") as zf:
+            zf.writestr("1/article.xml", JATS_ARTICLE)
+
+        articles, errors = jats.import_jats_zipped(
+            zip_file, self.journal, owner=self.owner,
+        )
+        self.assertEqual(errors, [])
+        article = articles[0][1]
+        galley = article.galley_set.get()
+
+        zip_file.seek(0)
+        articles, errors = jats.import_jats_zipped(
+            zip_file, self.journal, owner=self.owner,
+        )
+
+        self.assertEqual(errors, [])
+        self.assertEqual(articles[0][1], article)
+        self.assertEqual(article.galley_set.get(), galley)
+
+    def test_reimport_skips_reserialised_articles(self):
+        reserialised = JATS_ARTICLE.replace(
+            '<article xmlns:xlink="http://www.w3.org/1999/xlink" article-type="research-article">',
+            '<!-- Regenerated -->\n<article article-type="research-article"\n'
+            '         xmlns:xlink="http://www.w3.org/1999/xlink">',
+        )
+        articles = []
+        for contents in (JATS_ARTICLE, reserialised):
+            zip_file = io.BytesIO()
+            with zipfile.ZipFile(zip_file, "w") as zf:
+                zf.writestr("1/article.xml", contents)
+            imported, errors = jats.import_jats_zipped(
+                zip_file, self.journal, owner=self.owner,
+            )
+            self.assertEqual(errors, [])
+            articles.append(imported[0][1])
+
+        fingerprint = articles[0].jats_fingerprint
+        fingerprint.refresh_from_db()
+        self.assertEqual(articles[0], articles[1])
+        self.assertEqual(articles[0].galley_set.count(), 1)
+        self.assertEqual(
+            fingerprint.raw_sha256,
+            hashlib.sha256(reserialised.encode("utf-8")).hexdigest(),
+        )
+
+    def test_fingerprint_matched_within_journal(self):
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, "w") as zf:
+            zf.writestr("1/article.xml", JATS_ARTICLE)
+        jats.import_jats_zipped(zip_file, self.journal, owner=self.owner)
+        meta = jats.get_jats_article_metadata(JATS_ARTICLE)
+
+        self.assertIsNotNone(jats.get_jats_fingerprint(meta, self.journal))
+        self.assertIsNone(
+            jats.get_jats_fingerprint(meta, self.other_journal))
@@ -0,0 +1,106 @@
+from datetime import timedelta
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from utils.testing import helpers
+from plugins.imports import jobs, models
+
+
+class TestImportJobs(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal_one, cls.journal_two = helpers.create_journals()
+        cls.test_user = helpers.create_user('job_owner@example.org')
+
+    def test_claim_next_job_claims_oldest_once(self):
+        first = jobs.queue_job(
+            models.ImportJob.TYPE_UPDATE, '/tmp/first.csv',
+            journal=self.journal_one, owner=self.test_user,
+        )
+        second = jobs.queue_job(
+            models.ImportJob.TYPE_UPDATE, '/tmp/second.csv',
+            journal=self.journal_one, owner=self.test_user,
+        )
+
+        self.assertEqual(jobs.claim_next_job(), first)
+        self.assertEqual(jobs.claim_next_job(), second)
+        self.assertIsNone(jobs.claim_next_job())
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, models.ImportJob.STATUS_RUNNING)
+        self.assertIsNotNone(first.started)
+
+    def test_run_job_records_failure(self):
+        jobs.queue_job(
+            models.ImportJob.TYPE_UPDATE, '/tmp/does-not-exist.csv',
+            journal=self.journal_one, owner=self.test_user,
+        )
+        job = jobs.run_job(jobs.claim_next_job())
+
+        self.assertEqual(job.status, models.ImportJob.STATUS_FAILED)
+        self.assertEqual(job.error_count, 1)
+        self.assertTrue(job.is_finished)
+
+    def test_run_job_removes_file_after_failure(self):
+        with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as f:
+            f.write(b'not a zip')
+        jobs.queue_job(
+            models.ImportJob.TYPE_JATS, f.name,
+            journal=self.journal_one, owner=self.test_user,
+        )
+        job = jobs.run_job(jobs.claim_next_job())
+
+        self.assertEqual(job.status, models.ImportJob.STATUS_FAILED)
+        self.assertFalse(os.path.exists(f.name))
+
+    def test_run_job_keeps_progress_after_failure(self):
+        def failing_runner(job):
+            jobs.record_progress(job, 5, [])
+            raise ValueError('Row 6 is broken')
+
+        folder_path = tempfile.mkdtemp()
+        jobs.queue_job(
+            models.ImportJob.TYPE_UPDATE, '/tmp/does-not-exist.csv',
+            journal=self.journal_one, owner=self.test_user,
+            folder_path=folder_path,
+        )
+        with mock.patch.dict(
+            jobs.JOB_RUNNERS,
+            {models.ImportJob.TYPE_UPDATE: failing_runner},
+        ):
+            job = jobs.run_job(jobs.claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, models.ImportJob.STATUS_FAILED)
+        self.assertEqual(job.rows_done, 5)
+        self.assertFalse(os.path.exists(folder_path))
+
+    def test_fail_stale_jobs(self):
+        stale = jobs.queue_job(
+            models.ImportJob.TYPE_UPDATE, '/tmp/stale.csv',
+            journal=self.journal_one, owner=self.test_user,
+        )
+        running = jobs.queue_job(
+            models.ImportJob.TYPE_UPDATE, '/tmp/running.csv',
+            journal=self.journal_one, owner=self.test_user,
+        )
+        jobs.claim_next_job()
+        jobs.claim_next_job()
+        models.ImportJob.objects.filter(pk=stale.pk).update(
+            heartbeat=timezone.now() - timedelta(hours=2),
+        )
+
+        self.assertEqual(jobs.fail_stale_jobs(timedelta(hours=1)), 1)
+
+        stale.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(stale.status, models.ImportJob.STATUS_FAILED)
+        self.assertEqual(stale.error_count, 1)
+        self.assertIsNotNone(stale.finished)
+        self.assertEqual(running.status, models.ImportJob.STATUS_RUNNING)
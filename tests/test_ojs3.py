@@ -1,13 +1,22 @@
+import functools
 from io import StringIO
+import os
+import tempfile
+from unittest import mock
+from urllib.parse import parse_qsl, urlparse
+
+import requests
 
 from django.test import TestCase
 from django.core.files.base import ContentFile
 
 from core import models as core_models
 from identifiers import models as id_models
+from metrics import models as metrics_models
 from utils.testing import helpers
 
-from plugins.imports import ojs
+from plugins.imports import models, ojs
+from plugins.imports.ojs.cache import SQLiteResponseCache
 
 
 
@@ -56,6 +65,85 @@ class OJS3ImportArticles(TestCase):
             '17660',
         )
 
+    def test_import_article_with_workers(self):
+        mock_client = MockOJS3Client()
+        ojs.import_ojs3_articles(mock_client, self.journal, workers=2)
+
+        self.assertEqual(
+            id_models.Identifier.objects.get(
+                id_type="doi", identifier='10.0001/test'
+            ).article.get_identifier("ojs_id"),
+            '17660',
+        )
+
+    def test_resume_import_skips_finished_articles(self):
+        mock_client = MockOJS3Client()
+        ojs.import_ojs3_articles(mock_client, self.journal)
+        id_models.Identifier.objects.filter(
+            id_type="doi", identifier='10.0001/test'
+        ).delete()
+
+        ojs.import_ojs3_articles(mock_client, self.journal, resume=True)
+
+        self.assertFalse(
+            id_models.Identifier.objects.filter(
+                id_type="doi", identifier='10.0001/test'
+            ).exists()
+        )
+
+    @mock.patch.object(ojs.ojs3_importers, "import_article")
+    def test_resume_import_retries_failed_articles(self, import_article):
+        mock_client = MockOJS3ListingClient([{"id": i} for i in range(1, 5)])
+        import_article.side_effect = lambda client, journal, d, **kw: (
+            self.fail_import(d))
+
+        ojs.import_ojs3_articles(mock_client, self.journal)
+        checkpoint = models.OJSImportCheckpoint.objects.get(
+            journal=self.journal,
+            phase=models.OJSImportCheckpoint.PHASE_ARTICLES,
+        )
+        self.assertEqual(
+            (checkpoint.last_ojs_id, checkpoint.finished), ("1", None))
+
+        import_article.reset_mock()
+        import_article.side_effect = None
+        ojs.import_ojs3_articles(mock_client, self.journal, resume=True)
+        checkpoint.refresh_from_db()
+
+        self.assertEqual(
+            [call.args[2]["id"] for call in import_article.call_args_list],
+            [2, 3, 4],
+        )
+        self.assertIsNotNone(checkpoint.finished)
+
+    @staticmethod
+    def fail_import(article_dict):
+        if article_dict["id"] == 2:
+            raise ValueError("Import failed")
+
+    def test_reimport_skips_unchanged_files(self):
+        ojs.import_ojs3_articles(MockOJS3Client(), self.journal)
+        mock_client = MockOJS3Client()
+        ojs.import_ojs3_articles(mock_client, self.journal)
+
+        self.assertEqual(getattr(mock_client, "files_fetched", 0), 0)
+        self.assertEqual(
+            models.OJSFile.objects.filter(ojs_id=34447).count(), 1,
+        )
+
+    def test_import_metrics(self):
+        mock_client = MockOJS3Client()
+        ojs.import_ojs3_articles(mock_client, self.journal)
+        ojs.import_ojs3_metrics(mock_client, self.journal)
+        ojs.import_ojs3_metrics(mock_client, self.journal)
+
+        article = id_models.Identifier.objects.get(
+            id_type="doi", identifier='10.0001/test'
+        ).article
+        access = metrics_models.HistoricArticleAccess.objects.get(
+            article=article)
+        self.assertEqual((access.views, access.downloads), (7, 5))
+
     def test_import_article_languages(self):
         mock_client = MockOJS3Client()
         ojs.import_ojs3_articles(mock_client, self.journal)
@@ -66,6 +154,120 @@ class OJS3ImportArticles(TestCase):
         #self.assertEqual(article.title_de, "titel")
 
 
+class OJSResponseCacheTest(TestCase):
+
+    class MockSession():
+        def __init__(self):
+            self.requests = []
+
+        def get(self, url, headers=None):
+            self.requests.append(headers or {})
+            response = requests.Response()
+            response.url = url
+            if headers and headers.get("If-None-Match") == '"v1"':
+                response.status_code = 304
+            else:
+                response.status_code = 200
+                response.headers["ETag"] = '"v1"'
+                response._content = b'{"items": []}'
+            return response
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_fresh_response_served_from_cache(self):
+        session = self.MockSession()
+        cache = SQLiteResponseCache(self.path, ttl=60)
+        cache.fetch(session, "https://ojs.example.org/api")
+        response = cache.fetch(session, "https://ojs.example.org/api")
+        cache.close()
+
+        self.assertEqual(len(session.requests), 1)
+        self.assertEqual(response.json(), {"items": []})
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_stale_response_revalidated(self):
+        session = self.MockSession()
+        SQLiteResponseCache(self.path, ttl=0).fetch(
+            session, "https://ojs.example.org/api")
+        cache = SQLiteResponseCache(self.path, ttl=0)
+        response = cache.fetch(session, "https://ojs.example.org/api")
+        cache.close()
+
+        self.assertEqual(session.requests[-1]["If-None-Match"], '"v1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"items": []})
+        self.assertEqual(cache.stats()["revalidated"], 1)
+
+
+class OJS3PaginatedResultsTest(TestCase):
+
+    class MockResponse():
+        def __init__(self, data):
+            self.data = data
+
+        def json(self):
+            return self.data
+
+    def setUp(self):
+        self.items = [{"id": i} for i in range(45)]
+        self.requested = []
+
+    def client(self, url):
+        self.requested.append(url)
+        query = dict(parse_qsl(urlparse(url).query))
+        offset, count = int(query["offset"]), int(query["count"])
+        return self.MockResponse({
+            "items": self.items[offset:offset + count],
+            "itemsMax": len(self.items),
+        })
+
+    def test_stops_at_items_max(self):
+        results = ojs.clients.OJS3PaginatedResults("url", self.client)
+
+        self.assertEqual(list(results), self.items)
+        self.assertEqual(len(self.requested), 3)
+
+    def test_without_read_ahead(self):
+        results = ojs.clients.OJS3PaginatedResults(
+            "url", self.client, read_ahead=0)
+
+        self.assertEqual(list(results), self.items)
+        self.assertEqual(len(self.requested), 3)
+
+    def test_resume_after_starts_near_position(self):
+        paginate = functools.partial(
+            ojs.clients.OJS3PaginatedResults, "url", self.client)
+        results = ojs.clients.resume_after(paginate, 40, position=41)
+
+        self.assertEqual(list(results), self.items[41:])
+        self.assertEqual(
+            dict(parse_qsl(urlparse(self.requested[0]).query))["offset"],
+            "21",
+        )
+
+    def test_resume_after_missing_id_yields_everything(self):
+        paginate = functools.partial(
+            ojs.clients.OJS3PaginatedResults, "url", self.client)
+        results = ojs.clients.resume_after(paginate, 100, position=41)
+
+        self.assertEqual(list(results), self.items)
+
+
+class MockOJS3ListingClient():
+    """ Lists the given article dicts, resuming like the OJS3 client"""
+    def __init__(self, articles):
+        self.articles = articles
+
+    def get_articles(self, after=None, position=None, **kwargs):
+        paginate = lambda start: iter(self.articles[start:])
+        return ojs.clients.resume_after(paginate, after, position=position)
+
+
 class MockOJS3Client():
     USER_DICT = {
         "affiliation": {
@@ -328,14 +530,32 @@ class MockOJS3Client():
         'version': 1
     }
 
-    def get_users(self):
+    def get_users(self, **kwargs):
         yield self.USER_DICT
 
-    def get_articles(self):
+    def get_articles(self, **kwargs):
         yield self.PUBLISHED_ARTICLE
 
+    def get_article_summaries(self, **kwargs):
+        yield {"id": self.PUBLISHED_ARTICLE["id"]}
+
+    def get_article(self, *args, **kwargs):
+        return self.PUBLISHED_ARTICLE
+
+    def staging_client(self):
+        return self
+
+    def get_metrics(self, **kwargs):
+        yield {
+            "publication": {"id": self.PUBLISHED_ARTICLE["id"]},
+            "galleyViews": 5,
+            "abstractViews": 7,
+        }
+        yield {"publication": {"id": 1}, "galleyViews": 1, "abstractViews": 1}
+
     def get_publication(self, *args, **kwargs):
         return self.PUBLICATION
 
     def fetch_file(self, *args, **kwargs):
+        self.files_fetched = getattr(self, "files_fetched", 0) + 1
         return ContentFile(b'test')
@@ -15,7 +15,7 @@ from rest_framework import routers
 
 from core import models as core_models, logic as core_logic, plugin_loader
 from journal import models as journal_models
-from plugins.imports import utils, export, views, plugin_settings
+from plugins.imports import utils, export, models, views, plugin_settings
 from submission import models as submission_models
 from utils.shared import clear_cache
 from utils.testing import helpers
@@ -53,6 +53,7 @@ def run_import(csv_string_or_dict, path_to_zip=None, owner=None, **kwargs):
         zip_folder_path,
         owner=owner,
         mock_import_stages=mock_import_stages,
+        batch_size=kwargs.get('batch_size'),
     )
     return errors, actions
 
@@ -1096,42 +1097,53 @@ class TestImportAndUpdate(TestCase):
 
         self.assertEqual(csv_filename, csv_path.split('/')[-1])
 
-    def test_verify_headers(self):
-        csv_string = 'Inadequate,Headers\n' \
-                     'data, other data'
-        path_to_csv = os.path.join(
-            settings.BASE_DIR,
-            'plugins', 'imports', 'tests', 'test_data',
-            'test_verify_headers.csv',
-        )
-        with open(path_to_csv, 'w') as fileobj:
-            fileobj.write(csv_string)
-        errors = []
-        errors = utils.verify_headers(path_to_csv, errors)
+    def test_validate_headers(self):
+        reader = csv.DictReader(['Inadequate,Headers', 'data, other data'])
+        errors = utils.validate_headers(reader.fieldnames, [])
         self.assertTrue(
             'Expected headers not found' in errors[0]['error']
         )
 
-    def test_validate_selected_char_fields(self):
-        csv_string = 'Article title,Stage,Language\n' \
-                     'title,Bad stage 1,zzz\n' \
-                     'title,Bad stage 2,Dinosaur\n'
-        path_to_csv = os.path.join(
-            settings.BASE_DIR,
-            'plugins', 'imports', 'tests', 'test_data',
-            'test_validate_selected_char_fields.csv',
-        )
-        with open(path_to_csv, 'w') as fileobj:
-            fileobj.write(csv_string)
+    def test_validate_article_groups_char_fields(self):
+        csv_data = dict_from_csv_string(CSV_DATA_1)
+        csv_data[1]['Stage'] = 'Bad stage 1'
+        csv_data[1]['Language'] = 'zzz'
+        reader = csv.DictReader(string_from_csv_dict(csv_data).splitlines())
         errors = []
-        journal = self.journal_one
-        errors = utils.validate_selected_char_fields(path_to_csv, errors, journal)
+
+        article_groups = list(utils.validate_article_groups(
+            utils.iter_article_groups(reader),
+            errors,
+        ))
+
+        self.assertEqual([], article_groups)
         error_messages = ".".join([msg['error'] for msg in errors])
         self.assertTrue(
             ('Unrecognized data in field Stage' in error_messages and
              'Unrecognized data in field Language' in error_messages)
         )
 
+    def test_validate_article_groups(self):
+        csv_data = dict_from_csv_string(CSV_DATA_1)
+        csv_data[4] = dict(csv_data[1])
+        csv_data[4]['Article title'] = 'Variopleistocene Inquilibriums II'
+        csv_data[4]['Stage'] = 'Bad stage'
+        reader = csv.DictReader(string_from_csv_dict(csv_data).splitlines())
+        errors = []
+
+        article_groups = utils.validate_article_groups(
+            utils.iter_article_groups(reader),
+            errors,
+        )
+        validated_titles = [
+            group['primary_row']['Article title'] for group in article_groups
+        ]
+
+        self.assertEqual(['Variopleistocene Inquilibriums'], validated_titles)
+        self.assertTrue(
+            'Unrecognized data in field Stage' in errors[0]['error']
+        )
+
     def test_language_codes(self):
 
         csv_data_17 = dict_from_csv_string(CSV_DATA_1)
@@ -1163,6 +1175,36 @@ class TestImportAndUpdate(TestCase):
 
         self.assertEqual(expected_languages, saved_languages)
 
+    def test_update_article_metadata_in_batches(self):
+        self.maxDiff = None
+        csv_data = dict_from_csv_string(CSV_DATA_1)
+        for row_i in range(1, 4):
+            csv_data[row_i + 3] = dict(csv_data[row_i])
+        csv_data[4]['Article title'] = 'Variopleistocene Inquilibriums II'
+        csv_data[4]['DOI'] = '10.1234/tst.2'
+        csv_data[4]['DOI (URL form)'] = 'https://doi.org/10.1234/tst.2'
+
+        errors, actions = run_import(
+            csv_data,
+            owner=self.test_user,
+            batch_size=1,
+        )
+        if errors:
+            self.fail(
+                "There where import errors, test not completed: %s " % errors
+            )
+
+        first_pk, second_pk = sorted(actions.keys())
+        for article_pk, offset in ((first_pk, 0), (second_pk, 3)):
+            expected_data = {
+                row_i: dict(csv_data[row_i + offset]) for row_i in range(1, 4)
+            }
+            expected_data[1]['Janeway ID'] = str(article_pk)
+            expected_data[1]['File import identifier'] = str(article_pk)
+            saved_article_data = read_saved_article_data(
+                article_pk, structure='dict')
+            self.assertEqual(expected_data, saved_article_data)
+
     def test_import_custom_submission_field(self):
         field_answer = "custom data"
         field_name = "Custom Field"
@@ -1199,3 +1241,86 @@ class TestImportAndUpdate(TestCase):
 
         self.assertEqual(rows[0][field_name], field_answer)
 
+
+    def test_import_article_metadata_isolates_failing_rows(self):
+        valid_line = next(csv.reader([utils.CSV_MAURO]))
+        valid_line[0] = 'savepoint-1'
+        valid_line[-4:] = ['', '', '', '']
+        # A new article without a title can't be imported
+        invalid_line = ['savepoint-2'] + [''] * (len(valid_line) - 1)
+        reader = iter([
+            utils.CSV_HEADER_ROW.split(','),
+            invalid_line,
+            valid_line,
+        ])
+        request = utils.DummyRequest(self.test_user, self.journal_one)
+
+        articles, errors, _error_file = utils.import_article_metadata(
+            request, reader, id_type='pubid', chunk_size=2,
+        )
+
+        self.assertEqual([2], list(errors))
+        self.assertEqual(['savepoint-1'], list(articles))
+        article = articles['savepoint-1']
+        self.assertEqual('some title', article.title)
+        self.assertTrue(
+            article.identifier_set.filter(
+                id_type='pubid', identifier='savepoint-1',
+            ).exists()
+        )
+        self.assertEqual(
+            1,
+            models.CSVImportCreateArticle.objects.filter(
+                article=article,
+            ).count(),
+        )
+
+    def test_update_references_flush_isolates_failed_writes(self):
+        article = submission_models.Article.objects.get(
+            pk=self.set_up_article_pk)
+        unsaved = submission_models.Article(
+            journal=self.journal_one, title='Unsaved')
+        references = utils.UpdateReferences()
+        references.add_doi(article, '10.1234/flushed')
+        references.add_doi(unsaved, '10.1234/unsaved')
+
+        failures = references.flush()
+
+        self.assertEqual(
+            ['10.1234/unsaved'],
+            [identifier.identifier for identifier, _error in failures],
+        )
+        self.assertTrue(
+            article.identifier_set.filter(identifier='10.1234/flushed').exists()
+        )
+
+    def test_update_references_discard_drops_queued_writes(self):
+        article = submission_models.Article.objects.get(
+            pk=self.set_up_article_pk)
+        references = utils.UpdateReferences()
+        references.add_doi(article, '10.1234/discarded')
+
+        references.discard(article)
+
+        self.assertEqual([], references.flush())
+        self.assertFalse(
+            article.identifier_set.filter(
+                identifier='10.1234/discarded').exists()
+        )
+
+    def test_import_article_metadata_records_doi_once(self):
+        line = next(csv.reader([utils.CSV_MAURO]))
+        line[0] = 'doi-once'
+        line[-4:] = ['', '', '', '']
+        reader = iter([utils.CSV_HEADER_ROW.split(','), line])
+        request = utils.DummyRequest(self.test_user, self.journal_one)
+
+        articles, errors, _error_file = utils.import_article_metadata(
+            request, reader,
+        )
+
+        self.assertEqual({}, errors)
+        self.assertEqual(
+            1,
+            articles['doi-once'].identifier_set.filter(id_type='doi').count(),
+        )
@@ -73,3 +73,23 @@ class TestViews(TestCase):
                 data = {'stage':stage},
             )
             self.assertEqual(200, response.status_code)
+
+    @override_settings(URLCONFIG='domain')
+    def test_export_listing_is_paginated(self):
+        csv_data = dict_from_csv_string(CSV_DATA_1)
+        for _ in range(views.EXPORT_LISTING_PAGE_SIZE + 1):
+            run_import(csv_data, owner=self.test_user)
+
+        self.client.force_login(self.test_user)
+        response = self.client.get(
+            '/plugins/imports/articles/all/',
+            SERVER_NAME='testserver',
+            data={'sort': '-pk', 'page': 2},
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, response.context['page'].number)
+        self.assertEqual(
+            views.EXPORT_LISTING_PAGE_SIZE + 1,
+            response.context['page'].paginator.count,
+        )
+        self.assertEqual(1, len(response.context['articles_in_stage']))
@@ -11,6 +11,7 @@ urlpatterns = [
     url(r'^$', views.index, name='imports_index'),
     url(r'^upload/$', views.import_load, name='imports_load'),
     url(r'^process/(?P<filename>[\w.-]{0,256})$', views.import_action, name='imports_action'),
+    url(r'^jobs/(?P<job_id>\d+)/$', views.import_job_status, name='imports_job_status'),
 
     url(r'^review_forms/$', views.review_forms, name='imports_review_forms'),
     url(r'^favicon/$', views.favicon, name='imports_favicon'),
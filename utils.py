@@ -8,14 +8,15 @@ import uuid
 from zipfile import ZipFile
 from string import whitespace
 from datetime import timedelta
+from itertools import chain, islice
 from dateutil import parser as dateparser
 import shutil
-import glob
 
 from dateutil import parser as dateutil_parser
 from django.conf import settings
 from django.core.files.base import ContentFile
 from django.db import transaction
+from django.db.models import F
 from django.template.defaultfilters import linebreaksbr
 from django.utils.dateparse import parse_datetime, parse_date
 from django.utils.timezone import is_aware, make_aware, now
@@ -29,7 +30,7 @@ from submission import models as submission_models
 from utils import setting_handler
 from utils.logger import get_logger
 from utils.logic import get_current_request
-from plugins.imports import models
+from plugins.imports import fetch, models
 from plugins.imports.templatetags import row_identifier
 from plugins.imports.plugin_settings import UPDATE_CSV_HEADERS
 
@@ -58,6 +59,25 @@ IMPORT_STAGES = set(
 )
 
 
+DEFAULT_BATCH_SIZE = 500
+
+# Columns of CSV_HEADER_ROW whose files are downloaded ahead of the import
+GALLEY_URI_HEADERS = ("PDF URI", "XML URI", "HTML URI")
+
+FROZEN_AUTHOR_IMPORT_FIELDS = [
+    'first_name',
+    'middle_name',
+    'last_name',
+    'name_suffix',
+    'institution',
+    'department',
+    'frozen_biography',
+    'frozen_email',
+    'frozen_orcid',
+    'order',
+]
+
+
 DEFAULT_REQUEST_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_10_1)'
     'AppleWebKit/537.36 (KHTML, like Gecko)'
@@ -223,7 +243,16 @@ def import_submission_settings(request, reader):
 
 
 def prepare_reader_rows(reader):
-    article_groups = []
+    return list(iter_article_groups(reader))
+
+
+def iter_article_groups(reader):
+    """ Yields the article groups of an update CSV one at a time
+    An article group is a primary row followed by its author rows, so a group
+    is complete once the next primary row (or the end of the file) is read.
+    :param reader: A csv.DictReader
+    """
+    article_group = None
 
     for i, row in enumerate(reader):
         row_type = row_identifier.identify(row)
@@ -233,61 +262,378 @@ def prepare_reader_rows(reader):
             clean_row[k] = v.strip(whitespace) if isinstance(v, str) else None
 
         if row_type in ['Update', 'New Article']:
-            article_groups.append(
-                {
-                    'type': row_type,
-                    'primary_row': clean_row,
-                    'author_rows': [],
-                    'primary_row_number': i,
-                    'article_id': row.get(
-                    'Janeway ID') if row_type == 'Update' else ''
-                }
-            )
+            if article_group:
+                yield article_group
+            article_group = {
+                'type': row_type,
+                'primary_row': clean_row,
+                'author_rows': [],
+                'primary_row_number': i,
+                'article_id': row.get(
+                'Janeway ID') if row_type == 'Update' else ''
+            }
         elif row_type == 'Author':
-            last_article_group = article_groups[-1]
-            last_article_group['author_rows'].append(clean_row)
+            if article_group is None:
+                logger.warning("Author row %s has no article, ignoring", i)
+                continue
+            article_group['author_rows'].append(clean_row)
+
+    if article_group:
+        yield article_group
+
+
+def chunked(iterable, size):
+    """ Yields lists of at most `size` items from the given iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class UpdateReferences():
+    """ Batch scoped lookups for the Import / Export / Update tool
+
+    Loads the journals, articles, sections, licences, keywords, issues and
+    DOIs referenced by a batch of article groups with one query per model, so
+    that update_article does not need a get_or_create per row. Lookups that
+    miss the prefetched data fall back to the database and are memoised.
+    Identifier and frozen author writes are queued and written with
+    bulk_create/bulk_update when the batch is flushed. The writes queued for
+    an article that failed to update can be discarded before then.
+    """
 
-    return article_groups
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.journals = {}
+        self.issue_types = {}
+        self.issues = {}
+        self.sections = {}
+        self.licences = {}
+        self.keywords = {}
+        self.fields = {}
+        self.articles = {}
+        self.dois = set()
+        self._new_identifiers = []
+        self._frozen_authors = {}
+        self._dirty_issues = {}
+
+    def load(self, article_groups):
+        """ Prefetches the reference data used by the given article groups
+        :param article_groups: A list of article groups as returned by
+            prepare_reader_rows
+        """
+        rows = [group['primary_row'] for group in article_groups]
+
+        codes = {row.get('Journal code') for row in rows}
+        codes.difference_update(self.journals)
+        for journal in journal_models.Journal.objects.filter(code__in=codes):
+            self.journals[journal.code] = journal
+        journals = list(self.journals.values())
+
+        for issue_type in journal_models.IssueType.objects.filter(
+            code="issue",
+            journal__in=journals,
+        ).exclude(journal__in=self.issue_types.keys()):
+            self.issue_types[issue_type.journal_id] = issue_type
+
+        for issue in journal_models.Issue.objects.filter(
+            journal__in=journals,
+            volume__in={
+                row.get('Volume number') or 0 for row in rows
+                if str(row.get('Volume number') or 0).isdigit()
+            },
+            issue__in={row.get('Issue number') or 0 for row in rows},
+        ):
+            key = (issue.journal_id, str(issue.volume), str(issue.issue))
+            self.issues.setdefault(key, issue)
+
+        article_ids = {
+            int(group['article_id']) for group in article_groups
+            if str(group.get('article_id') or '').isdigit()
+        }
+        self.articles.update(
+            submission_models.Article.objects.select_related(
+                'journal',
+            ).in_bulk(article_ids)
+        )
 
+        for section in submission_models.Section.objects.filter(
+            journal__in=journals,
+            name__in={row.get('Article section', "Article") for row in rows},
+        ):
+            self.sections.setdefault((section.journal_id, section.name), section)
+
+        for licence in submission_models.Licence.objects.filter(
+            journal__in=journals,
+            short_name__in={row.get('Licence') for row in rows},
+        ):
+            self.licences.setdefault(
+                (licence.journal_id, licence.short_name), licence)
+
+        self._load_keywords(rows)
+
+        dois = {row.get('DOI') for row in rows if row.get('DOI')}
+        self.dois.update(
+            id_models.Identifier.objects.filter(
+                id_type='doi',
+                identifier__in=dois,
+            ).values_list('article_id', 'identifier')
+        )
 
-def prep_update(row):
+    def _load_keywords(self, rows):
+        words = set()
+        for row in rows:
+            if row.get('Keywords'):
+                words.update(
+                    w.strip(whitespace) for w in row.get('Keywords').split(",")
+                    if w
+                )
+        words.difference_update(self.keywords)
+        if not words:
+            return
+
+        for keyword in submission_models.Keyword.objects.filter(
+            word__in=words,
+        ).order_by('pk'):
+            self.keywords.setdefault(keyword.word, keyword)
+
+        missing = words.difference(self.keywords)
+        if missing:
+            submission_models.Keyword.objects.bulk_create(
+                [submission_models.Keyword(word=word) for word in missing],
+                batch_size=self.batch_size,
+            )
+            # Not every backend returns primary keys from bulk_create
+            for keyword in submission_models.Keyword.objects.filter(
+                word__in=missing,
+            ).order_by('pk'):
+                self.keywords.setdefault(keyword.word, keyword)
+
+    def get_journal(self, code):
+        if code not in self.journals:
+            try:
+                self.journals[code] = journal_models.Journal.objects.get(
+                    code=code,
+                )
+            except journal_models.Journal.DoesNotExist:
+                return None
+        return self.journals[code]
+
+    def get_issue_type(self, journal):
+        if journal.pk not in self.issue_types:
+            self.issue_types[journal.pk] = journal_models.IssueType.objects.get(
+                code="issue",
+                journal=journal,
+            )
+        return self.issue_types[journal.pk]
 
-    try:
-        journal = journal_models.Journal.objects.get(code=row.get('Journal code'))
-        issue_type = journal_models.IssueType.objects.get(
-            code="issue",
-            journal=journal,
-        )
+    def get_issue(self, journal, row):
+        issue_type = self.get_issue_type(journal)
         issue_date = None
         if row.get("Issue pub date"):
             issue_date = get_aware_datetime(row.get('Issue pub date'))
-        issue, created = journal_models.Issue.objects.get_or_create(
-            journal=journal,
-            volume=row.get('Volume number') or 0,
-            issue=row.get('Issue number') or 0,
-            defaults={
-                'issue_title': row.get('Issue title'),
-                'issue_type': issue_type,
-                'date': issue_date or now().date(),
-            }
+
+        volume = row.get('Volume number') or 0
+        number = row.get('Issue number') or 0
+        key = (journal.pk, str(volume), str(number))
+        issue = self.issues.get(key)
+        if issue is None:
+            issue, created = journal_models.Issue.objects.get_or_create(
+                journal=journal,
+                volume=volume,
+                issue=number,
+                defaults={
+                    'issue_title': row.get('Issue title'),
+                    'issue_type': issue_type,
+                    'date': issue_date or now().date(),
+                }
+            )
+            self.issues[key] = issue
+            if created:
+                return issue_type, issue
+
+        if issue_date:
+            issue.date = issue_date
+        issue.issue_title = row.get('Issue title')
+        self._dirty_issues[issue.pk] = issue
+
+        return issue_type, issue
+
+    def get_article(self, article_id):
+        if not str(article_id).isdigit():
+            return None
+        article_id = int(article_id)
+        if article_id not in self.articles:
+            try:
+                self.articles[article_id] = submission_models.Article.objects.get(
+                    pk=article_id,
+                )
+            except submission_models.Article.DoesNotExist:
+                return None
+        return self.articles[article_id]
+
+    def get_section(self, journal, name):
+        key = (journal.pk, name)
+        if key not in self.sections:
+            self.sections[key], _ = submission_models.Section.objects.get_or_create(
+                journal=journal,
+                name=name,
+            )
+        return self.sections[key]
+
+    def get_licence(self, journal, short_name):
+        key = (journal.pk, short_name)
+        if key not in self.licences:
+            self.licences[key], _ = submission_models.Licence.objects.get_or_create(
+                short_name=short_name,
+                journal=journal,
+                defaults={
+                    'name': short_name,
+                }
+            )
+        return self.licences[key]
+
+    def get_keywords(self, words):
+        keywords = []
+        for word in words:
+            if word not in self.keywords:
+                try:
+                    keyword, _ = submission_models.Keyword.objects.get_or_create(
+                        word=word,
+                    )
+                except submission_models.Keyword.MultipleObjectsReturned:
+                    keyword = submission_models.Keyword.objects.filter(
+                        word=word,
+                    ).first()
+                self.keywords[word] = keyword
+            keywords.append(self.keywords[word])
+        return keywords
+
+    def get_fields(self, journal):
+        if journal.pk not in self.fields:
+            self.fields[journal.pk] = list(
+                submission_models.Field.objects.filter(journal=journal)
+            )
+        return self.fields[journal.pk]
+
+    def add_doi(self, article, doi):
+        if (article.pk, doi) not in self.dois:
+            self.dois.add((article.pk, doi))
+            self._new_identifiers.append(
+                id_models.Identifier(
+                    id_type='doi',
+                    identifier=doi,
+                    article=article,
+                )
+            )
+
+    def save_frozen_author(self, frozen_author):
+        self._frozen_authors[frozen_author.pk] = frozen_author
+
+    def discard(self, article):
+        """ Drops the writes queued for an article that failed to update
+        :param article: An instance of submission.models.Article
+        """
+        identifiers = []
+        for identifier in self._new_identifiers:
+            if identifier.article_id == article.pk:
+                self.dois.discard((article.pk, identifier.identifier))
+            else:
+                identifiers.append(identifier)
+        self._new_identifiers = identifiers
+        self._frozen_authors = {
+            pk: frozen_author
+            for pk, frozen_author in self._frozen_authors.items()
+            if frozen_author.article_id != article.pk
+        }
+        self.articles.pop(article.pk, None)
+
+    def flush(self):
+        """ Writes the queued changes and drops the per batch lookups
+        When a bulk write fails, its objects are saved one at a time so that
+        only the failing ones are lost.
+        :return: A list of (object, exception) tuples for the failed writes
+        """
+        failures = []
+        self._write(
+            self._new_identifiers,
+            lambda identifiers: id_models.Identifier.objects.bulk_create(
+                identifiers,
+                batch_size=self.batch_size,
+            ),
+            lambda identifier: identifier.save(),
+            failures,
         )
+        self._write(
+            list(self._frozen_authors.values()),
+            lambda authors: submission_models.FrozenAuthor.objects.bulk_update(
+                authors,
+                FROZEN_AUTHOR_IMPORT_FIELDS,
+                batch_size=self.batch_size,
+            ),
+            lambda author: author.save(
+                update_fields=FROZEN_AUTHOR_IMPORT_FIELDS),
+            failures,
+        )
+        self._write(
+            list(self._dirty_issues.values()),
+            None,
+            lambda issue: issue.save(),
+            failures,
+        )
+
+        self._new_identifiers = []
+        self._frozen_authors = {}
+        self._dirty_issues = {}
+        self.articles = {}
+        self.dois = set()
+        return failures
+
+    @staticmethod
+    def _write(objects, bulk_write, write, failures):
+        if not objects:
+            return
+        if bulk_write:
+            try:
+                with transaction.atomic():
+                    bulk_write(objects)
+                return
+            except Exception as e:
+                logger.warning("Bulk write failed, saving one by one: %s", e)
+        for obj in objects:
+            try:
+                with transaction.atomic():
+                    write(obj)
+            except Exception as e:
+                failures.append((obj, e))
+
 
-        if not created:
-            if issue_date:
-                issue.date = issue_date
-            issue.issue_title = row.get('Issue title')
-            issue.save()
+def raise_failures(failures):
+    """ Raises the error of the first write UpdateReferences.flush failed"""
+    for _obj, error in failures:
+        raise error
 
-    except journal_models.Journal.DoesNotExist:
-        journal, issue_type, issue = None, None, None
+
+def prep_update(row, references=None):
+    flush = references is None
+    if flush:
+        references = UpdateReferences()
+
+    journal = references.get_journal(row.get('Journal code'))
+    if journal:
+        issue_type, issue = references.get_issue(journal, row)
+    else:
+        issue_type, issue = None, None
 
     article_id = row.get('Janeway ID')
     article = None
     if article_id:
-        try:
-            article = submission_models.Article.objects.get(pk=article_id)
-        except submission_models.Article.DoesNotExist:
-            pass
+        article = references.get_article(article_id)
+
+    if flush:
+        raise_failures(references.flush())
 
     return journal, article, issue_type, issue
 
@@ -295,144 +641,188 @@ def prep_update(row):
 def update_article_metadata(reader, folder_path=None, owner=None, import_id=None, **kwargs):
     """
     Takes a dictreader and creates or updates article records.
+
+    The reader is consumed as a stream of article groups, which are processed
+    in batches of `batch_size`. The sections, licences, keywords, issues and
+    DOIs referenced by a batch are prefetched before it is processed and the
+    queued writes are flushed in bulk after. The PDF URIs of a batch are
+    downloaded concurrently while its rows are processed. With
+    `validate=True`, headers are checked before any row is read and article
+    groups with unrecognised char field values are reported and skipped as
+    they stream past.
+    A `progress_callback` is called with the number of article groups
+    processed and the errors so far after every batch.
     """
     errors = []
     actions = {}
     return_articles = kwargs.get('return_articles')
     mock_import_stages = kwargs.get('mock_import_stages')
+    batch_size = kwargs.get('batch_size') or DEFAULT_BATCH_SIZE
+    progress_callback = kwargs.get('progress_callback')
+    groups_done = 0
     csv_import = None
-    prepared_reader_rows = prepare_reader_rows(reader)
+    prepared_reader_rows = iter_article_groups(reader)
+    if kwargs.get('validate'):
+        errors = validate_headers(reader.fieldnames, errors)
+        if errors:
+            return errors, actions
+        prepared_reader_rows = validate_article_groups(
+            prepared_reader_rows, errors)
     if import_id:
         csv_import, created = models.CSVImport.objects.get_or_create(
             filename=import_id)
         if created:
             logger.info("Created new Import: %s", import_id)
 
-
-    for prepared_row in prepared_reader_rows:
-        primary_row = prepared_row.get("primary_row")
-        journal, article, issue_type, issue = prep_update(primary_row)
-
-        if not journal:
-            errors.append(
-                {
-                    'row': prepared_row.get('primary_row_number'),
-                    'error': 'No journal found.',
-                }
-            )
-            continue
-
-        if article and article.journal != journal:
-            errors.append(
-                {
-                    'row': prepared_row.get('primary_row_number'),
-                    'error': 'article.journal ({}) and journal ({}) do not match.'.format(
-                        article.journal,
-                        journal
-                    ),
-                }
-            )
-            continue
-
-        if article:
-            try:
-                if article and csv_import:
-                    models.CSVImportUpdateArticle.objects.create(
-                        article=article,
-                        csv_import=csv_import,
-                        file_id=prepared_row["primary_row"].get(
-                            "File import identifier"
-                        ),
+    references = UpdateReferences(batch_size=batch_size)
+    with fetch.URIPrefetcher(headers=DEFAULT_REQUEST_HEADERS) as prefetcher:
+        for batch in chunked(prepared_reader_rows, batch_size):
+            references.load(batch)
+            pdf_uris = [
+                group["primary_row"].get("PDF URI") for group in batch
+            ]
+            prefetcher.prefetch(pdf_uris)
+            for prepared_row in batch:
+                primary_row = prepared_row.get("primary_row")
+                journal, article, issue_type, issue = prep_update(
+                    primary_row, references)
+
+                if not journal:
+                    errors.append(
+                        {
+                            'row': prepared_row.get('primary_row_number'),
+                            'error': 'No journal found.',
+                        }
                     )
-                article = update_article(article, issue, prepared_row, folder_path)
-                actions[article.pk] = f'Article {article.title} ({article.pk}) updated.'
-
-            except Exception as e:
-                import pdb;pdb.set_trace()
-                errors.append(
-                    {
-                        'article': primary_row.get('Article title'),
-                        'error': e,
-                    }
-                )
-        else:
-            try:
-                article = submission_models.Article.objects.create(
-                    journal=journal,
-                    title=primary_row.get('Article title'),
-                    article_agreement='Imported article',
-                    is_import=True,
-                )
-                if article and csv_import:
-                    models.CSVImportCreateArticle.objects.create(
-                        article=article,
-                        csv_import=csv_import,
-                        file_id=prepared_row["primary_row"].get(
-                            "File import identifier"
-                        ),
+                    continue
+
+                if article and article.journal != journal:
+                    errors.append(
+                        {
+                            'row': prepared_row.get('primary_row_number'),
+                            'error': 'article.journal ({}) and journal ({}) do not match.'.format(
+                                article.journal,
+                                journal
+                            ),
+                        }
                     )
-                article = update_article(article, issue, prepared_row, folder_path)
-                if owner:
-                    article.owner = owner
-                article.save()
-                proposed_stage = primary_row.get('Stage')
-                if mock_import_stages:
-                    import_stages = mock_import_stages
+                    continue
+
+                if article:
+                    try:
+                        if article and csv_import:
+                            models.CSVImportUpdateArticle.objects.create(
+                                article=article,
+                                csv_import=csv_import,
+                                file_id=prepared_row["primary_row"].get(
+                                    "File import identifier"
+                                ),
+                            )
+                        article = update_article(
+                            article, issue, prepared_row, folder_path, references)
+                        actions[article.pk] = f'Article {article.title} ({article.pk}) updated.'
+
+                    except Exception as e:
+                        references.discard(article)
+                        errors.append(
+                            {
+                                'article': primary_row.get('Article title'),
+                                'error': e,
+                            }
+                        )
                 else:
-                    import_stages = IMPORT_STAGES
-
-                if proposed_stage in import_stages:
-                    article.stage = proposed_stage
-                else:
-                    article.stage = submission_models.STAGE_UNASSIGNED
-
-                article.save()
-                actions[article.pk] = f'Article {article.title} ({article.pk}) updated.'
-
-
-            except Exception as e:
-                errors.append(
-                    {
-                        'article': primary_row.get('Article title'),
-                        'error': e,
-                    }
-                )
-        if (primary_row and primary_row.get("PDF URI")):
-            try:
-                import_galley_from_uri( article, primary_row["PDF URI"])
-            except Exception as e:
+                    try:
+                        article = submission_models.Article.objects.create(
+                            journal=journal,
+                            title=primary_row.get('Article title'),
+                            article_agreement='Imported article',
+                            is_import=True,
+                        )
+                        if article and csv_import:
+                            models.CSVImportCreateArticle.objects.create(
+                                article=article,
+                                csv_import=csv_import,
+                                file_id=prepared_row["primary_row"].get(
+                                    "File import identifier"
+                                ),
+                            )
+                        article = update_article(
+                            article, issue, prepared_row, folder_path, references)
+                        if owner:
+                            article.owner = owner
+                        proposed_stage = primary_row.get('Stage')
+                        if mock_import_stages:
+                            import_stages = mock_import_stages
+                        else:
+                            import_stages = IMPORT_STAGES
+
+                        if proposed_stage in import_stages:
+                            article.stage = proposed_stage
+                        else:
+                            article.stage = submission_models.STAGE_UNASSIGNED
+
+                        article.save()
+                        actions[article.pk] = f'Article {article.title} ({article.pk}) updated.'
+
+
+                    except Exception as e:
+                        if article:
+                            references.discard(article)
+                        errors.append(
+                            {
+                                'article': primary_row.get('Article title'),
+                                'error': e,
+                            }
+                        )
+                if (primary_row and primary_row.get("PDF URI")):
+                    try:
+                        import_galley_from_uri(
+                            article, primary_row["PDF URI"],
+                            prefetcher=prefetcher,
+                        )
+                    except Exception as e:
+                        errors.append({
+                                'article': primary_row.get('Article title'),
+                                'error': f'Failed to import PDF: {e}',
+                        })
+
+                if primary_row:
+                    import_custom_submission_fields(
+                        primary_row, article, errors, references)
+
+            for obj, error in references.flush():
                 errors.append({
-                        'article': primary_row.get('Article title'),
-                        'error': f'Failed to import PDF: {e}',
+                    'article': str(getattr(obj, 'article', obj)),
+                    'error': 'Failed to save {}: {}'.format(
+                        obj._meta.verbose_name, error),
                 })
-
-        if primary_row:
-            import_custom_submission_fields(primary_row, article, errors)
+            prefetcher.release(pdf_uris)
+            groups_done += len(batch)
+            if progress_callback:
+                progress_callback(groups_done, errors)
 
     return errors, actions
 
 
-def update_article(article, issue, prepared_row, folder_path):
+def update_article(article, issue, prepared_row, folder_path, references=None):
     row = prepared_row.get('primary_row')
+    flush = references is None
+    if flush:
+        references = UpdateReferences()
 
     article.title = row.get('Article title')
     article.abstract = row.get('Article abstract')
     article.publication_title = row.get('Journal title override')
     article.ISSN_override = row.get('ISSN override')
-    section_obj, created = submission_models.Section.objects.get_or_create(
-        journal=article.journal,
-        name=row.get('Article section', "Article"),
+    article.section = references.get_section(
+        article.journal,
+        row.get('Article section', "Article"),
     )
-    article.section = section_obj
     article.rights = row.get('Rights')
-    licence_obj, created = submission_models.Licence.objects.get_or_create(
-        short_name=row.get('Licence'),
-        journal=article.journal,
-        defaults={
-            'name': row.get('Licence'),
-        }
+    article.license = references.get_licence(
+        article.journal,
+        row.get('Licence'),
     )
-    article.license = licence_obj
 
     if row.get('Language'):
         names_codes = {choice[1]: choice[0] for choice in submission_models.LANGUAGE_CHOICES}
@@ -453,7 +843,7 @@ def update_article(article, issue, prepared_row, folder_path):
     keywords = []
     if row.get('Keywords'):
         keywords += row.get('Keywords').split(",")
-    update_keywords(keywords, article)
+    update_keywords(keywords, article, references)
 
     if row.get('Date accepted'):
         article.date_accepted = get_aware_datetime(
@@ -500,14 +890,9 @@ def update_article(article, issue, prepared_row, folder_path):
     article.primary_issue = issue
     article.save()
     issue.articles.add(article)
-    issue.save()
 
     if row.get('DOI'):
-        id_models.Identifier.objects.get_or_create(
-            id_type='doi',
-            identifier=row.get('DOI'),
-            article=article,
-        )
+        references.add_doi(article, row.get('DOI'))
 
     updated_authors = []
     # If there is any author data in the first row, create or update authors
@@ -516,21 +901,34 @@ def update_article(article, issue, prepared_row, folder_path):
         # Import author from the primary row and then the secondary rows
         updated_authors = []
         author_order = 0
-        updated_authors.extend(handle_author_import(row, article, author_order))
+        updated_authors.extend(
+            handle_author_import(row, article, author_order, references)
+        )
 
         for author_row in prepared_row.get('author_rows'):
             author_order += 1
-            updated_authors.extend(handle_author_import(author_row, article, author_order))
+            updated_authors.extend(
+                handle_author_import(
+                    author_row, article, author_order, references,
+                )
+            )
 
     # Remove authors as needed in case of update
-    for previous_author in article.authors.all():
-        if previous_author not in updated_authors:
-            article.authors.remove(previous_author)
+    previous_authors = [
+        previous_author for previous_author in article.authors.all()
+        if previous_author not in updated_authors
+    ]
+    if previous_authors:
+        article.authors.remove(*previous_authors)
 
     # Remove frozen authors as needed in case of update
-    for previous_frozen_author in article.frozen_authors():
-        if previous_frozen_author not in updated_authors:
-            previous_frozen_author.delete()
+    submission_models.FrozenAuthor.objects.filter(
+        pk__in=[
+            previous_frozen_author.pk
+            for previous_frozen_author in article.frozen_authors()
+            if previous_frozen_author not in updated_authors
+        ]
+    ).delete()
 
     # Turning off file imports to prep for overhaul
     # if folder_path:
@@ -546,29 +944,23 @@ def update_article(article, issue, prepared_row, folder_path):
             element=workflow_element,
         )
 
+    if flush:
+        raise_failures(references.flush())
+
     return article
 
 
-def update_keywords(keywords, article):
+def update_keywords(keywords, article, references=None):
     new_keywords = [w.strip(whitespace) for w in keywords if w]
+    if references is None:
+        references = UpdateReferences()
 
     current_keywords = [str(kw) for kw in article.keywords.all()]
     if (len(current_keywords) > 0) and (current_keywords != new_keywords):
         article.keywords.clear()
 
-    for kw in new_keywords:
-        try:
-            keyword, c = submission_models.Keyword.objects.get_or_create(
-                word=kw
-            )
-        except submission_models.Keyword.MultipleObjectsReturned:
-            keyword = submission_models.Keyword.objects.filter(
-                word=kw
-            ).first()
-
-        article.keywords.add(keyword)
-
-    article.save()
+    if new_keywords:
+        article.keywords.add(*references.get_keywords(new_keywords))
 
 
 def get_author_fields(row):
@@ -596,15 +988,15 @@ def get_author_fields(row):
     return author_fields
 
 
-def handle_author_import(row, article, author_order):
+def handle_author_import(row, article, author_order, references=None):
 
     author_fields = get_author_fields(row)
     author_fields.append(author_order)
     if row.get('Author is corporate (Y/N)') == 'Y':
         author, frozen_author = import_corporate_author(author_fields, article)
     else:
-        author, frozen_author = import_author(author_fields, article)
-        author.save()
+        author, frozen_author = import_author(
+            author_fields, article, references)
         if row.get('Author is primary (Y/N)') == 'Y':
             article.correspondence_author = author
             article.save()
@@ -643,10 +1035,8 @@ def handle_file_import(row, article, folder_path):
                 article.data_figure_files.add(file)
 
 
-def verify_headers(path, errors):
-    with open(path, 'r', encoding='utf-8-sig') as verify_headers_file:
-        reader = csv.DictReader(verify_headers_file)
-        full_header_set = set(reader.fieldnames)
+def validate_headers(fieldnames, errors):
+    full_header_set = set(fieldnames or [])
     expected_headers = set(UPDATE_CSV_HEADERS)
     relevant_header_set = set([h for h in full_header_set if h in expected_headers])
     if relevant_header_set != expected_headers:
@@ -659,7 +1049,7 @@ def verify_headers(path, errors):
     return errors
 
 
-def validate_selected_char_fields(path, errors, journal):
+def get_char_field_choices():
     fields_to_validate = {}
 
     # Stage
@@ -672,32 +1062,64 @@ def validate_selected_char_fields(path, errors, journal):
         language_choices.add(language_name)
     fields_to_validate['Language'] = language_choices
 
-    for field, choices in fields_to_validate.items():
-        errors = validate_char_field(path, errors, field, choices)
-    return errors
+    return fields_to_validate
 
 
-def validate_char_field(path, errors, field, choices):
-    with open(path, 'r', encoding='utf-8-sig') as verify_char_file:
-        reader = csv.DictReader(verify_char_file)
-        proposed_values = set(
-            [row[field] for row in reader if row[field]]
-        )
-        unrecognized_values = []
-        for value in proposed_values:
-            if value not in choices:
-                unrecognized_values.append(value)
-        if unrecognized_values:
-            errors.append({
-                'error' : f'Unrecognized data in field {field}: '+', '.join(
-                    [v for v in unrecognized_values]
+def find_unrecognized_values(row, fields_to_validate):
+    unrecognized_values = {}
+    for field, choices in fields_to_validate.items():
+        value = row.get(field)
+        if value and value not in choices:
+            unrecognized_values[field] = [value]
+    return unrecognized_values
+
+
+def validate_article_groups(article_groups, errors):
+    """ Yields the article groups whose char fields hold recognised values
+    Groups with unrecognised Stage or Language values are not yielded and an
+    error is appended for them instead, so a CSV can be validated in the same
+    pass that imports it.
+    :param article_groups: An iterable of article groups
+    :param errors: A list to which validation errors are appended
+    """
+    fields_to_validate = get_char_field_choices()
+    for article_group in article_groups:
+        group_errors = []
+        for row in chain(
+            [article_group['primary_row']],
+            article_group['author_rows'],
+        ):
+            for field, values in find_unrecognized_values(
+                row, fields_to_validate,
+            ).items():
+                group_errors.append(
+                    f'Unrecognized data in field {field}: '+', '.join(values)
                 )
+        if group_errors:
+            errors.append({
+                'row': article_group.get('primary_row_number'),
+                'error': '; '.join(group_errors),
             })
-
-    return errors
+        else:
+            yield article_group
 
 
-def import_article_metadata(request, reader, id_type=None):
+def import_article_metadata(
+        request, reader, id_type=None, progress_callback=None,
+        chunk_size=DEFAULT_BATCH_SIZE,
+):
+    """
+    Imports article rows in the CSV_HEADER_ROW format
+    :param progress_callback: Optional callable, called with the number of
+        lines processed and the errors so far after every chunk of lines.
+    :param chunk_size: Number of lines committed in each transaction
+
+    The reader is consumed a chunk of lines at a time. The galley URIs of the
+    next chunk are downloaded concurrently while a chunk is imported, so at
+    most two chunks of downloads are spooled at once. Each chunk of lines is
+    imported in one transaction, with a savepoint per line so that a failing
+    line is rolled back on its own and written to the error file.
+    """
     headers = next(reader)  # skip headers
     errors = {}
     uuid_filename = '{0}-{1}.csv'.format(TMP_PREFIX, uuid.uuid4())
@@ -715,38 +1137,84 @@ def import_article_metadata(request, reader, id_type=None):
         code="issue",
         journal=request.journal,
     )
-    # we skipped line 1 (headers) so we start at 2
-    for i, line in enumerate(reader, start=2):
-        line_id = line[0]
-        article = articles.get(line_id)
-        try:
-            article = import_article_row(
-                line, request.journal, issue_type, article)
-        except Exception as e:
-            errors[i] = e
-            if settings.DEBUG:
-                logger.exception(e)
-            error_writer.writerow(line)
-        if line_id not in articles and id_type:
-            id_models.Identifier.objects.get_or_create(
-                id_type=id_type,
-                identifier=line_id,
-                article=article
-            )
+    uri_columns = [
+        i for i, header in enumerate(headers)
+        if header.strip() in GALLEY_URI_HEADERS
+    ]
 
-        articles[line_id] = article
-        models.CSVImportCreateArticle.objects.create(
-            article=article,
-            csv_import=csv_import
-        )
+    def line_uris(line):
+        return [line[i] for i in uri_columns if i < len(line)]
+
+    with fetch.URIPrefetcher(headers=DEFAULT_REQUEST_HEADERS) as prefetcher:
+        # we skipped line 1 (headers) so we start at 2
+        chunks = chunked(enumerate(reader, start=2), chunk_size)
+        next_chunk = next(chunks, None)
+        if next_chunk:
+            prefetcher.prefetch(
+                uri for _, line in next_chunk for uri in line_uris(line))
+        while next_chunk:
+            chunk, next_chunk = next_chunk, next(chunks, None)
+            if next_chunk:
+                prefetcher.prefetch(
+                    uri for _, line in next_chunk for uri in line_uris(line))
+            with transaction.atomic():
+                for i, line in chunk:
+                    line_id = line[0]
+                    # The line identifier is only recorded for new articles
+                    line_id_type = None if line_id in articles else id_type
+                    try:
+                        with transaction.atomic():
+                            article = import_article_line(
+                                line, request.journal, issue_type,
+                                articles.get(line_id), csv_import,
+                                id_type=line_id_type,
+                                prefetcher=prefetcher,
+                            )
+                    except Exception as e:
+                        errors[i] = e
+                        if settings.DEBUG:
+                            logger.exception(e)
+                        error_writer.writerow(line)
+                    else:
+                        articles[line_id] = article
+                    finally:
+                        prefetcher.release(line_uris(line))
+            if progress_callback:
+                progress_callback(chunk[-1][0] - 1, errors)
     error_file.close()
     return articles, errors, uuid_filename
 
 
-def import_custom_submission_fields(row, article, errors):
-    for field in submission_models.Field.objects.filter(
-        journal=article.journal
-    ):
+def import_article_line(
+        line, journal, issue_type, article, csv_import, id_type=None,
+        prefetcher=None,
+):
+    """ Imports a line of an article metadata CSV with its bookkeeping
+    :param article: The article imported by an earlier line with the same
+        identifier, if any
+    :param id_type: Optional identifier type under which to record the line
+        identifier against the article
+    :return: The imported article
+    """
+    article = import_article_row(
+        line, journal, issue_type, article, prefetcher)
+    if id_type:
+        id_models.Identifier.objects.get_or_create(
+            id_type=id_type,
+            identifier=line[0],
+            article=article
+        )
+    models.CSVImportCreateArticle.objects.create(
+        article=article,
+        csv_import=csv_import
+    )
+    return article
+
+
+def import_custom_submission_fields(row, article, errors, references=None):
+    if references is None:
+        references = UpdateReferences()
+    for field in references.get_fields(article.journal):
         if field.name in row:
             submission_models.FieldAnswer.objects.update_or_create(
                 field=field,
@@ -756,7 +1224,7 @@ def import_custom_submission_fields(row, article, errors):
 
 
 @transaction.atomic
-def import_article_row(row, journal, issue_type, article=None):
+def import_article_row(row, journal, issue_type, article=None, prefetcher=None):
     *a_row, pdf, xml, html, figures = row
     article_id, title, section, vol_num, issue_num, subtitle, abstract, \
         stage, keywords, date_accepted, date_published, doi, \
@@ -841,8 +1309,6 @@ def import_article_row(row, journal, issue_type, article=None):
         article.save()
         issue.articles.add(article)
         issue.save()
-        id_models.Identifier.objects.create(
-            id_type='doi', identifier=doi, article=article)
 
     # author import
     *author_fields, is_corporate = author_fields
@@ -855,12 +1321,12 @@ def import_article_row(row, journal, issue_type, article=None):
     #files import
     for uri in (pdf, html, xml):
         if uri:
-            import_galley_from_uri(article, uri, figures)
+            import_galley_from_uri(article, uri, figures, prefetcher)
 
     return article
 
 
-def import_author(author_fields, article):
+def import_author(author_fields, article, references=None):
     salutation, first_name, middle_name, last_name, suffix,\
         institution, department, bio, email, orcid, \
         is_corporate, author_order = author_fields
@@ -888,14 +1354,16 @@ def import_author(author_fields, article):
     article.save()
     author.snapshot_self(article)
 
-    frozen_author = update_frozen_author(author, author_fields, article)
+    frozen_author = update_frozen_author(
+        author, author_fields, article, references)
 
     return author, frozen_author
 
-def update_frozen_author(author, author_fields, article):
+def update_frozen_author(author, author_fields, article, references=None):
 
     """
     Updates frozen author records from import data, not author object fields.
+    When batch references are given, the save is queued for a bulk update.
     """
     salutation, first_name, middle_name, last_name, suffix,\
         institution, department, biography, email, orcid, \
@@ -911,7 +1379,10 @@ def update_frozen_author(author, author_fields, article):
     frozen_author.frozen_email = email
     frozen_author.frozen_orcid = orcid_from_url(orcid)
     frozen_author.order = author_order
-    frozen_author.save()
+    if references:
+        references.save_frozen_author(frozen_author)
+    else:
+        frozen_author.save()
 
     return frozen_author
 
@@ -927,7 +1398,14 @@ def import_corporate_author(author_fields, article):
     )
     return author, frozen_author
 
-def import_galley_from_uri(article, uri, figures_uri=None):
+def import_galley_from_uri(article, uri, figures_uri=None, prefetcher=None):
+    """ Imports a galley for the article from a file or http(s) URI
+    :param article: An instance of submission.models.Article
+    :param uri: The URI of the galley file
+    :param figures_uri: Optional file URI of a zip with the galley figures
+    :param prefetcher: Optional fetch.URIPrefetcher from which to read
+        http(s) URIs that have been downloaded ahead of time
+    """
     parsed = urlparse(uri)
     django_file = None
     if parsed.scheme == "file":
@@ -938,14 +1416,19 @@ def import_galley_from_uri(article, uri, figures_uri=None):
         django_file = ContentFile(blob)
         django_file.name = os.path.basename(path)
     elif parsed.scheme in {"http", "https"}:
-        response = requests.get(uri, headers=DEFAULT_REQUEST_HEADERS)
-        response.raise_for_status()
+        if prefetcher:
+            response = prefetcher.get(uri)
+            blob = read_local_file(response.path)
+        else:
+            response = requests.get(uri, headers=DEFAULT_REQUEST_HEADERS)
+            response.raise_for_status()
+            blob = response.content
         filename = get_filename_from_headers(response)
         if not filename:
             filename = uri.split("/")[-1]
         if not filename:
             filename = uuid.uuid4()
-        django_file = ContentFile(response.content)
+        django_file = ContentFile(blob)
         django_file.name = filename
     else:
         raise NotImplementedError("Scheme not supported: %s" % parsed.scheme)
@@ -1067,19 +1550,21 @@ def prep_update_file(path):
     elif path.endswith('.zip'):
 
         with ZipFile(path, 'r') as zipObj:
-            # Extract all the contents of zip file in different directory
-            zipObj.extractall(temp_folder_path)
-
-        destination_csv_wildcard = os.path.join(temp_folder_path, '*.csv')
-
-        csv_path = sorted(
-            glob.glob(destination_csv_wildcard)
-        )[0] if glob.glob(destination_csv_wildcard) else None
+            # Only the metadata csv at the root of the zip file is needed,
+            # the rest of the archive is never extracted
+            csv_members = sorted(
+                name for name in zipObj.namelist()
+                if '/' not in name and name.endswith('.csv')
+            )
+            if csv_members:
+                csv_path = zipObj.extract(csv_members[0], temp_folder_path)
+            else:
+                csv_path = None
 
     else:
         csv_path = None
 
-    if not os.path.isfile(csv_path):
+    if not csv_path or not os.path.isfile(csv_path):
         errors.append('No metadata csv found.')
 
     return csv_path, temp_folder_path, errors
@@ -1116,19 +1601,33 @@ def get_proofing_assignments_for_journal(journal):
     return None, []
 
 
-def proofing_files(workflow_type, proofing_assignments, article):
-    article_assignments = proofing_assignments.filter(round__article=article)
+def proofing_files_by_article(workflow_type, proofing_assignments, articles):
+    """ Returns the proofreader files of the given articles
+    :param workflow_type: 'proofing' or 'typesetting', as returned by
+        get_proofing_assignments_for_journal
+    :param proofing_assignments: The journal's proofing assignments
+    :param articles: An iterable of articles
+    :return: A dict of sets of core.models.File keyed by article ID
+    """
     if workflow_type == 'proofing':
-        proofreader_file_queries = [proof.proofed_files.all() for proof in article_assignments]
+        article_lookup = 'round__assignment__article'
+        files_attr = 'proofed_files'
     else:
-        proofreader_file_queries = [proof.annotated_files.all() for proof in article_assignments]
-
-    files = []
-    for proofed_file_query in proofreader_file_queries:
-        for file in proofed_file_query:
-            files.append(file)
-
-    return set(files)
+        article_lookup = 'round__article'
+        files_attr = 'annotated_files'
+
+    assignments = proofing_assignments.filter(**{
+        '{}__in'.format(article_lookup): [article.pk for article in articles],
+    }).annotate(
+        export_article_id=F(article_lookup),
+    ).prefetch_related(files_attr)
+
+    files = {}
+    for assignment in assignments:
+        files.setdefault(assignment.export_article_id, set()).update(
+            getattr(assignment, files_attr).all()
+        )
+    return files
 
 
 def get_filename_from_headers(response):
@@ -3,13 +3,13 @@ import os
 import shutil
 import zipfile
 
-from django.conf import settings
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
+from django.core.paginator import Paginator
+from django.db.models import Prefetch, Q
 from django.urls import reverse
 from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
-from django.utils import translation
 
 from rest_framework import viewsets
 from rest_framework.decorators import api_view, permission_classes
@@ -20,6 +20,7 @@ from plugins.imports import (
     export,
     forms,
     jats,
+    jobs,
     logic,
     models,
     serializers,
@@ -30,6 +31,16 @@ from submission import models as submission_models
 from security import decorators
 
 
+EXPORT_LISTING_PAGE_SIZE = 50
+EXPORT_LISTING_SORTS = {
+    'pk': 'ID',
+    '-pk': 'ID (descending)',
+    'title': 'Title',
+    'stage': 'Stage',
+    'date_submitted': 'Submitted (oldest first)',
+    '-date_submitted': 'Submitted (newest first)',
+}
+
 @staff_member_required
 def index(request):
     """
@@ -126,31 +137,32 @@ def import_action(request, filename):
         elif request_type == 'submission':
             utils.import_submission_settings(request, reader)
         elif request_type == 'article_metadata':
-            with translation.override(settings.LANGUAGE_CODE):
-                _, errors, error_file = utils.import_article_metadata(
-                    request, reader)
+            file.close()
+            job = jobs.queue_job(
+                models.ImportJob.TYPE_ARTICLE_METADATA,
+                path,
+                journal=request.journal,
+                owner=request.user,
+            )
+            return redirect(
+                reverse('imports_job_status', kwargs={'job_id': job.pk})
+            )
         elif request_type == 'article-reviews':
             utils.import_reviews(request, reader)
         elif request_type == 'update':
-
-            # Verify a few things to help user spot problems
-            errors = utils.verify_headers(path, errors)
-
-            errors = utils.validate_selected_char_fields(
+            # Headers and char fields are validated by the worker as the
+            # file streams in
+            file.close()
+            job = jobs.queue_job(
+                models.ImportJob.TYPE_UPDATE,
                 path,
-                errors,
-                request.journal
+                journal=request.journal,
+                owner=request.user,
+                folder_path=folder_path,
+            )
+            return redirect(
+                reverse('imports_job_status', kwargs={'job_id': job.pk})
             )
-
-            if not errors:
-                with translation.override(settings.LANGUAGE_CODE):
-                    errors, actions = utils.update_article_metadata(
-                        reader,
-                        folder_path,
-                        owner=request.user,
-                        import_id=filename,
-                    )
-
         else:
             raise Http404
         if not errors:
@@ -170,6 +182,28 @@ def import_action(request, filename):
     return render(request, template, context)
 
 
+@staff_member_required
+def import_job_status(request, job_id):
+    """
+    Displays the progress of a queued import
+    :param request: HttpRequest
+    :param job_id: the ID of an ImportJob
+    :return: HttpResponse
+    """
+    job = get_object_or_404(
+        models.ImportJob,
+        pk=job_id,
+        journal=request.journal,
+    )
+
+    template = 'import/job_status.html'
+    context = {
+        'job': job,
+    }
+
+    return render(request, template, context)
+
+
 @staff_member_required
 def review_forms(request):
     """
@@ -394,9 +428,14 @@ def export_article(request, article_id, format='csv'):
 @decorators.editor_user_required
 def export_articles_all(request):
     """
-    A view that displays all articles in a journal and allows export.
+    A view that lists the articles in a journal a page at a time and allows
+    export of a single article or of every article matching the filters.
     """
     stage = request.GET.get('stage')
+    search = request.GET.get('q', '').strip()
+    sort = request.GET.get('sort')
+    if sort not in EXPORT_LISTING_SORTS:
+        sort = 'pk'
 
     if request.POST:
         article_id = request.POST.get('article_id')
@@ -413,8 +452,6 @@ def export_articles_all(request):
             journal=request.journal,
         ).exclude(
             stage=submission_models.STAGE_UNSUBMITTED,
-        ).select_related(
-            'correspondence_author',
         )
 
     # Handle stage without elements
@@ -430,27 +467,77 @@ def export_articles_all(request):
         )
         articles = articles.filter(stage__in=workflow_element.stages)
 
+    if search:
+        search_filter = Q(title__icontains=search)
+        if search.isdigit():
+            search_filter |= Q(pk=search)
+        articles = articles.filter(search_filter)
+
+    # Exports are streamed from the queryset without building the listing
+    if request.POST:
+        if 'export_all' in request.POST:
+            # Only whole journal or stage exports are worth keeping, single
+            # articles and searches would crowd them out of the cache
+            if article_id or search:
+                return export.zip_export_files(request.journal, articles)
+            return export.zip_export_files(
+                request.journal,
+                articles,
+                cache=export.ExportArtifactCache(),
+                filters={'stage': stage},
+            )
+        elif 'export_csv' in request.POST:
+            return export.stream_using_import_format(
+                articles,
+                'export_{}.csv'.format(request.journal.code),
+            )
+
+    paginator = Paginator(
+        articles.order_by(sort, 'pk').select_related(
+            'correspondence_author',
+            'section',
+            'projected_issue',
+        ).prefetch_related(
+            Prefetch(
+                'exportfile_set',
+                queryset=models.ExportFile.objects.select_related('file'),
+            ),
+            'manuscript_files',
+            'galley_set__file',
+            'editorassignment_set__editor',
+        ),
+        EXPORT_LISTING_PAGE_SIZE,
+    )
+    page = paginator.get_page(request.GET.get('page'))
+    page_articles = list(page.object_list)
+
     workflow_type, proofing_assignments = utils.get_proofing_assignments_for_journal(
         request.journal,
     )
+    proofing_files = {}
+    if proofing_assignments:
+        proofing_files = utils.proofing_files_by_article(
+            workflow_type, proofing_assignments, page_articles,
+        )
 
-    for article in articles:
+    for article in page_articles:
         article.export_files = article.exportfile_set.all()
-        article.export_file_pks = [ef.file.pk for ef in article.exportfile_set.all()]
+        article.export_file_pks = [ef.file_id for ef in article.export_files]
+        article.proofing_files = proofing_files.get(article.pk, set())
 
-        if proofing_assignments:
-            article.proofing_files = utils.proofing_files(workflow_type, proofing_assignments, article)
-
-    if request.POST:
-        if 'export_all' in request.POST:
-            csv_path, csv_name = export.export_using_import_format(articles)
-            return export.zip_export_files(request.journal, articles, csv_path)
+    query = request.GET.copy()
+    query.pop('page', None)
 
     template = 'import/articles_all.html'
     context = {
-        'articles_in_stage': articles,
+        'articles_in_stage': page_articles,
+        'page': page,
+        'page_query': query.urlencode(),
         'stages': submission_models.STAGE_CHOICES,
         'selected_stage': stage,
+        'search': search,
+        'sort': sort,
+        'sorts': EXPORT_LISTING_SORTS,
     }
 
     return render(request, template, context)
@@ -500,11 +587,17 @@ def import_from_jats(request):
             else:
                 articles.append((uploaded_file.name, article))
         elif zipfile.is_zipfile(uploaded_file):
-            articles, errors = jats.import_jats_zipped(
-                uploaded_file, request.journal,
+            _, path = files.save_file_to_temp(uploaded_file)
+            job = jobs.queue_job(
+                models.ImportJob.TYPE_JATS,
+                path,
+                journal=request.journal,
                 owner=request.user,
                 stage=stage,
             )
+            return redirect(
+                reverse('imports_job_status', kwargs={'job_id': job.pk})
+            )
         else:
             messages.add_message(
                 request,